@@ -91,7 +91,7 @@ def crawl_basic_info(limit=None, offset=None, batch_size=1000, batch_file=None,
     print(f"爬取完成: 成功 {success} 只, 失败 {fail} 只")
 
 
-def crawl_daily_trade(start_date=None, end_date=None, limit=None):
+def crawl_daily_trade(start_date=None, end_date=None, limit=None, workers=None):
     """爬取股票每日交易数据"""
     crawler = StockDataCrawler()
     
@@ -102,27 +102,89 @@ def crawl_daily_trade(start_date=None, end_date=None, limit=None):
         print(f"结束日期: {end_date}")
     if limit:
         print(f"限制股票数量: {limit}")
+    if workers:
+        print(f"并行worker数量: {workers}")
     
     success, fail = crawler.crawl_all_stock_daily_trade(
         start_date=start_date, 
         end_date=end_date, 
-        limit=limit
+        limit=limit,
+        workers=workers
     )
     
     print(f"爬取完成: 成功 {success} 条记录, 失败 {fail} 只股票")
 
 
-def crawl_today():
+def backfill_gaps(start_date=None, end_date=None, limit=None, workers=None):
+    """检测并补齐交易数据缺口"""
+    crawler = StockDataCrawler()
+    
+    print("开始检测交易数据缺口...")
+    
+    success, fail = crawler.backfill_trade_gaps(
+        start_date=start_date,
+        end_date=end_date,
+        limit=limit,
+        workers=workers
+    )
+    
+    print(f"缺口补齐完成: 写入 {success} 条记录, 失败 {fail} 只股票")
+
+
+def crawl_today(workers=None):
     """爬取今日交易数据"""
     crawler = StockDataCrawler()
     
     print("开始爬取今日交易数据...")
     
-    success, fail = crawler.crawl_today_trade_data()
+    success, fail = crawler.crawl_today_trade_data(workers=workers)
     
     print(f"今日数据爬取完成: 成功 {success} 条记录, 失败 {fail} 只股票")
 
 
+def update_indicators(limit=None, full=False):
+    """计算并写入技术指标"""
+    from stockshark.data.indicator_engine import indicator_engine
+    from stockshark.models.stock_daily_trade import StockDailyTrade
+    
+    print(f"开始计算技术指标（{'全量' if full else '增量'}）...")
+    
+    symbols = StockDailyTrade.get_all_symbols()
+    if limit:
+        symbols = symbols[:limit]
+    stats = indicator_engine.update(symbols, full=full)
+    
+    print(f"技术指标计算完成: {stats['symbols']} 只股票, 写入 {stats['rows_written']} 条, "
+          f"失败 {stats['failed_batches']} 批, 耗时 {stats['elapsed_seconds']}s")
+
+
+def refresh_sectors():
+    """刷新板块统计表"""
+    from stockshark.data.sector_aggregator import refresh_sector_stats
+    
+    print("开始刷新板块统计...")
+    
+    results = refresh_sector_stats()
+    for board_type, stats in results.items():
+        print(f"{board_type}: {stats['boards']} 个板块, {stats['members']} 条成分股, "
+              f"失败 {stats['failed_chunks']} 个事务")
+
+
+def export_bar_store(limit=None):
+    """从 MySQL 全量导出日线到本地列式存储"""
+    from stockshark.data.bar_store import bar_store
+    from stockshark.models.stock_daily_trade import StockDailyTrade
+    
+    print("开始导出日线到本地列式存储...")
+    
+    symbols = StockDailyTrade.get_all_symbols()
+    if limit:
+        symbols = symbols[:limit]
+    stats = bar_store.export_from_mysql(symbols)
+    
+    print(f"导出完成: {stats['symbols']} 只股票, {stats['rows']} 条, 失败 {stats['failed']} 只")
+
+
 def crawl_single_stock(symbol):
     """爬取单只股票的数据"""
     crawler = StockDataCrawler()
@@ -175,12 +237,29 @@ def main():
     basic_parser.add_argument('--batch-file', type=str, help='从文件读取股票代码列表进行爬取')
     basic_parser.add_argument('--workers', type=int, default=5, help='并行worker数量（默认5）')
     
-    trade_parser = subparsers.add_parser('trade', help='爬取股票交易数据')
+    trade_parser = subparsers.add_parser('trade', help='爬取股票交易数据（不指定日期时按已有数据增量同步）')
     trade_parser.add_argument('--start', type=str, help='开始日期 (YYYY-MM-DD)')
     trade_parser.add_argument('--end', type=str, help='结束日期 (YYYY-MM-DD)')
     trade_parser.add_argument('--limit', type=int, help='限制爬取的股票数量')
+    trade_parser.add_argument('--workers', type=int, help='并行worker数量（默认取 CRAWL_WORKERS）')
+    
+    gaps_parser = subparsers.add_parser('gaps', help='按交易日历检测并补齐交易数据缺口')
+    gaps_parser.add_argument('--start', type=str, help='检测开始日期 (YYYY-MM-DD)')
+    gaps_parser.add_argument('--end', type=str, help='检测结束日期 (YYYY-MM-DD)')
+    gaps_parser.add_argument('--limit', type=int, help='限制检测的股票数量')
+    gaps_parser.add_argument('--workers', type=int, help='并行worker数量（默认取 CRAWL_WORKERS）')
     
     today_parser = subparsers.add_parser('today', help='爬取今日交易数据')
+    today_parser.add_argument('--workers', type=int, help='并行worker数量（默认取 CRAWL_WORKERS）')
+    
+    indicators_parser = subparsers.add_parser('indicators', help='计算全市场技术指标（默认增量）')
+    indicators_parser.add_argument('--limit', type=int, help='限制计算的股票数量')
+    indicators_parser.add_argument('--full', action='store_true', help='忽略已有指标，从完整历史重新计算')
+    
+    subparsers.add_parser('sectors', help='刷新板块统计（成分股数量、总市值、平均涨跌幅）')
+    
+    barstore_parser = subparsers.add_parser('barstore', help='从数据库导出日线到本地列式存储（Parquet）')
+    barstore_parser.add_argument('--limit', type=int, help='限制导出的股票数量')
     
     single_parser = subparsers.add_parser('single', help='爬取单只股票数据')
     single_parser.add_argument('symbol', type=str, help='股票代码')
@@ -202,9 +281,17 @@ def main():
     elif args.command == 'basic':
         crawl_basic_info(limit=args.limit, offset=args.offset, batch_size=args.batch_size, batch_file=args.batch_file, workers=args.workers)
     elif args.command == 'trade':
-        crawl_daily_trade(start_date=args.start, end_date=args.end, limit=args.limit)
+        crawl_daily_trade(start_date=args.start, end_date=args.end, limit=args.limit, workers=args.workers)
+    elif args.command == 'gaps':
+        backfill_gaps(start_date=args.start, end_date=args.end, limit=args.limit, workers=args.workers)
     elif args.command == 'today':
-        crawl_today()
+        crawl_today(workers=args.workers)
+    elif args.command == 'indicators':
+        update_indicators(limit=args.limit, full=args.full)
+    elif args.command == 'sectors':
+        refresh_sectors()
+    elif args.command == 'barstore':
+        export_bar_store(limit=args.limit)
     elif args.command == 'single':
         crawl_single_stock(args.symbol)
     elif args.command == 'incremental':
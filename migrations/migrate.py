@@ -10,6 +10,8 @@ from stockshark.utils.database import get_mysql_connection, test_mysql_connectio
 from stockshark.utils.logger import get_logger
 from stockshark.models.stock_basic_info import StockBasicInfo
 from stockshark.models.stock_daily_trade import StockDailyTrade
+from stockshark.models.stock_indicator import StockIndicator
+from stockshark.models.sector_stats import SectorStats
 from stockshark.config import get_config
 
 logger = get_logger(__name__)
@@ -63,6 +65,14 @@ def init_database():
         StockDailyTrade.create_table()
         logger.info("股票每日交易信息表创建成功")
         
+        logger.info("创建股票技术指标表...")
+        StockIndicator.create_table()
+        logger.info("股票技术指标表创建成功")
+        
+        logger.info("创建板块统计表...")
+        SectorStats.create_table()
+        logger.info("板块统计表创建成功")
+        
         logger.info("数据库初始化完成")
         return True
         
@@ -82,7 +92,7 @@ def drop_tables():
         try:
             cursor = conn.cursor()
             
-            tables = ['stock_daily_trade', 'stock_basic_info']
+            tables = ['sector_members', 'sector_stats', 'stock_indicators', 'stock_daily_trade', 'stock_basic_info']
             for table in tables:
                 cursor.execute(f"DROP TABLE IF EXISTS {table}")
                 logger.info(f"表 {table} 已删除")
@@ -4,10 +4,18 @@
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
+from stockshark.config import Config
+from stockshark.data.akshare_data import AkShareData
+from stockshark.data.announcement import get_announcements
 from stockshark.data.database import DatabaseManager
+from stockshark.data.research_report import get_reports
+from stockshark.data.spot_snapshot import spot_snapshot
+from stockshark.utils.single_flight import FileLock, MongoLock
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +29,8 @@ _MAJOR_KEYWORDS = (
 # scope -> 过期天数
 _EXPIRY_DAYS = {"short": 3, "mid": 7, "long": 30, "all": 7}
 
+_ak = AkShareData()
+
 # 触发阈值
 PRICE_CHANGE_THRESHOLD = 0.08      # 相对缓存价格变化 8%
 DAILY_CHANGE_THRESHOLD = 5.0       # 日涨跌幅 5%
@@ -35,6 +45,78 @@ def _get_collection():
     return db["stock_evaluations"]
 
 
+def _get_lock_collection():
+    """获取 evaluation_locks 集合（跨 worker 评估锁）"""
+    db = DatabaseManager.get_mongodb_connection()
+    if db is None:
+        return None
+    return db["evaluation_locks"]
+
+
+def evaluation_lock(stock_code: str, scope: str):
+    """
+    获取 (stock_code, scope) 的跨 worker 评估锁
+
+    MongoDB 可用时使用租约锁（多机有效），否则退化为本机文件锁。
+    """
+    key = f"{stock_code}:{scope}"
+    coll = _get_lock_collection()
+    if coll is not None:
+        return MongoLock(coll, key, ttl=Config.EVAL_LOCK_TTL)
+    return FileLock(os.path.join(Config.CACHE_DIR, "locks", f"evaluation_{stock_code}_{scope}.lock"))
+
+
+def _get_request_collection():
+    """获取 evaluation_requests 集合（综合分析请求计数，用于预评估选股）"""
+    db = DatabaseManager.get_mongodb_connection()
+    if db is None:
+        return None
+    return db["evaluation_requests"]
+
+
+def record_request(stock_code: str, scope: str):
+    """记录一次综合分析请求"""
+    coll = _get_request_collection()
+    if coll is None:
+        return
+    coll.update_one(
+        {"_id": f"{stock_code}:{scope}"},
+        {"$inc": {"count": 1},
+         "$set": {"stock_code": stock_code, "scope": scope,
+                  "last_requested_at": datetime.now().isoformat()}},
+        upsert=True,
+    )
+
+
+def get_top_requested(limit: int, scope: Optional[str] = None, days: int = 30) -> List[str]:
+    """
+    获取近期请求最多的股票代码
+
+    Args:
+        limit: 返回数量
+        scope: 分析范围，None 表示不区分
+        days: 只统计最近请求时间在该天数内的股票
+
+    Returns:
+        list: 股票代码，按请求次数降序
+    """
+    coll = _get_request_collection()
+    if coll is None or limit <= 0:
+        return []
+    match: Dict[str, Any] = {
+        "last_requested_at": {"$gte": (datetime.now() - timedelta(days=days)).isoformat()}
+    }
+    if scope:
+        match["scope"] = scope
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$stock_code", "count": {"$sum": "$count"}}},
+        {"$sort": {"count": -1}},
+        {"$limit": limit},
+    ]
+    return [doc["_id"] for doc in coll.aggregate(pipeline)]
+
+
 def get_cached_evaluation(stock_code: str, scope: str) -> Optional[Dict]:
     """查询缓存的评估结论"""
     coll = _get_collection()
@@ -89,82 +171,204 @@ def build_fingerprint(quote: Dict, valuation: Dict,
     return fp
 
 
-def check_triggers(cached: Dict, stock_code: str) -> Tuple[bool, str]:
-    """轻量级触发检测，返回 (should_refresh, reason)
+def get_cached_evaluations(stock_codes: List[str], scope: Optional[str] = None) -> List[Dict]:
+    """批量查询缓存的评估结论（一次查询）"""
+    coll = _get_collection()
+    if coll is None or not stock_codes:
+        return []
+    query: Dict[str, Any] = {"stock_code": {"$in": list(stock_codes)}}
+    if scope:
+        query["scope"] = scope
+    return list(coll.find(query, {"_id": 0}))
 
-    只做必要的数据获取，不调用 LLM。
-    """
-    evaluated_at = cached.get("evaluated_at", "")
-    scope = cached.get("scope", "all")
-    old_fp = cached.get("data_fingerprint", {})
 
-    # 1. 时间过期
+def _expiry_trigger(cached: Dict) -> Optional[str]:
     try:
-        eval_time = datetime.fromisoformat(evaluated_at)
-        expiry = timedelta(days=_EXPIRY_DAYS.get(scope, 7))
-        if datetime.now() - eval_time > expiry:
-            return True, "time_expired"
+        eval_time = datetime.fromisoformat(cached.get("evaluated_at", ""))
     except (ValueError, TypeError):
-        return True, "invalid_eval_time"
+        return "invalid_eval_time"
+    expiry = timedelta(days=_EXPIRY_DAYS.get(cached.get("scope", "all"), 7))
+    if datetime.now() - eval_time > expiry:
+        return "time_expired"
+    return None
 
-    # 2. 行情变化（价格 + 日涨跌幅）
-    try:
-        from stockshark.data.akshare_data import AkShareData
-        ak = AkShareData()
-        quote = ak.get_stock_quote(stock_code)
-        if quote:
-            cur_price = float(quote.get("最新价") or quote.get("price") or 0)
-            old_price = float(old_fp.get("price") or 0)
-            if old_price > 0 and cur_price > 0:
-                if abs(cur_price - old_price) / old_price >= PRICE_CHANGE_THRESHOLD:
-                    return True, f"price_change({old_price}->{cur_price})"
-
-            daily_chg = float(quote.get("涨跌幅") or quote.get("change_pct") or 0)
-            if abs(daily_chg) >= DAILY_CHANGE_THRESHOLD:
-                return True, f"daily_volatility({daily_chg}%)"
-    except Exception as e:
-        logger.debug("行情触发检测异常: %s", e)
+
+def _quote_trigger(old_fp: Dict, quote: Optional[Dict]) -> Optional[str]:
+    if not quote:
+        return None
+    cur_price = float(quote.get("最新价") or quote.get("price") or 0)
+    old_price = float(old_fp.get("price") or 0)
+    if old_price > 0 and cur_price > 0:
+        if abs(cur_price - old_price) / old_price >= PRICE_CHANGE_THRESHOLD:
+            return f"price_change({old_price}->{cur_price})"
+
+    daily_chg = float(quote.get("涨跌幅") or quote.get("change_pct") or 0)
+    if abs(daily_chg) >= DAILY_CHANGE_THRESHOLD:
+        return f"daily_volatility({daily_chg}%)"
+    return None
+
+
+def _announcement_trigger(old_fp: Dict, announcements: List[Dict]) -> Optional[str]:
+    old_latest = old_fp.get("latest_announcement_date", "")
+    for a in announcements:
+        if a["date"] > old_latest:
+            if any(kw in a["title"] for kw in _MAJOR_KEYWORDS):
+                return f"major_announcement({a['title'][:30]})"
+    return None
+
+
+def _report_trigger(old_fp: Dict, reports: List[Dict]) -> Optional[str]:
+    old_report_date = old_fp.get("latest_report_date", "")
+    for r in reports:
+        if r["date"] > old_report_date:
+            return f"new_report({r['title'][:30]})"
+    return None
+
+
+def _valuation_trigger(old_fp: Dict, valuation: Optional[Dict]) -> Optional[str]:
+    if not valuation or "error" in str(valuation):
+        return None
+    for key in ("pe_ttm", "pb"):
+        cur_val = float(valuation.get(key) or 0)
+        old_val = float(old_fp.get(key) or 0)
+        if old_val > 0 and cur_val > 0:
+            if abs(cur_val - old_val) / old_val >= VALUATION_CHANGE_THRESHOLD:
+                return f"valuation_change({key}: {old_val}->{cur_val})"
+    return None
+
+
+def _fetch_parallel(fetch: Callable[[str], Any], keys: Iterable[str],
+                    workers: int, label: str) -> Dict[str, Any]:
+    """去重后并行获取，失败的 key 结果为 None"""
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+    results: Dict[str, Any] = {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(keys))) as pool:
+        futures = {pool.submit(fetch, key): key for key in keys}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                logger.debug("%s触发检测异常 %s: %s", label, futures[future], e)
+                results[futures[future]] = None
+    return results
+
+
+def _fetch_trigger_announcements(stock_code: str) -> List[Dict]:
+    return get_announcements(stock_code, days=7, page_size=10).get("announcements", [])
+
+
+def _fetch_trigger_reports(keyword: str) -> List[Dict]:
+    return get_reports(keyword, limit=5).get("reports", [])
+
+
+def check_triggers_batch(cached_list: List[Dict], workers: Optional[int] = None,
+                         fetched: Optional[Dict[str, Dict[str, Any]]] = None
+                         ) -> Dict[Tuple[str, str], Tuple[bool, str]]:
+    """批量轻量级触发检测
+
+    按成本从低到高逐级筛选，已触发的评估不再参与后续检测：
+    1. 时间过期（无 I/O）
+    2. 行情变化：全部股票共用一次全市场行情快照
+    3. 重大公告：按股票代码去重后并行查询
+    4. 新研报：按检索关键词去重后并行查询
+    5. 估值异动：按股票代码去重后并行查询
+
+    Args:
+        cached_list: get_cached_evaluation(s) 返回的缓存文档（含 stock_code、scope）
+        workers: 公告/研报/估值查询的并发数，默认取 Config.TRIGGER_CHECK_WORKERS
+        fetched: 传入字典时，检测过程中获取到的估值数据按 stock_code -> {"valuation": ...}
+            写入其中，供随后的全量评估复用
+
+    Returns:
+        dict: (stock_code, scope) -> (should_refresh, reason)
+    """
+    workers = workers or Config.TRIGGER_CHECK_WORKERS
+    results: Dict[Tuple[str, str], Tuple[bool, str]] = {}
+    pending: List[Tuple[Tuple[str, str], Dict]] = []
+
+    def settle(check: Callable[[Tuple[str, str], Dict], Optional[str]]):
+        nonlocal pending
+        remaining = []
+        for key, cached in pending:
+            try:
+                reason = check(key, cached)
+            except Exception as e:
+                logger.debug("触发检测异常 %s: %s", key, e)
+                reason = None
+            if reason:
+                results[key] = (True, reason)
+            else:
+                remaining.append((key, cached))
+        pending = remaining
+
+    # 1. 时间过期
+    for cached in cached_list:
+        key = (cached["stock_code"], cached.get("scope", "all"))
+        reason = _expiry_trigger(cached)
+        if reason:
+            results[key] = (True, reason)
+        else:
+            pending.append((key, cached))
+
+    # 2. 行情变化（价格 + 日涨跌幅），共用一次全市场快照
+    if pending:
+        settle(lambda key, cached: _quote_trigger(cached.get("data_fingerprint", {}),
+                                                  spot_snapshot.get_row(key[0])))
 
     # 3. 重大公告
-    try:
-        from stockshark.data.announcement import get_announcements
-        ann = get_announcements(stock_code, days=7, page_size=10)
-        new_anns = ann.get("announcements", [])
-        old_latest = old_fp.get("latest_announcement_date", "")
-        for a in new_anns:
-            if a["date"] > old_latest:
-                if any(kw in a["title"] for kw in _MAJOR_KEYWORDS):
-                    return True, f"major_announcement({a['title'][:30]})"
-    except Exception as e:
-        logger.debug("公告触发检测异常: %s", e)
-
-    # 4. 新研报
-    try:
-        from stockshark.data.research_report import get_reports
-        old_report_date = old_fp.get("latest_report_date", "")
-        if old_report_date:
-            keyword = cached.get("result", {}).get("stock_name", stock_code)
-            rpt = get_reports(keyword, limit=5)
-            for r in rpt.get("reports", []):
-                if r["date"] > old_report_date:
-                    return True, f"new_report({r['title'][:30]})"
-    except Exception as e:
-        logger.debug("研报触发检测异常: %s", e)
+    if pending:
+        anns = _fetch_parallel(_fetch_trigger_announcements, (key[0] for key, _ in pending),
+                               workers, "公告")
+        settle(lambda key, cached: _announcement_trigger(cached.get("data_fingerprint", {}),
+                                                         anns.get(key[0]) or []))
+
+    # 4. 新研报（仅缓存时已有研报日期的评估需要检测）
+    def report_keyword(key, cached):
+        return cached.get("result", {}).get("stock_name", key[0])
+
+    def has_report_date(cached):
+        return bool(cached.get("data_fingerprint", {}).get("latest_report_date"))
+
+    if pending:
+        reports = _fetch_parallel(_fetch_trigger_reports,
+                                  (report_keyword(key, cached) for key, cached in pending
+                                   if has_report_date(cached)),
+                                  workers, "研报")
+
+        def report_check(key, cached):
+            if not has_report_date(cached):
+                return None
+            return _report_trigger(cached.get("data_fingerprint", {}),
+                                   reports.get(report_keyword(key, cached)) or [])
+
+        settle(report_check)
 
     # 5. 估值异动
-    try:
-        valuation = ak.get_stock_valuation_data(stock_code) if 'ak' in dir() else None
-        if valuation and "error" not in str(valuation):
-            for key in ("pe_ttm", "pb"):
-                cur_val = float(valuation.get(key) or 0)
-                old_val = float(old_fp.get(key) or 0)
-                if old_val > 0 and cur_val > 0:
-                    if abs(cur_val - old_val) / old_val >= VALUATION_CHANGE_THRESHOLD:
-                        return True, f"valuation_change({key}: {old_val}->{cur_val})"
-    except Exception as e:
-        logger.debug("估值触发检测异常: %s", e)
+    if pending:
+        valuations = _fetch_parallel(_ak.get_stock_valuation_data, (key[0] for key, _ in pending),
+                                     workers, "估值")
+        if fetched is not None:
+            for code, valuation in valuations.items():
+                if valuation:
+                    fetched.setdefault(code, {})["valuation"] = valuation
+        settle(lambda key, cached: _valuation_trigger(cached.get("data_fingerprint", {}),
+                                                      valuations.get(key[0])))
+
+    for key, _ in pending:
+        results[key] = (False, "")
+    return results
+
 
-    return False, ""
+def check_triggers(cached: Dict, stock_code: str) -> Tuple[bool, str]:
+    """轻量级触发检测，返回 (should_refresh, reason)
+
+    只做必要的数据获取，不调用 LLM。批量检测见 check_triggers_batch。
+    """
+    cached = dict(cached, stock_code=stock_code)
+    key = (stock_code, cached.get("scope", "all"))
+    return check_triggers_batch([cached])[key]
 
 
 def ensure_index():
@@ -176,3 +380,7 @@ def ensure_index():
             unique=True,
             name="idx_stock_scope",
         )
+    lock_coll = _get_lock_collection()
+    if lock_coll is not None:
+        # 过期的锁由 MongoDB 自动清理（持有者崩溃时兜底）
+        lock_coll.create_index("expires_at", expireAfterSeconds=0, name="idx_lock_ttl")
@@ -8,29 +8,54 @@ v1.1 - 增加评估结论缓存与智能重新评估（docs/evaluation_cache_des
 
 import json
 import logging
-import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from typing import Dict, Any, Optional
-
-import requests
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from stockshark.config import Config
 from stockshark.data.akshare_data import AkShareData
 from stockshark.data.announcement import get_announcements
 from stockshark.data.research_report import get_reports
 from stockshark.data.hibor_report import get_hibor_reports
+from stockshark.data.symbol_index import symbol_index
 from stockshark.analysis.evaluation_cache import (
     get_cached_evaluation, save_evaluation, build_fingerprint,
-    check_triggers, ensure_index,
+    check_triggers, check_triggers_batch, ensure_index, evaluation_lock,
+    get_cached_evaluations, record_request,
 )
+from stockshark.analysis.llm_cache import llm_response_cache, prompt_key
+from stockshark.analysis.llm_client import deepseek_client
+from stockshark.utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
-_API_KEY = os.getenv("DEEPSEEK_API_KEY", "")
-_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
-_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+_API_KEY = deepseek_client.api_key
+_MODEL = deepseek_client.model
 
 _ak = AkShareData()
 
+# 各数据源超时（秒，从采集开始计）；慧博需启动 playwright 登录搜索，单独配置
+_SOURCE_TIMEOUTS = {
+    "basic": Config.GATHER_TIMEOUT,
+    "quote": Config.GATHER_TIMEOUT,
+    "valuation": Config.GATHER_TIMEOUT,
+    "financial": Config.GATHER_TIMEOUT,
+    "announcements": Config.GATHER_TIMEOUT,
+    "reports": Config.GATHER_TIMEOUT,
+    "hibor_reports": Config.GATHER_HIBOR_TIMEOUT,
+}
+
+_TEMPERATURE = 0.3
+
+# 同一 (stock_code, scope) 的并发全量评估在进程内合并为一次
+_evaluation_flight = SingleFlight()
+
+# 相同的 LLM 请求在进程内合并为一次
+_llm_flight = SingleFlight()
+
 # 启动时确保索引
 try:
     ensure_index()
@@ -38,80 +63,201 @@ except Exception:
     pass
 
 
-def _llm_call(prompt: str, max_tokens: int = 4000) -> str:
-    """调用 DeepSeek LLM"""
-    resp = requests.post(
-        f"{_BASE_URL}/v1/chat/completions",
-        headers={"Authorization": f"Bearer {_API_KEY}", "Content-Type": "application/json"},
-        json={"model": _MODEL, "messages": [{"role": "user", "content": prompt}],
-              "temperature": 0.3, "max_tokens": max_tokens},
-        timeout=60,
-    )
-    resp.raise_for_status()
-    return resp.json()["choices"][0]["message"]["content"]
+def _llm_call(prompt: str, max_tokens: int = 4000,
+              validate: Optional[Callable[[str], Any]] = None) -> str:
+    """
+    调用 DeepSeek LLM；相同请求（Prompt/模型/参数一致）复用缓存的响应，并发的相同请求只发送一次
 
+    Args:
+        prompt: Prompt
+        max_tokens: 最大输出 token 数
+        validate: 校验响应的函数，抛出异常的响应不写入缓存
 
-def _gather_data(stock_code: str) -> Dict[str, Any]:
-    """并行采集所有数据源"""
-    data = {"stock_code": stock_code}
+    Returns:
+        str: 响应文本
+    """
+    key = prompt_key(prompt, _MODEL, _TEMPERATURE, max_tokens)
 
-    # 1. AkShare: 基本信息 + 行情 + 估值
-    try:
-        data["basic"] = _ak.get_stock_basic_info(stock_code)
-    except Exception as e:
-        data["basic"] = {"error": str(e)}
+    def run():
+        cached = llm_response_cache.get(key)
+        if cached is not None:
+            logger.info("LLM 响应缓存命中: %s", key[:12])
+            return cached
+        raw = deepseek_client.complete(prompt, max_tokens=max_tokens, temperature=_TEMPERATURE)
+        try:
+            if validate is not None:
+                validate(raw)
+            llm_response_cache.set(key, raw, _MODEL)
+        except Exception as e:
+            logger.warning("LLM 响应校验失败，不写入缓存: %s", e)
+        return raw
 
-    try:
-        data["quote"] = _ak.get_stock_quote(stock_code)
-    except Exception as e:
-        data["quote"] = {"error": str(e)}
+    raw, _ = _llm_flight.do(key, run)
+    return raw
 
-    try:
-        data["valuation"] = _ak.get_stock_valuation_data(stock_code)
-    except Exception as e:
-        data["valuation"] = {"error": str(e)}
 
-    try:
-        data["financial"] = _ak.get_stock_financial_data(stock_code)
-        if hasattr(data["financial"], "to_dict"):
-            data["financial"] = data["financial"].head(5).to_dict("records")
-    except Exception as e:
-        data["financial"] = {"error": str(e)}
+def _parse_llm_json(raw: str) -> Dict[str, Any]:
+    """解析 LLM 输出的 JSON（去掉 markdown 代码块）"""
+    if raw.strip().startswith("```"):
+        raw = raw.split("\n", 1)[1].rsplit("```", 1)[0]
+    return json.loads(raw)
 
-    # 2. 巨潮: 近30天公告
-    try:
-        ann = get_announcements(stock_code, days=30, page_size=15)
-        data["announcements"] = [
+
+def _fetch_basic(stock_code: str):
+    return _ak.get_stock_basic_info(stock_code)
+
+
+def _fetch_quote(stock_code: str):
+    return _ak.get_stock_quote(stock_code)
+
+
+def _fetch_valuation(stock_code: str):
+    return _ak.get_stock_valuation_data(stock_code)
+
+
+def _fetch_financial(stock_code: str):
+    financial = _ak.get_stock_financial_data(stock_code)
+    if hasattr(financial, "to_dict"):
+        financial = financial.head(5).to_dict("records")
+    return financial
+
+
+def _fetch_announcements(stock_code: str) -> Dict[str, Any]:
+    ann = get_announcements(stock_code, days=30, page_size=15)
+    return {
+        "announcements": [
             {"title": a["title"], "date": a["date"]}
             for a in ann.get("announcements", [])
-        ]
-        data["stock_name"] = ann.get("stock_name", "")
-    except Exception as e:
-        data["announcements"] = []
+        ],
+        "stock_name": ann.get("stock_name", ""),
+    }
+
+
+def _fetch_reports(keyword: str):
+    rpt = get_reports(keyword, limit=10)
+    return [
+        {"title": r["title"], "org": r["org"], "category": r["category"],
+         "date": r["date"], "authors": r["authors"]}
+        for r in rpt.get("reports", [])
+    ]
+
+
+def _fetch_hibor_reports(keyword: str):
+    hb = get_hibor_reports(keyword, days=30, max_pages=2)
+    return [
+        {"title": r["title"], "org": r["org"], "date": r["date"],
+         "summary": r.get("summary", "")}
+        for r in hb.get("reports", [])
+    ]
 
-    # 3. 洞见研报: 最新研报
-    keyword = data.get("stock_name") or stock_code
+
+def _resolve_stock_name(stock_code: str) -> str:
+    """从本地股票代码索引解析名称，不可用时返回空字符串"""
     try:
-        rpt = get_reports(keyword, limit=10)
-        data["reports"] = [
-            {"title": r["title"], "org": r["org"], "category": r["category"],
-             "date": r["date"], "authors": r["authors"]}
-            for r in rpt.get("reports", [])
-        ]
+        return symbol_index.get_name(stock_code) or ""
     except Exception as e:
-        data["reports"] = []
+        logger.debug("股票代码索引不可用: %s", e)
+        return ""
+
+
+def _gather_data(stock_code: str, prefetched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """并行采集所有数据源
+
+    各数据源在独立线程中并发执行，每个数据源有各自的超时；超时或失败的数据源
+    使用空结果，不影响其他数据源。研报检索依赖股票名称：优先从本地代码索引解析，
+    解析不到时等待公告结果中的名称。各数据源耗时记录在 data["timings"]。
+    prefetched 中已有的数据源（如批量触发检测时取得的估值）直接使用，不再请求。
+    """
+    data = {"stock_code": stock_code}
+    start = time.perf_counter()
+    # 各任务自身耗时由工作线程写入；状态由主线程汇总到 timings，超时任务的迟到写入不影响结果
+    durations: Dict[str, float] = {}
+    timings: Dict[str, Dict[str, Any]] = {}
+
+    stock_name = _resolve_stock_name(stock_code)
+    executor = ThreadPoolExecutor(max_workers=len(_SOURCE_TIMEOUTS),
+                                  thread_name_prefix=f"gather-{stock_code}")
+
+    def timed(source, func, *args):
+        if prefetched and source in prefetched:
+            future = Future()
+            future.set_result(prefetched[source])
+            durations[source] = 0.0
+            return future
+
+        def run():
+            t0 = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                durations[source] = round((time.perf_counter() - t0) * 1000, 1)
+        return executor.submit(run)
+
+    futures = {
+        "basic": timed("basic", _fetch_basic, stock_code),
+        "quote": timed("quote", _fetch_quote, stock_code),
+        "valuation": timed("valuation", _fetch_valuation, stock_code),
+        "financial": timed("financial", _fetch_financial, stock_code),
+        "announcements": timed("announcements", _fetch_announcements, stock_code),
+    }
 
-    # 4. 慧博投研: 公司调研研报
+    def keyword_after_announcements():
+        # 名称未能从本地索引解析时，研报检索需等待公告结果中的股票名称
+        try:
+            remaining = _SOURCE_TIMEOUTS["announcements"] - (time.perf_counter() - start)
+            return futures["announcements"].result(timeout=max(remaining, 0)).get("stock_name") or stock_code
+        except Exception:
+            return stock_code
+
+    if stock_name:
+        futures["reports"] = timed("reports", _fetch_reports, stock_name)
+        futures["hibor_reports"] = timed("hibor_reports", _fetch_hibor_reports, stock_name)
+    else:
+        futures["reports"] = timed("reports", lambda: _fetch_reports(keyword_after_announcements()))
+        futures["hibor_reports"] = timed("hibor_reports",
+                                         lambda: _fetch_hibor_reports(keyword_after_announcements()))
+
+    results: Dict[str, Any] = {}
     try:
-        hb = get_hibor_reports(keyword, days=30, max_pages=2)
-        data["hibor_reports"] = [
-            {"title": r["title"], "org": r["org"], "date": r["date"],
-             "summary": r.get("summary", "")}
-            for r in hb.get("reports", [])
-        ]
-    except Exception as e:
-        data["hibor_reports"] = []
+        for source, future in futures.items():
+            remaining = _SOURCE_TIMEOUTS[source] - (time.perf_counter() - start)
+            try:
+                results[source] = future.result(timeout=max(remaining, 0))
+                status = "prefetched" if prefetched and source in prefetched else "ok"
+                timings[source] = {"ms": durations.get(source), "status": status}
+            except FuturesTimeoutError:
+                future.cancel()
+                timings[source] = {"ms": round((time.perf_counter() - start) * 1000, 1),
+                                   "status": "timeout"}
+                logger.warning("数据源 %s 超时(%ss): %s", source, _SOURCE_TIMEOUTS[source], stock_code)
+            except Exception as e:
+                timings[source] = {"ms": durations.get(source), "status": "error", "error": str(e)}
+                logger.warning("数据源 %s 采集失败: %s", source, e)
+    finally:
+        # 超时的任务无法中断，不等待其结束；排队中的任务直接取消
+        # （shutdown 的 cancel_futures 参数需要 Python 3.9，这里逐个取消以兼容 3.8）
+        for future in futures.values():
+            future.cancel()
+        executor.shutdown(wait=False)
+
+    # 1. AkShare: 基本信息 + 行情 + 估值 + 财务
+    for source in ("basic", "quote", "valuation", "financial"):
+        if source in results:
+            data[source] = results[source]
+        else:
+            data[source] = {"error": timings[source].get("error") or timings[source]["status"]}
+
+    # 2. 巨潮: 近30天公告
+    ann = results.get("announcements") or {}
+    data["announcements"] = ann.get("announcements", [])
+    data["stock_name"] = stock_name or ann.get("stock_name", "")
+
+    # 3. 洞见研报 / 慧博投研
+    data["reports"] = results.get("reports", [])
+    data["hibor_reports"] = results.get("hibor_reports", [])
 
+    data["timings"] = {"total_ms": round((time.perf_counter() - start) * 1000, 1),
+                       "sources": timings}
     return data
 
 
@@ -187,20 +333,22 @@ def _build_prompt(data: Dict, scope: str) -> str:
 }}"""
 
 
-def _do_full_evaluation(stock_code: str, scope: str,
-                        trigger_reason: str) -> Dict[str, Any]:
-    """执行全量评估：采集数据 → LLM分析 → 存储结论"""
+def _do_full_evaluation(stock_code: str, scope: str, trigger_reason: str,
+                        data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """执行全量评估：采集数据 → LLM分析 → 存储结论
+
+    data 为已采集的数据（批量评估时同一股票的多个 scope 共用一次采集），为空时重新采集。
+    """
     # 1. 采集数据
     logger.info("全量评估 %s (scope=%s, reason=%s)", stock_code, scope, trigger_reason)
-    data = _gather_data(stock_code)
+    if data is None:
+        data = _gather_data(stock_code)
 
     # 2. 构建 Prompt & LLM 分析
     prompt = _build_prompt(data, scope)
     try:
-        raw = _llm_call(prompt)
-        if raw.strip().startswith("```"):
-            raw = raw.split("\n", 1)[1].rsplit("```", 1)[0]
-        result = json.loads(raw)
+        raw = _llm_call(prompt, validate=_parse_llm_json)
+        result = _parse_llm_json(raw)
     except Exception as e:
         logger.error("LLM 分析失败: %s", e)
         return {"error": f"LLM分析失败: {e}", "raw_response": raw if 'raw' in dir() else ""}
@@ -217,6 +365,7 @@ def _do_full_evaluation(stock_code: str, scope: str,
         "djyanbao_reports": len(data.get("reports", [])),
         "hibor_reports": len(data.get("hibor_reports", [])),
     }
+    result["timings"] = data.get("timings", {})
 
     # 4. 构建指纹并持久化
     fingerprint = build_fingerprint(
@@ -230,6 +379,61 @@ def _do_full_evaluation(stock_code: str, scope: str,
     return result
 
 
+def _cached_response(cached: Dict, trigger_reason: str) -> Dict[str, Any]:
+    """将缓存文档转换为返回结果"""
+    result = cached.get("result", {})
+    result["cached"] = True
+    result["trigger_reason"] = trigger_reason
+    result["cached_at"] = cached.get("evaluated_at", "")
+    return result
+
+
+def _evaluated_since(cached: Dict, since: datetime) -> bool:
+    try:
+        return datetime.fromisoformat(cached.get("evaluated_at", "")) >= since
+    except (ValueError, TypeError):
+        return False
+
+
+def _evaluate_coalesced(stock_code: str, scope: str, trigger_reason: str,
+                        data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """全量评估（合并并发请求）
+
+    进程内：同一 (stock_code, scope) 只有一个线程执行评估，其余线程共享结果。
+    跨 worker：执行前获取评估锁；若需等待其他 worker 释放锁，说明对方刚完成
+    同一评估，直接复用其写入的缓存结论。
+    """
+    def run():
+        started = datetime.now()
+        lock = evaluation_lock(stock_code, scope)
+        try:
+            acquired, waited = lock.acquire(timeout=Config.EVAL_LOCK_WAIT)
+        except Exception as e:
+            logger.warning("获取评估锁失败，直接评估: %s", e)
+            acquired, waited = False, False
+        try:
+            if waited:
+                cached = get_cached_evaluation(stock_code, scope)
+                if cached and _evaluated_since(cached, started):
+                    logger.info("复用其他 worker 刚完成的评估: %s scope=%s", stock_code, scope)
+                    result = _cached_response(cached, cached.get("trigger_reason", ""))
+                    result["coalesced"] = True
+                    return result
+                if not acquired:
+                    logger.warning("等待评估锁超时，直接评估: %s scope=%s", stock_code, scope)
+            return _do_full_evaluation(stock_code, scope, trigger_reason, data)
+        finally:
+            if acquired:
+                lock.release()
+
+    result, shared = _evaluation_flight.do((stock_code, scope), run)
+    if shared:
+        logger.info("合并并发评估请求: %s scope=%s", stock_code, scope)
+        result = dict(result)
+        result["coalesced"] = True
+    return result
+
+
 def analyze_stock_comprehensive(
     stock_code: str,
     scope: str = "all",
@@ -248,24 +452,177 @@ def analyze_stock_comprehensive(
     if not _API_KEY:
         return {"error": "DEEPSEEK_API_KEY 未配置"}
 
+    try:
+        record_request(stock_code, scope)
+    except Exception as e:
+        logger.debug("记录分析请求失败: %s", e)
+
     # 强制刷新 → 直接全量评估
     if force_refresh:
-        return _do_full_evaluation(stock_code, scope, "force_refresh")
+        return _evaluate_coalesced(stock_code, scope, "force_refresh")
 
     # 查询缓存
     cached = get_cached_evaluation(stock_code, scope)
     if not cached:
-        return _do_full_evaluation(stock_code, scope, "initial")
+        return _evaluate_coalesced(stock_code, scope, "initial")
 
     # 触发检测
     should_refresh, reason = check_triggers(cached, stock_code)
     if should_refresh:
-        return _do_full_evaluation(stock_code, scope, reason)
+        return _evaluate_coalesced(stock_code, scope, reason)
 
     # 返回缓存结论
     logger.info("复用缓存评估: %s scope=%s", stock_code, scope)
-    result = cached.get("result", {})
-    result["cached"] = True
-    result["trigger_reason"] = "none"
-    result["cached_at"] = cached.get("evaluated_at", "")
-    return result
+    return _cached_response(cached, "none")
+
+
+def evaluate_batch(
+    items: List[Tuple[str, str]],
+    force_refresh: bool = False,
+    workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """批量综合分析，按完成顺序逐个产出结果
+
+    1. 批量读取缓存并做触发检测（共用一次全市场行情快照，公告/估值按股票去重查询），
+       缓存仍有效的结果立即产出
+    2. 需要重新评估的按股票分组，每只股票只采集一次数据（复用触发检测时取得的估值），
+       各 scope 的 LLM 评估并行执行，完成一个产出一个
+
+    Args:
+        items: (stock_code, scope) 列表，重复项只评估一次
+        force_refresh: 强制刷新，忽略缓存
+        workers: 数据采集与评估的并发数，默认取 Config.BATCH_EVALUATION_WORKERS；
+            LLM 请求数另受 LLMClient 全局并发上限约束
+
+    Yields:
+        dict: 与 analyze_stock_comprehensive 相同的结果，均含 stock_code / scope
+    """
+    items = list(dict.fromkeys(items))
+    workers = workers or Config.BATCH_EVALUATION_WORKERS
+    fetched: Dict[str, Dict[str, Any]] = {}
+
+    if force_refresh:
+        stale = {item: "force_refresh" for item in items}
+    else:
+        wanted = set(items)
+        cached_docs = [doc for doc in get_cached_evaluations(list({code for code, _ in items}))
+                       if (doc["stock_code"], doc.get("scope", "all")) in wanted]
+        triggers = check_triggers_batch(cached_docs, fetched=fetched)
+        stale = {}
+        for doc in cached_docs:
+            key = (doc["stock_code"], doc.get("scope", "all"))
+            should_refresh, reason = triggers[key]
+            if should_refresh:
+                stale[key] = reason
+            else:
+                yield dict(_cached_response(doc, "none"), stock_code=key[0], scope=key[1])
+        cached_keys = set(triggers)
+        stale.update((item, "initial") for item in items if item not in cached_keys)
+
+    if not stale:
+        return
+    logger.info("批量评估: %d 项中 %d 项需要重新评估", len(items), len(stale))
+
+    by_code: Dict[str, List[str]] = {}
+    for code, scope in stale:
+        by_code.setdefault(code, []).append(scope)
+
+    results: queue.Queue = queue.Queue()
+    submitted: List[Future] = []
+    stopped = threading.Event()
+
+    def evaluate(code, scope, data):
+        if stopped.is_set():
+            return
+        try:
+            result = _evaluate_coalesced(code, scope, stale[(code, scope)], data)
+        except Exception as e:
+            logger.error("批量评估 %s scope=%s 失败: %s", code, scope, e)
+            result = {"error": str(e)}
+        results.put(dict(result, stock_code=code, scope=scope))
+
+    def gather_then_evaluate(code, scopes):
+        try:
+            data = _gather_data(code, fetched.get(code))
+        except Exception as e:
+            logger.error("批量评估 %s 数据采集失败: %s", code, e)
+            for scope in scopes:
+                results.put({"stock_code": code, "scope": scope, "error": f"数据采集失败: {e}"})
+            return
+        # 采集线程直接评估第一个 scope，其余提交到线程池并行评估
+        for scope in scopes[1:]:
+            try:
+                submitted.append(pool.submit(evaluate, code, scope, data))
+            except RuntimeError as e:
+                # 线程池已关闭（调用方已停止迭代）
+                results.put({"stock_code": code, "scope": scope, "error": f"评估未启动: {e}"})
+        evaluate(code, scopes[0], data)
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-eval")
+    waiting = set(stale)
+    try:
+        for code, scopes in by_code.items():
+            submitted.append(pool.submit(gather_then_evaluate, code, scopes))
+        # 工作线程异常退出时不会产出结果，等待下一项超时后其余项按失败返回，不会一直阻塞
+        while waiting:
+            try:
+                result = results.get(timeout=Config.BATCH_EVALUATION_RESULT_TIMEOUT)
+            except queue.Empty:
+                logger.error("批量评估等待结果超时，%d 项未完成", len(waiting))
+                for code, scope in sorted(waiting):
+                    yield {"stock_code": code, "scope": scope, "error": "评估超时"}
+                return
+            waiting.discard((result["stock_code"], result["scope"]))
+            yield result
+    finally:
+        # 调用方提前停止迭代（如客户端断开）或等待超时后不再启动排队中的评估
+        # （shutdown 的 cancel_futures 参数需要 Python 3.9，这里逐个取消以兼容 3.8）
+        stopped.set()
+        for future in list(submitted):
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def prewarm_evaluations(
+    stock_codes: List[str],
+    scope: str = "all",
+    concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+    """预评估：批量检测缓存是否仍有效，对缺失或过期的股票重新评估
+
+    Args:
+        stock_codes: 股票代码列表
+        scope: 分析范围
+        concurrency: 同时进行的全量评估（LLM 调用）数，默认取 Config.PREWARM_LLM_CONCURRENCY
+
+    Returns:
+        统计信息：total / fresh / refreshed / failed / reasons
+    """
+    if not _API_KEY:
+        return {"error": "DEEPSEEK_API_KEY 未配置"}
+
+    stock_codes = list(dict.fromkeys(stock_codes))
+    concurrency = concurrency or Config.PREWARM_LLM_CONCURRENCY
+    start = time.perf_counter()
+
+    stats: Dict[str, Any] = {
+        "total": len(stock_codes),
+        "fresh": 0,
+        "refreshed": 0,
+        "failed": 0,
+        "reasons": {},
+    }
+    for result in evaluate_batch([(code, scope) for code in stock_codes], workers=concurrency):
+        if result.get("error"):
+            stats["failed"] += 1
+            stats["reasons"][result["stock_code"]] = result["error"]
+        elif result.get("cached"):
+            stats["fresh"] += 1
+        else:
+            stats["refreshed"] += 1
+            stats["reasons"][result["stock_code"]] = result.get("trigger_reason", "")
+
+    stats["elapsed_seconds"] = round(time.perf_counter() - start, 1)
+    logger.info("预评估完成: 有效 %d, 重新评估 %d, 失败 %d, 耗时 %.1fs",
+                stats["fresh"], stats["refreshed"], stats["failed"], stats["elapsed_seconds"])
+    return stats
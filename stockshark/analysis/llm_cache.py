@@ -0,0 +1,176 @@
+"""LLM 响应缓存（按 Prompt 内容寻址）
+
+缓存键为 sha256(prompt, model, temperature, max_tokens)：采集到的数据与上次完全相同时
+（如 force_refresh、触发了重新评估但 Prompt 输入未变），直接复用上次的响应，不再计费和等待。
+
+- 主存储: MongoDB llm_responses 集合，expires_at 上的 TTL 索引自动清理过期响应
+- 备用存储: MongoDB 不可用时写入 Config.CACHE_DIR/llm_responses/{key}.json，
+  按修改时间判断过期，条目数超过上限时淘汰最久未使用的文件
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from stockshark.config import Config
+from stockshark.data.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_key(prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+    """
+    计算 LLM 请求的缓存键
+
+    Args:
+        prompt: 完整 Prompt
+        model: 模型名
+        temperature: 采样温度
+        max_tokens: 最大输出 token 数
+
+    Returns:
+        str: sha256 十六进制摘要
+    """
+    payload = json.dumps(
+        {"prompt": prompt, "model": model, "temperature": temperature, "max_tokens": max_tokens},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """LLM 响应缓存"""
+
+    def __init__(self, ttl: Optional[int] = None, disk_dir: Optional[str] = None,
+                 max_disk_entries: Optional[int] = None):
+        """
+        Args:
+            ttl: 响应有效期（秒），默认取 Config.LLM_CACHE_TTL，<= 0 表示不缓存
+            disk_dir: 本地备用目录，默认 Config.CACHE_DIR/llm_responses
+            max_disk_entries: 本地最多保留的条目数，默认取 Config.LLM_CACHE_MAX_DISK_ENTRIES
+        """
+        self.ttl = Config.LLM_CACHE_TTL if ttl is None else ttl
+        self.disk_dir = disk_dir or os.path.join(Config.CACHE_DIR, "llm_responses")
+        self.max_disk_entries = max_disk_entries or Config.LLM_CACHE_MAX_DISK_ENTRIES
+        self._index_ready = False
+        self._lock = threading.Lock()
+
+    def _get_collection(self):
+        db = DatabaseManager.get_mongodb_connection()
+        if db is None:
+            return None
+        coll = db["llm_responses"]
+        if not self._index_ready:
+            try:
+                coll.create_index("expires_at", expireAfterSeconds=0, name="idx_llm_response_ttl")
+                self._index_ready = True
+            except Exception as e:
+                logger.warning("llm_responses 索引创建失败: %s", e)
+        return coll
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存的响应
+
+        Args:
+            key: prompt_key() 计算的缓存键
+
+        Returns:
+            str: 响应文本，未命中或已过期返回 None
+        """
+        if self.ttl <= 0:
+            return None
+        try:
+            coll = self._get_collection()
+            if coll is not None:
+                # TTL 索引每分钟清理一次，过期但尚未删除的文档在查询时排除
+                doc = coll.find_one({"_id": key, "expires_at": {"$gt": datetime.now()}})
+                return doc["response"] if doc else None
+        except Exception as e:
+            logger.warning("读取 LLM 响应缓存失败，改用本地缓存: %s", e)
+        return self._disk_get(key)
+
+    def set(self, key: str, response: str, model: str = ""):
+        """
+        写入响应
+
+        Args:
+            key: prompt_key() 计算的缓存键
+            response: 响应文本
+            model: 模型名（仅作记录）
+        """
+        if self.ttl <= 0:
+            return
+        now = datetime.now()
+        try:
+            coll = self._get_collection()
+            if coll is not None:
+                coll.update_one(
+                    {"_id": key},
+                    {"$set": {"response": response, "model": model, "created_at": now,
+                              "expires_at": now + timedelta(seconds=self.ttl)}},
+                    upsert=True,
+                )
+                return
+        except Exception as e:
+            logger.warning("写入 LLM 响应缓存失败，改用本地缓存: %s", e)
+        self._disk_set(key, response)
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                response = json.load(f)["response"]
+            # 命中时更新访问时间，淘汰按最久未使用进行；过期按写入时间（mtime）判断
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+            return response
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("本地 LLM 响应缓存读取失败: %s", e)
+            return None
+
+    def _disk_set(self, key: str, response: str):
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"response": response}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict()
+        except Exception as e:
+            logger.warning("本地 LLM 响应缓存写入失败: %s", e)
+
+    def _evict(self):
+        """删除过期条目；仍超过上限时按最近访问时间淘汰"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.disk_dir):
+                if not entry.name.endswith(".json"):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.ttl:
+                    os.remove(entry.path)
+                else:
+                    entries.append((stat.st_atime, entry.path))
+            overflow = len(entries) - self.max_disk_entries
+            if overflow > 0:
+                for _, path in sorted(entries)[:overflow]:
+                    os.remove(path)
+
+
+# 创建全局实例
+llm_response_cache = LLMResponseCache()
@@ -0,0 +1,247 @@
+"""DeepSeek LLM 客户端
+
+- 连接复用: 进程内共享一个 requests.Session（HTTPAdapter 连接池），避免每次调用重新握手
+- 并发上限: 全局信号量限制同时进行的 LLM 请求数，批量评估可放心并行提交
+- 重试: 429 / 5xx / 连接错误按带抖动的指数退避重试，优先遵循 Retry-After（不超过最长退避时间）；
+  退避等待期间释放并发名额，不阻塞其他请求
+- 流式: stream=True 时按 SSE 增量读取，可通过 on_delta 回调逐段输出
+- 指标: 记录每次调用的耗时、排队等待、重试次数与 token 用量，stats() 汇总
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from stockshark.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 可重试的 HTTP 状态码
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMClient:
+    """OpenAI 兼容接口的 LLM 客户端（线程安全）"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 model: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 max_retries: Optional[int] = None, retry_backoff: Optional[float] = None,
+                 connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None):
+        """
+        Args:
+            api_key: API Key，默认取环境变量 DEEPSEEK_API_KEY
+            base_url: 接口地址，默认取环境变量 DEEPSEEK_BASE_URL
+            model: 模型名，默认取环境变量 DEEPSEEK_MODEL
+            max_concurrency: 同时进行的请求数上限，默认取 Config.LLM_MAX_CONCURRENCY
+            max_retries: 失败重试次数，默认取 Config.LLM_MAX_RETRIES
+            retry_backoff: 重试退避基数（秒），默认取 Config.LLM_RETRY_BACKOFF
+            connect_timeout: 连接超时（秒），默认取 Config.LLM_CONNECT_TIMEOUT
+            read_timeout: 读取超时（秒，流式时为两段数据之间的间隔），默认取 Config.LLM_READ_TIMEOUT
+        """
+        self.api_key = api_key if api_key is not None else os.getenv("DEEPSEEK_API_KEY", "")
+        self.base_url = base_url or os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+        self.model = model or os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.max_retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_backoff = Config.LLM_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        self.timeout = (connect_timeout or Config.LLM_CONNECT_TIMEOUT,
+                        read_timeout or Config.LLM_READ_TIMEOUT)
+
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latencies = deque(maxlen=1000)
+        self._stats = {
+            "calls": 0,
+            "failures": 0,
+            "retries": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_latency_ms": 0.0,
+            "total_queue_ms": 0.0,
+        }
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """重试等待时间：优先使用 Retry-After（不超过最长指数退避时间），否则指数退避加抖动"""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.retry_backoff * (2 ** self.max_retries))
+            except ValueError:
+                pass
+        return self.retry_backoff * (2 ** attempt) * (0.5 + random.random())
+
+    def _post(self, payload: Dict[str, Any],
+              stream: bool) -> Tuple[Optional[requests.Response], Optional[Exception], Optional[str]]:
+        """
+        发送一次请求
+
+        Returns:
+            tuple: (成功的响应, None, None) 或 (None, 可重试的错误, Retry-After 头)
+
+        Raises:
+            requests.HTTPError: 不可重试的 HTTP 错误
+        """
+        try:
+            resp = self._session.post(
+                f"{self.base_url}/v1/chat/completions",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                json=payload, timeout=self.timeout, stream=stream,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            return None, e, None
+        if resp.status_code not in RETRY_STATUS:
+            resp.raise_for_status()
+            return resp, None, None
+        error = requests.HTTPError(f"{resp.status_code} {resp.reason}", response=resp)
+        resp.close()
+        return None, error, resp.headers.get("Retry-After")
+
+    @staticmethod
+    def _read_stream(resp: requests.Response,
+                     on_delta: Optional[Callable[[str], None]]) -> Dict[str, Any]:
+        """读取 SSE 流，拼接增量内容"""
+        parts: List[str] = []
+        usage = {}
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            usage = chunk.get("usage") or usage
+            for choice in chunk.get("choices", []):
+                delta = choice.get("delta", {}).get("content")
+                if delta:
+                    parts.append(delta)
+                    if on_delta is not None:
+                        on_delta(delta)
+        return {"content": "".join(parts), "usage": usage}
+
+    def chat(self, prompt: str, max_tokens: int = 4000, temperature: float = 0.3,
+             stream: bool = False, on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        调用对话补全接口
+
+        Args:
+            prompt: 用户消息
+            max_tokens: 最大输出 token 数
+            temperature: 采样温度
+            stream: 是否流式读取
+            on_delta: 流式时每收到一段内容的回调
+
+        Returns:
+            dict: content、usage（prompt_tokens/completion_tokens）、latency_ms、queue_ms
+
+        Raises:
+            requests.RequestException: 重试耗尽后仍失败
+        """
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+
+        queued_at = time.perf_counter()
+        start = None
+        attempt = 0
+        while True:
+            with self._semaphore:
+                if start is None:
+                    start = time.perf_counter()
+                with self._lock:
+                    self._in_flight += 1
+                try:
+                    resp, error, retry_after = self._post(payload, stream)
+                    if resp is not None:
+                        with resp:
+                            if stream:
+                                result = self._read_stream(resp, on_delta)
+                            else:
+                                body = resp.json()
+                                result = {"content": body["choices"][0]["message"]["content"],
+                                          "usage": body.get("usage") or {}}
+                        break
+                except Exception:
+                    with self._lock:
+                        self._stats["failures"] += 1
+                    raise
+                finally:
+                    with self._lock:
+                        self._in_flight -= 1
+
+            # 可重试的错误：已释放并发名额，退避期间其他请求可以继续
+            if attempt >= self.max_retries:
+                with self._lock:
+                    self._stats["failures"] += 1
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            with self._lock:
+                self._stats["retries"] += 1
+            logger.warning("LLM 请求失败（%s），%.1fs 后第 %d 次重试", error, delay, attempt)
+            time.sleep(delay)
+
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        result["queue_ms"] = round((start - queued_at) * 1000, 1)
+        self._record(result)
+        return result
+
+    def complete(self, prompt: str, max_tokens: int = 4000, temperature: float = 0.3) -> str:
+        """调用对话补全接口，只返回文本"""
+        return self.chat(prompt, max_tokens=max_tokens, temperature=temperature)["content"]
+
+    def _record(self, result: Dict[str, Any]):
+        usage = result["usage"]
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            self._stats["completion_tokens"] += usage.get("completion_tokens", 0)
+            self._stats["total_latency_ms"] += result["latency_ms"]
+            self._stats["total_queue_ms"] += result["queue_ms"]
+            self._latencies.append(result["latency_ms"])
+        logger.info("LLM 调用完成: %.0fms（排队 %.0fms），tokens %s/%s",
+                    result["latency_ms"], result["queue_ms"],
+                    usage.get("prompt_tokens", "-"), usage.get("completion_tokens", "-"))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取调用统计
+
+        Returns:
+            dict: 调用/失败/重试次数、token 用量、平均及 p50/p95 耗时、当前并发
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+            stats["in_flight"] = self._in_flight
+        stats["max_concurrency"] = self.max_concurrency
+        calls = stats["calls"]
+        stats["avg_latency_ms"] = round(stats["total_latency_ms"] / calls, 1) if calls else 0.0
+        stats["avg_queue_ms"] = round(stats["total_queue_ms"] / calls, 1) if calls else 0.0
+        stats["p50_latency_ms"] = latencies[len(latencies) // 2] if latencies else 0.0
+        stats["p95_latency_ms"] = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+        stats["total_latency_ms"] = round(stats["total_latency_ms"], 1)
+        stats["total_queue_ms"] = round(stats["total_queue_ms"], 1)
+        return stats
+
+
+# 创建全局实例
+deepseek_client = LLMClient()
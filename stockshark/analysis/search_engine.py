@@ -7,9 +7,13 @@
 """
 
 import pandas as pd
+from datetime import datetime
 from typing import Dict, List, Any, Optional
 from stockshark.data.akshare_data import AkShareData
+from stockshark.data.board_catalog import concept_catalog, industry_catalog
+from stockshark.data.spot_snapshot import spot_snapshot
 from stockshark.data.data_processor import DataProcessor
+from stockshark.analysis.search_index import stock_search_index
 
 class SearchEngine:
     """
@@ -26,8 +30,8 @@ class SearchEngine:
         limit: int = 20
     ) -> Dict[str, Any]:
         """
-        按股票代码或名称搜索
-        :param keyword: 关键词（代码或名称）
+        按股票代码、名称或拼音首字母搜索
+        :param keyword: 关键词（代码、名称或拼音）
         :param limit: 返回结果数量限制
         :return: 搜索结果
         """
@@ -38,59 +42,16 @@ class SearchEngine:
         }
         
         try:
-            # 尝试按代码搜索
-            if keyword.isdigit() and len(keyword) == 6:
-                stock_info = self.ak_data.get_stock_basic_info(keyword)
-                if stock_info:
-                    result['results'].append(stock_info)
-            
-            # 获取所有股票列表
-            # 使用行业和概念数据进行搜索
-            industries = self.ak_data.get_all_industries()
-            all_stocks = []
-            
-            # 处理所有行业（移除限制）
-            for industry in industries:
-                stocks = self.ak_data.get_industry_stocks(industry)
-                if stocks:
-                    all_stocks.extend(stocks)
-            
-            # 按名称模糊搜索
-            for stock in all_stocks:
-                stock_name = stock.get('名称', '')
-                if keyword.lower() in stock_name.lower():
-                    if len(result['results']) < limit:
-                        result['results'].append({
-                            'code': stock.get('代码', ''),
-                            'name': stock_name,
-                            'price': stock.get('最新价', 0),
-                            'change_pct': stock.get('涨跌幅', 0)
-                        })
-            
-            # 如果通过行业搜索结果不足，尝试通过概念搜索
-            if len(result['results']) < limit:
-                concepts = self.ak_data.get_all_concepts()
-                for concept in concepts:
-                    try:
-                        concept_stocks = self.ak_data.get_concept_stocks(concept)
-                        if concept_stocks:
-                            for stock in concept_stocks:
-                                stock_name = stock.get('名称', '')
-                                if keyword.lower() in stock_name.lower():
-                                    # 检查是否已存在
-                                    existing = any(
-                                        r['code'] == stock.get('代码', '') 
-                                        for r in result['results']
-                                    )
-                                    if not existing and len(result['results']) < limit:
-                                        result['results'].append({
-                                            'code': stock.get('代码', ''),
-                                            'name': stock_name,
-                                            'price': stock.get('最新价', 0),
-                                            'change_pct': stock.get('涨跌幅', 0)
-                                        })
-                    except Exception as e:
-                        continue
+            # 从内存搜索索引匹配代码/名称/拼音，行情取自共享快照
+            for stock in stock_search_index.search(keyword, limit):
+                quote = spot_snapshot.get_row(stock['code']) or {}
+                result['results'].append({
+                    'code': stock['code'],
+                    'name': stock['name'],
+                    'industry': stock['industry'],
+                    'price': quote.get('最新价', 0),
+                    'change_pct': quote.get('涨跌幅', 0)
+                })
             
             result['total'] = len(result['results'])
             
@@ -363,6 +324,22 @@ class SearchEngine:
         except Exception as e:
             print(f"获取概念列表失败: {e}")
             return []
+    
+    def get_board_catalog(self, kind: str) -> Dict[str, Any]:
+        """
+        获取板块目录（名称、代码、成分股数量）
+        :param kind: 板块类型（industry 或 concept）
+        :return: 板块列表及目录刷新时间
+        """
+        catalog = industry_catalog if kind == 'industry' else concept_catalog
+        try:
+            boards = catalog.entries()
+        except Exception as e:
+            print(f"获取板块目录失败: {e}")
+            boards = []
+        updated_at = datetime.fromtimestamp(catalog.updated_at).strftime('%Y-%m-%d %H:%M:%S') \
+            if catalog.updated_at else None
+        return {'boards': boards, 'total': len(boards), 'updated_at': updated_at}
 
 # 创建全局实例
 search_engine = SearchEngine()
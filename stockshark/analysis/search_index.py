@@ -0,0 +1,163 @@
+"""股票名称/拼音内存搜索索引
+
+原关键词搜索每次都要拉取全部行业、概念板块的成分股再逐个做子串匹配。这里基于
+股票代码表和板块成分数据构建内存索引：
+- 每只股票的检索键为 代码、名称、拼音首字母、全拼（pypinyin 可选）
+- 按字符建立倒排表，查询时对关键词各字符的倒排表求交集，再做子串校验
+- 索引过期后在后台线程重建，查询始终使用当前可用的索引
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from stockshark.config import Config
+from stockshark.data.board_index import concept_index, industry_index
+from stockshark.data.symbol_index import symbol_index
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pragma: no cover - 拼音检索为可选功能
+    lazy_pinyin = None
+
+logger = logging.getLogger(__name__)
+
+
+def _search_keys(code: str, name: str) -> List[str]:
+    """生成一只股票的检索键（均为小写）"""
+    keys = [code, name.lower()]
+    if lazy_pinyin is not None:
+        # 去掉名称中的空格和*ST等符号前缀对拼音的干扰
+        compact = name.replace(" ", "").replace("*", "")
+        keys.append("".join(lazy_pinyin(compact, style=Style.FIRST_LETTER)).lower())
+        keys.append("".join(lazy_pinyin(compact)).lower())
+    return keys
+
+
+class StockSearchIndex:
+    """股票名称/拼音搜索索引（进程内共享）"""
+
+    def __init__(self, ttl: Optional[int] = None):
+        """
+        Args:
+            ttl: 索引刷新周期（秒），默认取 Config.SEARCH_INDEX_TTL
+        """
+        self.ttl = Config.SEARCH_INDEX_TTL if ttl is None else ttl
+        self._entries: List[dict] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _build(self):
+        start = time.perf_counter()
+        stocks: Dict[str, str] = {s["code"]: s["name"] for s in symbol_index.all_stocks()}
+
+        # 补充只出现在板块成分中的股票；板块索引未就绪时不在此处触发构建
+        for board_index in (industry_index, concept_index):
+            if board_index.is_ready():
+                for code, name in board_index.all_members().items():
+                    stocks.setdefault(code, name)
+
+        industry_ready = industry_index.is_ready()
+        entries = []
+        postings: Dict[str, Set[int]] = {}
+        for idx, code in enumerate(sorted(stocks)):
+            name = stocks[code]
+            keys = _search_keys(code, name)
+            industries = industry_index.get_boards(code, limit=1) if industry_ready else []
+            entries.append({
+                "code": code,
+                "name": name,
+                "industry": industries[0] if industries else "",
+                "keys": keys,
+            })
+            for char in set("".join(keys)):
+                postings.setdefault(char, set()).add(idx)
+
+        self._entries = entries
+        self._postings = postings
+        self._built_at = time.time()
+        logger.info("搜索索引已构建: %d 只股票, 耗时 %.0fms",
+                    len(entries), (time.perf_counter() - start) * 1000)
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self._build()
+            except Exception as e:
+                logger.warning("搜索索引后台刷新失败: %s", e)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name="stock-search-index", daemon=True).start()
+
+    def _ensure_built(self):
+        if not self._entries:
+            with self._lock:
+                if not self._entries:
+                    self._build()
+            return
+        if time.time() - self._built_at >= self.ttl:
+            self._refresh_in_background()
+
+    def refresh(self):
+        """同步重建索引"""
+        self._build()
+
+    def search(self, keyword: str, limit: int = 20) -> List[dict]:
+        """
+        按代码、名称或拼音搜索股票
+
+        Args:
+            keyword: 关键词
+            limit: 返回数量限制
+
+        Returns:
+            list: 匹配的股票，每项包含 code、name、industry；
+                  代码完全匹配优先，其次为前缀匹配
+        """
+        keyword = keyword.strip().lower()
+        if not keyword:
+            return []
+        self._ensure_built()
+
+        entries, postings = self._entries, self._postings
+        candidates: Optional[Set[int]] = None
+        for char in set(keyword):
+            ids = postings.get(char)
+            if not ids:
+                return []
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+
+        matches = []
+        for idx in candidates:
+            entry = entries[idx]
+            if entry["code"] == keyword:
+                rank = 0
+            elif any(key.startswith(keyword) for key in entry["keys"]):
+                rank = 1
+            elif any(keyword in key for key in entry["keys"]):
+                rank = 2
+            else:
+                continue
+            matches.append((rank, idx))
+
+        matches.sort()
+        return [
+            {"code": entries[idx]["code"], "name": entries[idx]["name"],
+             "industry": entries[idx]["industry"]}
+            for _, idx in matches[:limit]
+        ]
+
+
+# 创建全局实例
+stock_search_index = StockSearchIndex()
@@ -7,9 +7,12 @@
 """
 
 import pandas as pd
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from stockshark.config import Config
 from stockshark.data.akshare_data import AkShareData
 from stockshark.data.data_processor import DataProcessor
+from stockshark.data.spot_snapshot import spot_snapshot
 
 class StockAnalyzer:
     """
@@ -26,6 +29,31 @@ class StockAnalyzer:
         :param symbol: 股票代码
         :return: 分析结果
         """
+        try:
+            fetched = self._fetch_stock_data(symbol)
+        except Exception as e:
+            fetched = e
+        return self._build_result(symbol, fetched)
+    
+    def _fetch_stock_data(self, symbol: str) -> Tuple[Any, Any, Any]:
+        """
+        获取单只股票的基本信息、实时行情和估值数据
+        :param symbol: 股票代码
+        :return: (basic_info, quote_data, valuation_data)
+        """
+        basic_info = self.ak_data.get_stock_basic_info(symbol)
+        quote_data = self.ak_data.get_stock_quote(symbol)
+        valuation_data = self.ak_data.get_stock_valuation_data(symbol)
+        return basic_info, quote_data, valuation_data
+    
+    def _build_result(self, symbol: str, fetched, scores: Optional[Tuple[Dict, Dict]] = None) -> Dict[str, Any]:
+        """
+        根据已获取的数据计算评分并生成分析结果
+        :param symbol: 股票代码
+        :param fetched: _fetch_stock_data 的返回值，获取失败时为异常
+        :param scores: 批量计算好的 (投资价值评分, 风险评分)，为空时单独计算
+        :return: 分析结果
+        """
         result = {
             'symbol': symbol,
             'basic_info': None,
@@ -37,19 +65,17 @@ class StockAnalyzer:
         }
         
         try:
-            # 获取股票基本信息
-            basic_info = self.ak_data.get_stock_basic_info(symbol)
+            if isinstance(fetched, Exception):
+                raise fetched
+            basic_info, quote_data, valuation_data = fetched
+            
             if basic_info:
                 result['basic_info'] = basic_info
             
-            # 获取实时行情数据
-            quote_data = self.ak_data.get_stock_quote(symbol)
             if quote_data:
                 cleaned_quote = self.data_processor.clean_stock_quote(quote_data)
                 result['quote_data'] = cleaned_quote
             
-            # 获取估值数据
-            valuation_data = self.ak_data.get_stock_valuation_data(symbol)
             if valuation_data:
                 result['valuation_data'] = valuation_data
             
@@ -58,13 +84,12 @@ class StockAnalyzer:
                 basic_info, quote_data, valuation_data
             )
             
-            # 计算投资价值评分
+            # 计算投资价值评分与风险评分
             if integrated_data:
-                investment_score = self.data_processor.calculate_investment_score(integrated_data)
+                if scores is None:
+                    scores = self.data_processor.score_records([integrated_data])[0]
+                investment_score, risk_score = scores
                 result['investment_score'] = investment_score
-                
-                # 计算风险评分
-                risk_score = self.data_processor.calculate_risk_score(integrated_data)
                 result['risk_score'] = risk_score
                 
                 # 生成分析摘要
@@ -119,19 +144,46 @@ class StockAnalyzer:
         
         return "\n".join(summary_parts)
     
-    def batch_analyze_stocks(self, symbols: List[str]) -> List[Dict[str, Any]]:
+    def batch_analyze_stocks(self, symbols: List[str], workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         批量分析多只股票
+        
+        全市场行情快照只拉取一次，各股票的基本信息/估值在线程池中并行获取，
+        全部获取完成后一次性向量化计算评分。
         :param symbols: 股票代码列表
-        :return: 分析结果列表
+        :param workers: 并发数，默认取 Config.ANALYZE_BATCH_WORKERS
+        :return: 分析结果列表，与 symbols 顺序一致
         """
-        results = []
+        if not symbols:
+            return []
+        
+        # 预先加载行情快照，避免各线程同时触发全市场下载
+        try:
+            spot_snapshot.get_frame()
+        except Exception as e:
+            print(f"加载行情快照失败: {e}")
+        
+        def fetch(symbol):
+            try:
+                return self._fetch_stock_data(symbol)
+            except Exception as e:
+                return e
         
-        for symbol in symbols:
-            result = self.analyze_stock(symbol)
-            results.append(result)
+        # 相同代码只获取一次
+        unique_symbols = list(dict.fromkeys(symbols))
+        workers = min(workers or Config.ANALYZE_BATCH_WORKERS, len(unique_symbols))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-analyze") as pool:
+            fetched = dict(zip(unique_symbols, pool.map(fetch, unique_symbols)))
+        
+        # 所有股票的评分一次性向量化计算
+        integrated = {
+            symbol: self.data_processor.integrate_stock_data(*data)
+            for symbol, data in fetched.items() if not isinstance(data, Exception)
+        }
+        integrated = {symbol: data for symbol, data in integrated.items() if data}
+        scores = dict(zip(integrated, self.data_processor.score_records(list(integrated.values()))))
         
-        return results
+        return [self._build_result(symbol, fetched[symbol], scores.get(symbol)) for symbol in symbols]
     
     def analyze_industry_stocks(
         self, 
@@ -0,0 +1,93 @@
+"""GET 接口响应缓存（ETag / 304）
+
+看板会定时轮询 /stock/by-industry、/industries 等只读接口，每次请求都从头计算。
+这里为幂等 GET 路由提供装饰器：
+- 以路径 + 规范化的查询参数（排序后）为键，在进程内 LRU + TTL 缓存中保存成功响应
+- 每个路由可单独指定有效期，默认取 Config.CACHE_DEFAULT_TIMEOUT
+- 响应带 ETag（响应体摘要）和 Cache-Control；请求的 If-None-Match 匹配时返回 304，不再传输响应体
+- 路由可指定 cacheable 判断响应 JSON 是否缓存（如上游临时失败返回空列表时不缓存），
+  不缓存的响应 max-age 为 0，客户端和代理也不会保留
+- Config.CACHE_TYPE = 'null' 时关闭缓存（仍计算 ETag 并支持 304）
+"""
+
+import functools
+import hashlib
+from typing import Any, Callable, Optional
+
+from flask import Response, make_response, request
+
+from stockshark.config import Config
+from stockshark.utils.cache import TTLCache
+
+# 创建全局实例
+response_cache = TTLCache("http_response", max_entries=Config.RESPONSE_CACHE_MAX_ENTRIES,
+                          ttl=Config.CACHE_DEFAULT_TIMEOUT)
+
+
+def _cache_key() -> tuple:
+    """路径 + 排序后的查询参数（参数顺序不同的相同请求共用一个条目）"""
+    args = tuple(sorted((k, v) for k, values in request.args.lists() for v in values))
+    return (request.path,) + args
+
+
+def _etag(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()
+
+
+def _finalize(body: bytes, status: int, mimetype: str, etag: str, timeout: int, hit: bool) -> Response:
+    """构造响应；If-None-Match 匹配时返回 304"""
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, status=status, mimetype=mimetype)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = timeout
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+def has_data(payload: Any) -> bool:
+    """cacheable 判断：响应 JSON 的 data 非空（数据源异常被吞掉、返回空列表时不缓存）"""
+    return bool(isinstance(payload, dict) and payload.get("data"))
+
+
+def cached_response(timeout: Optional[int] = None,
+                    cacheable: Optional[Callable[[Any], bool]] = None):
+    """
+    GET 路由响应缓存装饰器（放在 @bp.route 之下）
+
+    只缓存 200 响应，错误响应原样返回；流式响应不缓存。
+
+    Args:
+        timeout: 有效期（秒），默认取 Config.CACHE_DEFAULT_TIMEOUT
+        cacheable: 以解析后的响应 JSON（非 JSON 响应为 None）调用，返回 False 时不缓存；
+            None 表示缓存所有 200 响应
+    """
+    timeout = Config.CACHE_DEFAULT_TIMEOUT if timeout is None else timeout
+    enabled = Config.CACHE_TYPE != "null" and timeout > 0
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET":
+                return view(*args, **kwargs)
+
+            key = _cache_key()
+            if enabled:
+                cached = response_cache.get(key)
+                if cached is not None:
+                    return _finalize(*cached, timeout=timeout, hit=True)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            entry = (body, response.status_code, response.mimetype, _etag(body))
+            if cacheable is not None and not cacheable(response.get_json(silent=True)):
+                return _finalize(*entry, timeout=0, hit=False)
+            if enabled:
+                response_cache.set(key, entry, ttl=timeout)
+            return _finalize(*entry, timeout=timeout, hit=False)
+        return wrapper
+    return decorator
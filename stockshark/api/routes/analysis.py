@@ -2,7 +2,12 @@
 股票分析相关API路由
 """
 
-from flask import Blueprint, request, jsonify
+import json
+import time
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from stockshark.api.response_cache import cached_response, has_data, response_cache
+from stockshark.config import Config
 from stockshark.data.akshare_data import AkShareData
 from stockshark.data.data_processor import DataProcessor
 from stockshark.analysis.stock_analyzer import StockAnalyzer
@@ -98,6 +103,7 @@ def analyze_stocks_batch():
 
 
 @analysis_bp.route('/stock/valuation', methods=['GET'])
+@cached_response(cacheable=has_data)
 def get_stock_valuation():
     """
     获取股票估值数据
@@ -137,6 +143,7 @@ def get_stock_valuation():
 
 
 @analysis_bp.route('/stock/financial', methods=['GET'])
+@cached_response(timeout=3600, cacheable=has_data)
 def get_stock_financial():
     """
     获取股票财务数据
@@ -178,6 +185,7 @@ def get_stock_financial():
 
 
 @analysis_bp.route('/stock/quote', methods=['GET'])
+@cached_response(timeout=Config.SPOT_SNAPSHOT_TTL)
 def get_stock_quote():
     """
     获取股票实时行情
@@ -215,6 +223,7 @@ def get_stock_quote():
 
 
 @analysis_bp.route('/stock/basic', methods=['GET'])
+@cached_response(timeout=3600)
 def get_stock_basic():
     """
     获取股票基本信息（优先从数据库查询）
@@ -252,6 +261,7 @@ def get_stock_basic():
 
 
 @analysis_bp.route('/stock/history', methods=['GET'])
+@cached_response(cacheable=has_data)
 def get_stock_history():
     """
     获取股票历史行情数据
@@ -305,6 +315,7 @@ def get_stock_history():
 
 
 @analysis_bp.route('/stock/sectors', methods=['GET'])
+@cached_response(timeout=600)
 def get_stock_sectors():
     """
     获取股票所属的行业和概念信息（优先从数据库查询）
@@ -370,3 +381,82 @@ def comprehensive_analysis():
         return jsonify(result), 500
 
     return jsonify(result), 200
+
+
+@analysis_bp.route('/stock/comprehensive/batch', methods=['POST'])
+def comprehensive_analysis_batch():
+    """批量 LLM 综合分析，以 NDJSON 流式返回（每行一个结果，按完成顺序）
+
+    POST /api/analysis/stock/comprehensive/batch
+    Body: {"stock_codes": ["603009", "600519"], "scopes": ["all"], "force_refresh": false}
+    scopes: 对每只股票分析的范围列表(可选,默认["all"])，也可用 "scope" 传单个范围
+    缓存有效的结果立即返回；最后一行为汇总 {"done": true, ...}
+    """
+    from stockshark.analysis.evaluation_cache import record_request
+    from stockshark.analysis.llm_analyzer import evaluate_batch
+    from stockshark.analysis.llm_client import deepseek_client
+    from stockshark.config import Config
+
+    data = request.get_json() or {}
+    stock_codes = data.get('stock_codes') or []
+    if not isinstance(stock_codes, list) or not stock_codes:
+        return jsonify({"error": "stock_codes 必填且必须是数组"}), 400
+    scopes = data.get('scopes') or [data.get('scope', 'all')]
+    if not isinstance(scopes, list):
+        return jsonify({"error": "scopes 必须是数组"}), 400
+
+    items = list(dict.fromkeys((str(code), scope) for code in stock_codes for scope in scopes))
+    if len(items) > Config.BATCH_EVALUATION_MAX_ITEMS:
+        return jsonify({"error": f"单次最多分析 {Config.BATCH_EVALUATION_MAX_ITEMS} 项"}), 400
+    if not deepseek_client.api_key:
+        return jsonify({"error": "DEEPSEEK_API_KEY 未配置"}), 500
+
+    for code, scope in items:
+        try:
+            record_request(code, scope)
+        except Exception:
+            pass
+
+    force_refresh = bool(data.get('force_refresh', False))
+
+    def generate():
+        start = time.perf_counter()
+        summary = {"done": True, "total": len(items), "cached": 0, "evaluated": 0, "failed": 0}
+        for result in evaluate_batch(items, force_refresh=force_refresh):
+            if result.get('error'):
+                summary['failed'] += 1
+            elif result.get('cached'):
+                summary['cached'] += 1
+            else:
+                summary['evaluated'] += 1
+            yield json.dumps(result, ensure_ascii=False, default=str) + '\n'
+        summary['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        yield json.dumps(summary, ensure_ascii=False) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no'})
+
+
+@analysis_bp.route('/llm/stats', methods=['GET'])
+def llm_stats():
+    """LLM 调用统计（耗时、排队、重试、token 用量）
+
+    GET /api/analysis/llm/stats
+    """
+    from stockshark.analysis.llm_client import deepseek_client
+
+    return jsonify({'success': True, 'data': deepseek_client.stats()})
+
+
+@analysis_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """股票数据查询缓存和接口响应缓存统计（命中率、条目数、内存占用）
+
+    GET /api/analysis/cache/stats
+    """
+    from stockshark.utils.cache import stock_cache
+
+    return jsonify({'success': True, 'data': {
+        'stock_service': stock_cache.stats(),
+        'http_response': response_cache.stats(),
+    }})
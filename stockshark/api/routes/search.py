@@ -3,6 +3,7 @@
 """
 
 from flask import Blueprint, request, jsonify
+from stockshark.api.response_cache import cached_response
 from stockshark.analysis.search_engine import SearchEngine
 
 search_bp = Blueprint('search', __name__)
@@ -11,7 +12,19 @@ search_bp = Blueprint('search', __name__)
 search_engine = SearchEngine()
 
 
+def _has_results(payload):
+    """搜索结果非空时才缓存响应（成分股或行情临时获取失败时不把空结果缓存下来）"""
+    return bool(payload and (payload.get('data') or {}).get('results'))
+
+
+def _has_boards(payload):
+    """板块列表（或 detail=1 时的板块目录）非空时才缓存响应"""
+    data = payload.get('data') if payload else None
+    return bool(data.get('boards') if isinstance(data, dict) else data)
+
+
 @search_bp.route('/stock/by-industry', methods=['GET'])
+@cached_response(timeout=60, cacheable=_has_results)
 def search_by_industry():
     """
     按行业搜索股票
@@ -126,6 +139,7 @@ def search_by_industry():
 
 
 @search_bp.route('/stock/by-concept', methods=['GET'])
+@cached_response(timeout=60, cacheable=_has_results)
 def search_by_concept():
     """
     按概念搜索股票
@@ -240,6 +254,7 @@ def search_by_concept():
 
 
 @search_bp.route('/stock/by-theme', methods=['GET'])
+@cached_response(timeout=60)
 def search_by_theme():
     """
     按主题搜索股票
@@ -354,6 +369,7 @@ def search_by_theme():
 
 
 @search_bp.route('/stock/by-keyword', methods=['GET'])
+@cached_response()
 def search_by_keyword():
     """
     按关键词搜索股票
@@ -394,12 +410,18 @@ def search_by_keyword():
 
 
 @search_bp.route('/industries', methods=['GET'])
+@cached_response(timeout=3600, cacheable=_has_boards)
 def get_industries():
     """
     获取所有行业列表
+    参数:
+    - detail: 为 1 时返回板块目录（名称、代码、成分股数量）及刷新时间
     """
     try:
-        result = search_engine.get_all_industries()
+        if request.args.get('detail') == '1':
+            result = search_engine.get_board_catalog('industry')
+        else:
+            result = search_engine.get_all_industries()
         
         return jsonify({
             'success': True,
@@ -414,12 +436,18 @@ def get_industries():
 
 
 @search_bp.route('/concepts', methods=['GET'])
+@cached_response(timeout=3600, cacheable=_has_boards)
 def get_concepts():
     """
     获取所有概念列表
+    参数:
+    - detail: 为 1 时返回板块目录（名称、代码、成分股数量）及刷新时间
     """
     try:
-        result = search_engine.get_all_concepts()
+        if request.args.get('detail') == '1':
+            result = search_engine.get_board_catalog('concept')
+        else:
+            result = search_engine.get_all_concepts()
         
         return jsonify({
             'success': True,
@@ -16,6 +16,13 @@ class Config:
     MYSQL_PASSWORD = os.environ.get('MYSQL_PASSWORD') or 'password'
     MYSQL_DATABASE = os.environ.get('MYSQL_DATABASE') or 'stock_analysis_system'
     
+    # MySQL 连接池：最大连接数、借用超时、空闲回收、最长存活、健康检查间隔（秒）
+    MYSQL_POOL_SIZE = int(os.environ.get('MYSQL_POOL_SIZE') or 10)
+    MYSQL_POOL_TIMEOUT = float(os.environ.get('MYSQL_POOL_TIMEOUT') or 10)
+    MYSQL_POOL_IDLE_TIMEOUT = int(os.environ.get('MYSQL_POOL_IDLE_TIMEOUT') or 300)
+    MYSQL_POOL_MAX_LIFETIME = int(os.environ.get('MYSQL_POOL_MAX_LIFETIME') or 3600)
+    MYSQL_POOL_PING_INTERVAL = int(os.environ.get('MYSQL_POOL_PING_INTERVAL') or 30)
+    
     MONGODB_HOST = os.environ.get('MONGODB_HOST') or 'localhost'
     MONGODB_PORT = int(os.environ.get('MONGODB_PORT') or 27017)
     MONGODB_DATABASE = os.environ.get('MONGODB_DATABASE') or 'stock_analysis_system'
@@ -24,8 +31,118 @@ class Config:
     
     API_PREFIX = '/api'
     
-    CACHE_TYPE = 'simple'
-    CACHE_DEFAULT_TIMEOUT = 300
+    # GET 接口响应缓存：simple 为进程内缓存，null 关闭；默认有效期（秒），各路由可单独指定
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'simple'
+    CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT') or 300)
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES') or 1024)
+    
+    # 批量写入：每个事务的行数，及是否使用 LOAD DATA LOCAL INFILE
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE') or 1000)
+    BULK_USE_LOAD_DATA = os.environ.get('BULK_USE_LOAD_DATA', 'False') == 'True'
+    
+    # 并行爬取：worker 数、上游接口限流（每秒请求数、突发容量）、单只股票重试次数与退避基数（秒）、
+    # worker 到写入线程的队列长度
+    CRAWL_WORKERS = int(os.environ.get('CRAWL_WORKERS') or 8)
+    CRAWL_RATE_LIMIT = float(os.environ.get('CRAWL_RATE_LIMIT') or 10)
+    CRAWL_RATE_BURST = float(os.environ.get('CRAWL_RATE_BURST') or 10)
+    CRAWL_MAX_RETRIES = int(os.environ.get('CRAWL_MAX_RETRIES') or 3)
+    CRAWL_RETRY_BACKOFF = float(os.environ.get('CRAWL_RETRY_BACKOFF') or 1.0)
+    CRAWL_QUEUE_SIZE = int(os.environ.get('CRAWL_QUEUE_SIZE') or 64)
+    # 数据库中没有记录的股票首次拉取的天数
+    CRAWL_DEFAULT_LOOKBACK_DAYS = int(os.environ.get('CRAWL_DEFAULT_LOOKBACK_DAYS') or 365)
+    # 已补齐过的缺口区间在此时间（秒）内不再重复请求（请求后仍缺失的日期视为数据源没有）；
+    # 上游返回空数据的区间只在较短时间内不再请求（可能是临时故障）
+    CRAWL_FETCHED_SPAN_TTL = int(os.environ.get('CRAWL_FETCHED_SPAN_TTL') or 86400)
+    CRAWL_EMPTY_SPAN_TTL = int(os.environ.get('CRAWL_EMPTY_SPAN_TTL') or 300)
+    
+    # 本地缓存目录（股票代码表、板块成分等快照）
+    CACHE_DIR = os.environ.get('STOCKSHARK_CACHE_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache')
+    
+    # 全市场实时行情快照缓存有效期（秒）
+    SPOT_SNAPSHOT_TTL = int(os.environ.get('SPOT_SNAPSHOT_TTL') or 30)
+    # 行情快照刷新失败后的重试间隔（秒），期间继续使用旧快照，不再重复下载
+    SPOT_SNAPSHOT_RETRY_AFTER = int(os.environ.get('SPOT_SNAPSHOT_RETRY_AFTER') or 10)
+    
+    # 股票代码/名称索引刷新周期（秒）
+    SYMBOL_INDEX_TTL = int(os.environ.get('SYMBOL_INDEX_TTL') or 86400)
+    # 股票索引刷新失败后的重试间隔（秒），期间继续使用旧数据，不再访问网络
+    SYMBOL_INDEX_RETRY_AFTER = int(os.environ.get('SYMBOL_INDEX_RETRY_AFTER') or 300)
+    
+    # 板块成分倒排索引刷新周期（秒）及构建并发数
+    BOARD_INDEX_TTL = int(os.environ.get('BOARD_INDEX_TTL') or 86400)
+    BOARD_INDEX_WORKERS = int(os.environ.get('BOARD_INDEX_WORKERS') or 4)
+    # 重建时允许拉取失败的板块比例（失败板块沿用旧成分股），超过则放弃本次重建；
+    # 重建失败后的重试间隔（秒）
+    BOARD_INDEX_MAX_FAILED_RATIO = float(os.environ.get('BOARD_INDEX_MAX_FAILED_RATIO') or 0.1)
+    BOARD_INDEX_RETRY_AFTER = int(os.environ.get('BOARD_INDEX_RETRY_AFTER') or 600)
+    
+    # 板块目录（名称 -> 代码、成分股数量）刷新周期（秒），过期后在后台刷新
+    BOARD_CATALOG_TTL = int(os.environ.get('BOARD_CATALOG_TTL') or 3600)
+    # 板块目录下载失败后的重试间隔（秒），期间继续使用旧数据
+    BOARD_CATALOG_RETRY_AFTER = int(os.environ.get('BOARD_CATALOG_RETRY_AFTER') or 300)
+    
+    # 股票名称/拼音搜索索引刷新周期（秒）
+    SEARCH_INDEX_TTL = int(os.environ.get('SEARCH_INDEX_TTL') or 3600)
+    
+    # 综合分析数据采集：单个数据源超时（秒），慧博（playwright）单独设置
+    GATHER_TIMEOUT = float(os.environ.get('GATHER_TIMEOUT') or 20)
+    GATHER_HIBOR_TIMEOUT = float(os.environ.get('GATHER_HIBOR_TIMEOUT') or 60)
+    
+    # 同一股票并发综合分析的跨 worker 锁：租约时长、等待其他 worker 完成的最长时间（秒）；
+    # 持有者评估期间每 TTL/3 续租一次，租约时长只决定崩溃的持有者多久后释放锁
+    EVAL_LOCK_TTL = int(os.environ.get('EVAL_LOCK_TTL') or 180)
+    EVAL_LOCK_WAIT = int(os.environ.get('EVAL_LOCK_WAIT') or 150)
+    
+    # 评估缓存批量触发检测时公告/研报/估值查询的并发数
+    TRIGGER_CHECK_WORKERS = int(os.environ.get('TRIGGER_CHECK_WORKERS') or 8)
+    
+    # LLM 客户端：同时进行的请求数上限、429/5xx 重试次数与退避基数（秒）、连接/读取超时（秒）
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY') or 4)
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES') or 3)
+    LLM_RETRY_BACKOFF = float(os.environ.get('LLM_RETRY_BACKOFF') or 2.0)
+    LLM_CONNECT_TIMEOUT = float(os.environ.get('LLM_CONNECT_TIMEOUT') or 10)
+    LLM_READ_TIMEOUT = float(os.environ.get('LLM_READ_TIMEOUT') or 120)
+    
+    # LLM 响应缓存有效期（秒，<= 0 关闭）及 MongoDB 不可用时本地最多保留的条目数
+    LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL') or 7 * 24 * 3600)
+    LLM_CACHE_MAX_DISK_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_DISK_ENTRIES') or 500)
+    
+    # StockAnalyzer 批量分析时并行获取个股数据的线程数
+    ANALYZE_BATCH_WORKERS = int(os.environ.get('ANALYZE_BATCH_WORKERS') or 8)
+    
+    # 批量综合分析：数据采集与评估的并发数、单次请求最多的 (股票, scope) 项数、
+    # 等待下一项结果的最长时间（秒，超时后其余项按失败返回）
+    BATCH_EVALUATION_WORKERS = int(os.environ.get('BATCH_EVALUATION_WORKERS') or 8)
+    BATCH_EVALUATION_MAX_ITEMS = int(os.environ.get('BATCH_EVALUATION_MAX_ITEMS') or 100)
+    BATCH_EVALUATION_RESULT_TIMEOUT = float(os.environ.get('BATCH_EVALUATION_RESULT_TIMEOUT') or 900)
+    
+    # 评估预热：固定关注列表（逗号分隔股票代码），为空时取近期请求最多的 PREWARM_TOP_N 只；
+    # 分析范围及同时进行的 LLM 评估数
+    PREWARM_WATCHLIST = [code.strip() for code in (os.environ.get('PREWARM_WATCHLIST') or '').split(',')
+                         if code.strip()]
+    PREWARM_TOP_N = int(os.environ.get('PREWARM_TOP_N') or 50)
+    PREWARM_SCOPE = os.environ.get('PREWARM_SCOPE') or 'all'
+    PREWARM_LLM_CONCURRENCY = int(os.environ.get('PREWARM_LLM_CONCURRENCY') or 3)
+    
+    # StockService 查询缓存（基本信息、日线、历史行情）；爬虫写入新数据时按股票代码失效
+    SERVICE_CACHE_TTL = int(os.environ.get('SERVICE_CACHE_TTL') or 3600)
+    SERVICE_CACHE_MAX_ENTRIES = int(os.environ.get('SERVICE_CACHE_MAX_ENTRIES') or 2048)
+    # 最新日线查询（未指定日期）的有效期：只使用进程内缓存时，其他 worker 写入的新日线要等条目过期才可见
+    SERVICE_CACHE_LATEST_TTL = int(os.environ.get('SERVICE_CACHE_LATEST_TTL') or 300)
+    # memory: 仅进程内；mongodb: 额外使用 MongoDB 在多个 worker 间共享
+    SERVICE_CACHE_BACKEND = os.environ.get('SERVICE_CACHE_BACKEND') or 'memory'
+    
+    # 技术指标批量计算时每批的股票数
+    INDICATOR_BATCH_SIZE = int(os.environ.get('INDICATOR_BATCH_SIZE') or 500)
+    
+    # 日线列式存储（Parquet，需要 pyarrow）
+    BAR_STORE_ENABLED = os.environ.get('BAR_STORE_ENABLED', 'True') == 'True'
+    BAR_STORE_DIR = os.environ.get('BAR_STORE_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'bars')
+    
+    # 交易日历刷新周期（秒）
+    TRADING_CALENDAR_TTL = int(os.environ.get('TRADING_CALENDAR_TTL') or 86400)
 
 
 class DevelopmentConfig(Config):
@@ -1,6 +1,10 @@
 import akshare as ak
 import pandas as pd
 from datetime import datetime
+from stockshark.data.board_catalog import concept_catalog, industry_catalog
+from stockshark.data.board_index import concept_index
+from stockshark.data.spot_snapshot import spot_snapshot
+from stockshark.data.symbol_index import symbol_index
 
 class AkShareData:
     """
@@ -17,16 +21,10 @@ class AkShareData:
         :return: 股票基本信息字典
         """
         try:
-            # 获取全部股票基本信息
-            stock_info = ak.stock_info_a_code_name()
+            # 从股票代码索引中查找指定股票
+            name = symbol_index.get_name(symbol)
             
-            # 转换为DataFrame
-            df = pd.DataFrame(stock_info, columns=['code', 'name'])
-            
-            # 查找指定股票
-            stock = df[df['code'] == symbol]
-            
-            if stock.empty:
+            if name is None:
                 return None
             
             # 获取更详细的股票信息
@@ -54,7 +52,7 @@ class AkShareData:
             
             result = {
                 'code': symbol,
-                'name': stock['name'].values[0],
+                'name': name,
                 'full_name': full_name,
                 'industry': industry,
                 'concept': concept,
@@ -74,28 +72,25 @@ class AkShareData:
         :return: 股票行情数据字典
         """
         try:
-            # 获取实时行情
-            df = ak.stock_zh_a_spot_em()
-            
-            # 查找指定股票
-            stock = df[df['代码'] == symbol]
+            # 从共享的全市场快照中查找指定股票
+            stock = spot_snapshot.get_row(symbol)
             
-            if stock.empty:
+            if stock is None:
                 return None
             
             result = {
                 'code': symbol,
-                'name': stock['名称'].values[0],
-                'price': stock['最新价'].values[0],
-                'change': stock['涨跌额'].values[0],
-                'change_pct': stock['涨跌幅'].values[0],
-                'volume': stock['成交量'].values[0],
-                'amount': stock['成交额'].values[0],
-                'open': stock['今开'].values[0],
-                'high': stock['最高'].values[0],
-                'low': stock['最低'].values[0],
-                'previous_close': stock['昨收'].values[0],
-                'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                'name': stock['名称'],
+                'price': stock['最新价'],
+                'change': stock['涨跌额'],
+                'change_pct': stock['涨跌幅'],
+                'volume': stock['成交量'],
+                'amount': stock['成交额'],
+                'open': stock['今开'],
+                'high': stock['最高'],
+                'low': stock['最低'],
+                'previous_close': stock['昨收'],
+                'update_time': datetime.fromtimestamp(spot_snapshot.fetched_at).strftime('%Y-%m-%d %H:%M:%S')
             }
             
             return result
@@ -182,17 +177,14 @@ class AkShareData:
         :return: 行业股票列表
         """
         try:
-            # 获取行业分类数据
-            industry_df = ak.stock_board_industry_name_em()
+            # 从板块目录缓存中查找行业代码
+            board_code = industry_catalog.get_code(industry_name)
             
-            # 查找指定行业
-            industry_info = industry_df[industry_df['板块名称'] == industry_name]
-            
-            if industry_info.empty:
+            if board_code is None:
                 return []
             
             # 获取行业成分股
-            stocks = ak.stock_board_industry_cons_em(symbol=industry_info['板块代码'].values[0])
+            stocks = ak.stock_board_industry_cons_em(symbol=board_code)
             
             return stocks.to_dict('records')
         except Exception as e:
@@ -206,17 +198,14 @@ class AkShareData:
         :return: 概念股票列表
         """
         try:
-            # 获取概念分类数据
-            concept_df = ak.stock_board_concept_name_em()
-            
-            # 查找指定概念
-            concept_info = concept_df[concept_df['板块名称'] == concept_name]
+            # 从板块目录缓存中查找概念代码
+            board_code = concept_catalog.get_code(concept_name)
             
-            if concept_info.empty:
+            if board_code is None:
                 return []
             
             # 获取概念成分股
-            stocks = ak.stock_board_concept_cons_em(symbol=concept_info['板块代码'].values[0])
+            stocks = ak.stock_board_concept_cons_em(symbol=board_code)
             
             return stocks.to_dict('records')
         except Exception as e:
@@ -231,30 +220,8 @@ class AkShareData:
         :return: 概念名称列表
         """
         try:
-            concepts = []
-            
-            # 获取所有概念板块
-            concept_df = ak.stock_board_concept_name_em()
-            
-            # 遍历所有概念板块
-            for idx, row in concept_df.iterrows():
-                concept_name = row['板块名称']
-                concept_code = row['板块代码']
-                
-                try:
-                    # 获取该概念的成分股
-                    cons_df = ak.stock_board_concept_cons_em(symbol=concept_code)
-                    
-                    # 检查是否包含目标股票
-                    if not cons_df.empty and symbol in cons_df['代码'].values:
-                        concepts.append(concept_name)
-                        
-                        if len(concepts) >= limit:
-                            break
-                except Exception as e:
-                    continue
-            
-            return concepts
+            # 从概念板块倒排索引中查找
+            return concept_index.get_boards(symbol, limit=limit)
         except Exception as e:
             print(f"获取股票概念失败: {e}")
             return []
@@ -265,13 +232,7 @@ class AkShareData:
         :return: 所有A股股票列表
         """
         try:
-            # 获取全部股票基本信息
-            stock_info = ak.stock_info_a_code_name()
-            
-            # 转换为DataFrame
-            df = pd.DataFrame(stock_info, columns=['code', 'name'])
-            
-            return df.to_dict('records')
+            return symbol_index.all_stocks()
         except Exception as e:
             print(f"获取所有股票数据失败: {e}")
             return []
@@ -282,10 +243,8 @@ class AkShareData:
         :return: 行业名称列表
         """
         try:
-            # 获取行业分类数据
-            industry_df = ak.stock_board_industry_name_em()
-            
-            return industry_df['板块名称'].tolist()
+            # 从板块目录缓存获取
+            return industry_catalog.names()
         except Exception as e:
             print(f"获取行业列表失败: {e}")
             return []
@@ -296,10 +255,8 @@ class AkShareData:
         :return: 概念名称列表
         """
         try:
-            # 获取概念分类数据
-            concept_df = ak.stock_board_concept_name_em()
-            
-            return concept_df['板块名称'].tolist()
+            # 从板块目录缓存获取
+            return concept_catalog.names()
         except Exception as e:
             print(f"获取概念列表失败: {e}")
             return []
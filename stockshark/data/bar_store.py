@@ -0,0 +1,316 @@
+"""日线列式存储（Parquet）
+
+MySQL 仍是日线的权威存储；这里在本地按股票分区保存一份列式副本
+（BAR_STORE_DIR/symbol=XXXXXX/bars.parquet），读取时内存映射文件并直接得到 DataFrame，
+多年、全市场的扫描（技术指标、历史行情）不再依赖逐行的 SQL 查询和 DECIMAL 转换。
+
+- 写入: StockDailyTrade.bulk_upsert 写入 MySQL 后同步写入本存储（按 trade_date 去重合并）
+- 完整性: 只有从 MySQL 全量导出过（export_from_mysql）的股票才标记为完整并用于读取，
+  之前只镜像过部分新数据的股票仍从 MySQL 读取
+- pyarrow 为可选依赖，未安装或 BAR_STORE_ENABLED=false 时所有读写均为空操作
+"""
+
+import logging
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from stockshark.config import Config
+from stockshark.data.trading_calendar import DateLike, to_date
+from stockshark.utils.single_flight import FileLock
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 列式存储为可选功能
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# 存储的列（与 stock_daily_trade 一致，不含 symbol：由分区目录表示）
+BAR_COLUMNS = ('trade_date', 'open_price', 'high_price', 'low_price', 'close_price',
+               'volume', 'amount', 'change_pct', 'turnover_rate')
+
+# 从 MySQL 导出时的列顺序
+_EXPORT_COLUMNS = ('symbol',) + BAR_COLUMNS
+
+# 文件元数据中的完整性标记
+_COMPLETE_KEY = b'stockshark.complete'
+
+
+def _schema():
+    return pa.schema([
+        ('trade_date', pa.date32()),
+        ('open_price', pa.float64()),
+        ('high_price', pa.float64()),
+        ('low_price', pa.float64()),
+        ('close_price', pa.float64()),
+        ('volume', pa.int64()),
+        ('amount', pa.float64()),
+        ('change_pct', pa.float64()),
+        ('turnover_rate', pa.float64()),
+    ])
+
+
+class BarStore:
+    """按股票分区的 Parquet 日线存储"""
+
+    def __init__(self, root: Optional[str] = None, enabled: Optional[bool] = None):
+        """
+        Args:
+            root: 存储目录，默认取 Config.BAR_STORE_DIR
+            enabled: 是否启用，默认取 Config.BAR_STORE_ENABLED（未安装 pyarrow 时总是关闭）
+        """
+        self.root = root or Config.BAR_STORE_DIR
+        self.enabled = (Config.BAR_STORE_ENABLED if enabled is None else enabled) and pa is not None
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"symbol={symbol}", "bars.parquet")
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _read_table(self, symbol: str):
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        return pq.read_table(path, memory_map=True)
+
+    def is_complete(self, symbol: str) -> bool:
+        """股票是否已从 MySQL 全量导出（本地数据完整，可替代 MySQL 读取）"""
+        if not self.enabled:
+            return False
+        try:
+            metadata = pq.read_schema(self._path(symbol)).metadata or {}
+            return metadata.get(_COMPLETE_KEY) == b'1'
+        except (FileNotFoundError, OSError):
+            return False
+
+    @contextmanager
+    def _locked(self, symbol: str):
+        """持有一只股票的线程锁和文件锁（同一台机器上的多个 worker 之间互斥）"""
+        path = self._path(symbol)
+        with self._symbol_lock(symbol):
+            lock = FileLock(f"{path}.lock")
+            acquired, _ = lock.acquire(timeout=60)
+            if not acquired:
+                raise TimeoutError(f"等待文件锁超时: {path}.lock")
+            try:
+                yield
+            finally:
+                lock.release()
+
+    def _merge_write(self, symbol: str, frame: pd.DataFrame, complete: Optional[bool] = None):
+        """与已有数据按 trade_date 合并（新数据覆盖旧数据）后原子替换文件"""
+        with self._locked(symbol):
+            self._write_locked(symbol, frame, complete)
+
+    def _write_locked(self, symbol: str, frame: pd.DataFrame, complete: Optional[bool] = None):
+        """_merge_write 的实现，调用方须已持有该股票的锁"""
+        path = self._path(symbol)
+        existing = self._read_table(symbol)
+        metadata = (existing.schema.metadata or {}) if existing is not None else {}
+        if complete is not None:
+            metadata = {**metadata, _COMPLETE_KEY: b'1' if complete else b'0'}
+        if existing is not None and not complete:
+            frame = pd.concat([existing.to_pandas(), frame], ignore_index=True)
+        frame = (frame.drop_duplicates('trade_date', keep='last')
+                 .sort_values('trade_date').reset_index(drop=True))
+        table = pa.Table.from_pandas(frame, schema=_schema(), preserve_index=False)
+        table = table.replace_schema_metadata(metadata)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _to_frame(rows: Sequence[Sequence], columns: Sequence[str]) -> pd.DataFrame:
+        frame = pd.DataFrame(list(rows), columns=list(columns))
+        frame['trade_date'] = pd.to_datetime(frame['trade_date']).dt.date
+        for col in BAR_COLUMNS[1:]:
+            frame[col] = pd.to_numeric(frame[col], errors='coerce')
+        frame['volume'] = frame['volume'].round().astype('Int64')
+        return frame
+
+    def write_rows(self, rows: Sequence[Sequence], columns: Sequence[str]) -> int:
+        """
+        写入日线（与已有数据合并）
+
+        Args:
+            rows: 行元组，列顺序为 columns（如 StockDailyTrade.COLUMNS）
+            columns: 列名，须包含 symbol 及 BAR_COLUMNS
+
+        Returns:
+            int: 写入的行数，未启用时为 0
+        """
+        if not self.enabled or not rows:
+            return 0
+        frame = self._to_frame(rows, columns)
+        written = 0
+        for symbol, group in frame.groupby('symbol', sort=False):
+            try:
+                self._merge_write(str(symbol), group[list(BAR_COLUMNS)])
+                written += len(group)
+            except Exception as e:
+                logger.warning("日线列式存储写入失败 %s: %s", symbol, e)
+                self.invalidate(str(symbol))
+        return written
+
+    def invalidate(self, symbol: str):
+        """删除一只股票的本地数据（写入失败后与 MySQL 不一致时调用，之后改为从 MySQL 读取）"""
+        try:
+            os.remove(self._path(symbol))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("删除日线列式存储失败 %s: %s", symbol, e)
+
+    def _history_frame(self, rows: Sequence[Sequence], columns: Sequence[str]) -> pd.DataFrame:
+        frame = self._to_frame(rows, columns) if rows else pd.DataFrame(columns=list(BAR_COLUMNS))
+        return frame[list(BAR_COLUMNS)]
+
+    def replace_symbol(self, symbol: str, rows: Sequence[Sequence], columns: Sequence[str]) -> int:
+        """
+        用完整历史替换一只股票的数据，并标记为完整
+
+        Returns:
+            int: 写入的行数
+        """
+        if not self.enabled:
+            return 0
+        frame = self._history_frame(rows, columns)
+        self._merge_write(symbol, frame, complete=True)
+        return len(frame)
+
+    def read_symbol(self, symbol: str, start_date: Optional[DateLike] = None,
+                    end_date: Optional[DateLike] = None) -> Optional[pd.DataFrame]:
+        """
+        读取一只股票的日线
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期（含）
+            end_date: 结束日期（含）
+
+        Returns:
+            pd.DataFrame: BAR_COLUMNS 各列，按日期升序；股票数据不完整或未启用时返回 None
+        """
+        if not self.is_complete(symbol):
+            return None
+        filters = []
+        if start_date:
+            filters.append(('trade_date', '>=', to_date(start_date)))
+        if end_date:
+            filters.append(('trade_date', '<=', to_date(end_date)))
+        table = pq.read_table(self._path(symbol), memory_map=True, filters=filters or None)
+        return table.to_pandas(date_as_object=True)
+
+    def read_panel(self, symbols: Iterable[str], start_date: Optional[DateLike] = None,
+                   end_date: Optional[DateLike] = None,
+                   columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        读取多只股票的日线长表（只包含数据完整的股票）
+
+        Args:
+            symbols: 股票代码
+            start_date: 开始日期（含）
+            end_date: 结束日期（含）
+            columns: 需要的列（BAR_COLUMNS 的子集），默认全部
+
+        Returns:
+            pd.DataFrame: symbol 及所需各列，按股票、日期升序
+        """
+        symbols = [s for s in symbols if self.is_complete(s)]
+        columns = list(columns or BAR_COLUMNS)
+        if 'trade_date' not in columns:
+            columns.insert(0, 'trade_date')
+        if not symbols:
+            return pd.DataFrame(columns=['symbol'] + columns)
+
+        dataset = ds.dataset([self._path(s) for s in symbols], format='parquet',
+                             partitioning=ds.partitioning(pa.schema([('symbol', pa.string())]),
+                                                          flavor='hive'),
+                             partition_base_dir=self.root)
+        expr = None
+        if start_date:
+            expr = ds.field('trade_date') >= pa.scalar(to_date(start_date), pa.date32())
+        if end_date:
+            cond = ds.field('trade_date') <= pa.scalar(to_date(end_date), pa.date32())
+            expr = cond if expr is None else expr & cond
+        table = dataset.to_table(columns=['symbol'] + columns, filter=expr)
+        frame = table.to_pandas(date_as_object=True)
+        return frame.sort_values(['symbol', 'trade_date'], kind='mergesort').reset_index(drop=True)
+
+    def complete_symbols(self, symbols: Iterable[str]) -> List[str]:
+        """筛选出本地数据完整的股票"""
+        return [s for s in symbols if self.is_complete(s)]
+
+    def _export_rows(self, symbols: List[str], rows: List[Dict], stats: Dict[str, int]):
+        """用查询到的日线替换各股票的文件并标记为完整（调用方须已持有这些股票的锁）"""
+        grouped: Dict[str, list] = {symbol: [] for symbol in symbols}
+        for row in rows:
+            grouped[row['symbol']].append(tuple(row[col] for col in _EXPORT_COLUMNS))
+        for symbol, symbol_rows in grouped.items():
+            try:
+                frame = self._history_frame(symbol_rows, _EXPORT_COLUMNS)
+                self._write_locked(symbol, frame, complete=True)
+                stats['rows'] += len(frame)
+                stats['symbols'] += 1
+            except Exception as e:
+                stats['failed'] += 1
+                logger.warning("导出日线到列式存储失败 %s: %s", symbol, e)
+
+    def export_from_mysql(self, symbols: Optional[List[str]] = None,
+                          batch_size: int = 200) -> Dict[str, int]:
+        """
+        从 MySQL 全量导出日线并标记为完整（首次启用或数据修复后执行）
+
+        Args:
+            symbols: 股票代码列表，None表示所有有日线数据的股票
+            batch_size: 每次查询的股票数
+
+        Returns:
+            dict: symbols、rows、failed
+        """
+        from stockshark.models.stock_daily_trade import StockDailyTrade
+
+        stats = {'symbols': 0, 'rows': 0, 'failed': 0}
+        if not self.enabled:
+            logger.warning("日线列式存储未启用（BAR_STORE_ENABLED=false 或未安装 pyarrow）")
+            return stats
+        symbols = symbols if symbols is not None else StockDailyTrade.get_all_symbols()
+        for i in range(0, len(symbols), batch_size):
+            batch = symbols[i:i + batch_size]
+            with ExitStack() as stack:
+                # 读取 MySQL 到替换文件期间持有锁，避免期间镜像写入的新数据被旧的导出结果覆盖；
+                # 按代码顺序加锁，多个导出并发时不会死锁
+                locked = []
+                for symbol in sorted(batch):
+                    try:
+                        stack.enter_context(self._locked(symbol))
+                        locked.append(symbol)
+                    except TimeoutError as e:
+                        stats['failed'] += 1
+                        logger.warning("导出日线到列式存储失败 %s: %s", symbol, e)
+                try:
+                    rows = StockDailyTrade.get_trade_panel(locked, columns=BAR_COLUMNS[1:]) if locked else []
+                except Exception as e:
+                    # 读取失败时保留原有文件和完整性标记，不能当作没有日线写入空文件
+                    stats['failed'] += len(locked)
+                    logger.warning("读取日线失败，跳过 %d 只股票的导出: %s", len(locked), e)
+                    rows = None
+                if rows is not None:
+                    self._export_rows(locked, rows, stats)
+            logger.info("日线列式存储导出进度: %d/%d", min(i + batch_size, len(symbols)), len(symbols))
+        return stats
+
+
+# 创建全局实例
+bar_store = BarStore()
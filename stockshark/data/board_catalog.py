@@ -0,0 +1,227 @@
+"""板块目录缓存（板块名称 -> 板块代码、成分股数量）
+
+行业/概念列表接口每次都调用 ak.stock_board_*_name_em() 下载整张板块表，按名称查询
+成分股时也要先下载一次板块表才能把名称换成代码。这里缓存板块目录：
+- 进程内共享，持久化到本地快照，重启后无需等待下载
+- 过期后在后台线程刷新，期间继续使用旧数据；只有首次使用且没有快照时同步下载（并发请求只下载一次）
+- 下载失败后 Config.BOARD_CATALOG_RETRY_AFTER 秒内不再下载，继续使用旧数据（没有数据时返回空结果）
+- 成分股数量优先使用板块成分索引（board_index）重建时统计的精确值，
+  没有时用板块表中的上涨家数 + 下跌家数 + 平盘家数近似
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import akshare as ak
+import pandas as pd
+
+from stockshark.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 板块类型 -> 板块列表接口
+_CATALOG_APIS = {
+    "concept": ak.stock_board_concept_name_em,
+    "industry": ak.stock_board_industry_name_em,
+}
+
+_COUNT_COLUMNS = ("上涨家数", "下跌家数", "平盘家数")
+
+
+class BoardCatalog:
+    """板块目录缓存（进程内共享，带本地快照）"""
+
+    def __init__(self, kind: str, ttl: Optional[int] = None, snapshot_path: Optional[str] = None,
+                 fetcher: Optional[Callable[[], pd.DataFrame]] = None):
+        """
+        Args:
+            kind: 板块类型，见 _CATALOG_APIS
+            ttl: 刷新周期（秒），默认取 Config.BOARD_CATALOG_TTL
+            snapshot_path: 本地快照路径，默认 Config.CACHE_DIR/{kind}_board_catalog.json
+            fetcher: 板块表下载函数，默认按 kind 取 akshare 接口
+        """
+        if kind not in _CATALOG_APIS:
+            raise ValueError(f"不支持的板块类型: {kind}")
+        self.kind = kind
+        self.ttl = Config.BOARD_CATALOG_TTL if ttl is None else ttl
+        self.snapshot_path = snapshot_path or os.path.join(
+            Config.CACHE_DIR, f"{kind}_board_catalog.json")
+        self._fetcher = fetcher or _CATALOG_APIS[kind]
+
+        # 板块名称 -> {"code": 板块代码, "member_count": 成分股数量, "exact": 数量是否为精确值}
+        self._boards: Dict[str, dict] = {}
+        self._updated_at = 0.0
+
+        # 下载失败后的退避截止时间
+        self._retry_at = 0.0
+
+        self._lock = threading.Lock()
+        # 首次同步下载的锁（_fetch 内部会获取 _lock，不能共用）
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+
+    def _load_snapshot(self) -> bool:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._boards = snapshot["boards"]
+            self._updated_at = snapshot["updated_at"]
+            logger.info("从本地快照加载%s板块目录: %d 个板块", self.kind, len(self._boards))
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("%s板块目录快照读取失败: %s", self.kind, e)
+            return False
+
+    def _save_snapshot(self):
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"updated_at": self._updated_at, "boards": self._boards},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.warning("%s板块目录快照写入失败: %s", self.kind, e)
+
+    def _fetch(self) -> List[Tuple[str, str]]:
+        """下载板块表并替换目录，返回 [(板块名称, 板块代码), ...]（保持接口顺序）"""
+        df = self._fetcher()
+        count_columns = [col for col in _COUNT_COLUMNS if col in df.columns]
+        approx = (df[count_columns].apply(pd.to_numeric, errors="coerce").sum(axis=1, min_count=1)
+                  if count_columns else pd.Series(float("nan"), index=df.index))
+
+        previous = self._boards
+        boards = {}
+        for name, code, count in zip(df["板块名称"], df["板块代码"], approx):
+            name, code = str(name), str(code)
+            old = previous.get(name)
+            if old is not None and old.get("exact"):
+                boards[name] = {"code": code, "member_count": old["member_count"], "exact": True}
+            else:
+                boards[name] = {"code": code, "member_count": None if pd.isna(count) else int(count),
+                                "exact": False}
+        with self._lock:
+            self._boards = boards
+            self._updated_at = time.time()
+            self._retry_at = 0.0
+        self._save_snapshot()
+        logger.info("%s板块目录已刷新: %d 个板块", self.kind, len(boards))
+        return [(name, board["code"]) for name, board in boards.items()]
+
+    def _is_fresh(self) -> bool:
+        return bool(self._boards) and time.time() - self._updated_at < self.ttl
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self._fetch()
+            except Exception as e:
+                self._retry_at = time.time() + Config.BOARD_CATALOG_RETRY_AFTER
+                logger.warning("%s板块目录后台刷新失败，%d 秒内继续使用旧数据: %s",
+                               self.kind, Config.BOARD_CATALOG_RETRY_AFTER, e)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name=f"{self.kind}-board-catalog", daemon=True).start()
+
+    def _ensure_loaded(self):
+        if self._is_fresh():
+            return
+        # 上次下载失败，退避期内不再下载
+        if time.time() < self._retry_at:
+            return
+        if not self._boards:
+            with self._load_lock:
+                # 等待锁期间其他线程可能已加载完成或下载失败
+                if self._boards or time.time() < self._retry_at:
+                    return
+                if not self._load_snapshot():
+                    # 首次使用且没有快照，只能同步下载
+                    try:
+                        self._fetch()
+                    except Exception:
+                        self._retry_at = time.time() + Config.BOARD_CATALOG_RETRY_AFTER
+                        raise
+                    return
+        if not self._is_fresh():
+            self._refresh_in_background()
+
+    def refresh(self) -> List[Tuple[str, str]]:
+        """
+        同步刷新板块目录（供板块成分索引重建、定时任务调用）
+
+        Returns:
+            list: [(板块名称, 板块代码), ...]
+        """
+        return self._fetch()
+
+    def set_member_counts(self, counts: Dict[str, int]):
+        """
+        写入精确的成分股数量（板块成分索引重建后调用）
+
+        Args:
+            counts: 板块名称 -> 成分股数量
+        """
+        with self._lock:
+            for name, count in counts.items():
+                board = self._boards.get(name)
+                if board is not None:
+                    board["member_count"] = count
+                    board["exact"] = True
+        self._save_snapshot()
+
+    def names(self) -> List[str]:
+        """
+        获取全部板块名称
+
+        Returns:
+            list: 板块名称列表（保持接口顺序）
+        """
+        self._ensure_loaded()
+        return list(self._boards)
+
+    def get_code(self, name: str) -> Optional[str]:
+        """
+        板块名称转板块代码
+
+        Args:
+            name: 板块名称
+
+        Returns:
+            str: 板块代码，不存在返回 None
+        """
+        self._ensure_loaded()
+        board = self._boards.get(name)
+        return board["code"] if board else None
+
+    def entries(self) -> List[dict]:
+        """
+        获取板块目录
+
+        Returns:
+            list: 每个元素包含 name、code、member_count
+        """
+        self._ensure_loaded()
+        return [{"name": name, "code": board["code"], "member_count": board["member_count"]}
+                for name, board in self._boards.items()]
+
+    @property
+    def updated_at(self) -> float:
+        """目录刷新时间（unix 时间戳），未加载时为 0"""
+        return self._updated_at
+
+
+# 创建全局实例
+concept_catalog = BoardCatalog("concept")
+industry_catalog = BoardCatalog("industry")
@@ -0,0 +1,280 @@
+"""板块成分倒排索引（股票 -> 所属板块），支持概念和行业板块
+
+原实现查询一只股票的概念时，会遍历全部概念板块并逐个调用成分股接口，单只股票
+就要几百次 HTTP 请求。这里每个刷新周期对每个板块只拉取一次成分股，构建：
+- 板块 -> 成分股
+- 股票 -> 所属板块（倒排）
+结果持久化到本地快照；快照过期时在后台线程重建，期间继续使用旧数据。
+重建时个别板块拉取失败则沿用上一次的成分股；失败比例超过 BOARD_INDEX_MAX_FAILED_RATIO
+时放弃本次重建（不替换、不保存），并在 BOARD_INDEX_RETRY_AFTER 秒后再重试。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import akshare as ak
+
+from stockshark.config import Config
+from stockshark.data.board_catalog import concept_catalog, industry_catalog
+
+logger = logging.getLogger(__name__)
+
+# 板块类型 -> (板块目录, 成分股接口)
+_BOARD_APIS = {
+    "concept": (concept_catalog, ak.stock_board_concept_cons_em),
+    "industry": (industry_catalog, ak.stock_board_industry_cons_em),
+}
+
+
+class BoardMembershipIndex:
+    """板块成分倒排索引（进程内共享，带本地快照）"""
+
+    def __init__(self, kind: str, ttl: Optional[int] = None,
+                 snapshot_path: Optional[str] = None, workers: Optional[int] = None):
+        """
+        Args:
+            kind: 板块类型，见 _BOARD_APIS
+            ttl: 刷新周期（秒），默认取 Config.BOARD_INDEX_TTL
+            snapshot_path: 本地快照路径，默认 Config.CACHE_DIR/{kind}_board_index.json
+            workers: 构建时拉取成分股的并发数，默认取 Config.BOARD_INDEX_WORKERS
+        """
+        if kind not in _BOARD_APIS:
+            raise ValueError(f"不支持的板块类型: {kind}")
+        self.kind = kind
+        self.ttl = Config.BOARD_INDEX_TTL if ttl is None else ttl
+        self.snapshot_path = snapshot_path or os.path.join(
+            Config.CACHE_DIR, f"{kind}_board_index.json")
+        self.workers = workers or Config.BOARD_INDEX_WORKERS
+
+        # 板块名称 -> {"code": 板块代码, "members": [[股票代码, 股票名称], ...]}
+        self._boards: Dict[str, dict] = {}
+        # 股票代码 -> [板块名称, ...]（保持板块列表顺序）
+        self._symbol_boards: Dict[str, List[str]] = {}
+        # 股票代码 -> 股票名称（来自成分股数据）
+        self._symbol_names: Dict[str, str] = {}
+        self._updated_at = 0.0
+        # 重建失败后在此时间点之前不再重试
+        self._retry_at = 0.0
+
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _set(self, boards: Dict[str, dict], updated_at: float):
+        symbol_boards: Dict[str, List[str]] = {}
+        symbol_names: Dict[str, str] = {}
+        for board_name, board in boards.items():
+            for code, name in board["members"]:
+                symbol_boards.setdefault(code, []).append(board_name)
+                symbol_names.setdefault(code, name)
+        self._boards = boards
+        self._symbol_boards = symbol_boards
+        self._symbol_names = symbol_names
+        self._updated_at = updated_at
+
+    def _load_snapshot(self) -> bool:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._set(snapshot["boards"], snapshot["updated_at"])
+            logger.info("从本地快照加载%s板块索引: %d 个板块, %d 只股票",
+                        self.kind, len(self._boards), len(self._symbol_boards))
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("%s板块索引快照读取失败: %s", self.kind, e)
+            return False
+
+    def _save_snapshot(self):
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"updated_at": self._updated_at, "boards": self._boards},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.warning("%s板块索引快照写入失败: %s", self.kind, e)
+
+    def _fetch_members(self, board_code: str) -> List[List[str]]:
+        cons_api = _BOARD_APIS[self.kind][1]
+        cons_df = cons_api(symbol=board_code)
+        if cons_df is None or cons_df.empty:
+            return []
+        return [[str(code), str(name)] for code, name in zip(cons_df["代码"], cons_df["名称"])]
+
+    def _build(self):
+        """拉取全部板块成分股（每个板块一次）并替换索引；失败过多时放弃本次重建"""
+        start = time.time()
+        try:
+            self._build_boards(start)
+        except Exception:
+            self._retry_at = time.time() + Config.BOARD_INDEX_RETRY_AFTER
+            raise
+        self._retry_at = 0.0
+
+    def _build_boards(self, start: float):
+        board_catalog = _BOARD_APIS[self.kind][0]
+        catalog = board_catalog.refresh()
+        if not catalog:
+            raise RuntimeError(f"{self.kind}板块列表为空")
+
+        members: Dict[str, List[List[str]]] = {}
+        failed: List[str] = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._fetch_members, code): name for name, code in catalog}
+            for future in as_completed(futures):
+                try:
+                    members[futures[future]] = future.result()
+                except Exception as e:
+                    failed.append(futures[future])
+                    logger.warning("获取%s板块 %s 成分股失败: %s", self.kind, futures[future], e)
+
+        failed_ratio = len(failed) / len(catalog)
+        if failed_ratio > Config.BOARD_INDEX_MAX_FAILED_RATIO:
+            raise RuntimeError(f"{self.kind}板块成分股拉取失败 {len(failed)}/{len(catalog)} 个，"
+                               f"保留旧索引")
+
+        # 拉取失败的板块沿用上一次的成分股
+        fetched = dict(members)
+        previous = self._boards
+        for name in failed:
+            if name in previous:
+                members[name] = previous[name]["members"]
+
+        # 按板块列表原始顺序组织
+        boards = {
+            name: {"code": code, "members": members[name]}
+            for name, code in catalog if name in members
+        }
+        self._set(boards, time.time())
+        self._save_snapshot()
+        board_catalog.set_member_counts({name: len(rows) for name, rows in fetched.items()})
+        logger.info("%s板块索引已重建: %d 个板块(失败 %d, 沿用旧数据 %d), %d 只股票, 耗时 %.0fs",
+                    self.kind, len(boards), len(failed), len(members) - len(fetched),
+                    len(self._symbol_boards), time.time() - start)
+
+    def _is_fresh(self) -> bool:
+        return bool(self._boards) and time.time() - self._updated_at < self.ttl
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self._build()
+            except Exception as e:
+                logger.warning("%s板块索引后台刷新失败: %s", self.kind, e)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name=f"{self.kind}-board-index", daemon=True).start()
+
+    def _ensure_loaded(self):
+        if self._is_fresh():
+            return
+        # 上次重建失败，退避期内不再重建（没有数据时返回空结果）
+        if time.time() < self._retry_at:
+            return
+        if not self._boards:
+            with self._lock:
+                if not self._boards and not self._load_snapshot():
+                    # 首次使用且没有快照，只能同步构建
+                    try:
+                        self._build()
+                    except Exception as e:
+                        logger.warning("%s板块索引构建失败: %s", self.kind, e)
+                    return
+        if not self._is_fresh():
+            self._refresh_in_background()
+
+    def is_ready(self) -> bool:
+        """
+        索引是否可以直接使用（内存中已有数据或存在本地快照），不会触发网络构建
+        """
+        if self._boards:
+            return True
+        with self._lock:
+            return bool(self._boards) or self._load_snapshot()
+
+    def refresh(self):
+        """同步重建索引（供定时任务调用）"""
+        self._build()
+
+    def get_boards(self, symbol: str, limit: Optional[int] = None) -> List[str]:
+        """
+        获取股票所属的板块列表
+
+        Args:
+            symbol: 股票代码
+            limit: 返回数量限制，None 表示全部
+
+        Returns:
+            list: 板块名称列表
+        """
+        self._ensure_loaded()
+        boards = self._symbol_boards.get(symbol, [])
+        return boards[:limit] if limit else list(boards)
+
+    def get_members(self, board_name: str) -> List[Dict[str, str]]:
+        """
+        获取板块成分股
+
+        Args:
+            board_name: 板块名称
+
+        Returns:
+            list: 每个元素为包含code和name的字典，板块不存在返回空列表
+        """
+        self._ensure_loaded()
+        board = self._boards.get(board_name)
+        if not board:
+            return []
+        return [{"code": code, "name": name} for code, name in board["members"]]
+
+    def member_count(self, board_name: str) -> Optional[int]:
+        """
+        获取板块成分股数量
+
+        Args:
+            board_name: 板块名称
+
+        Returns:
+            int: 成分股数量，板块不在索引中返回 None
+        """
+        self._ensure_loaded()
+        board = self._boards.get(board_name)
+        return len(board["members"]) if board else None
+
+    def all_boards(self) -> Dict[str, dict]:
+        """
+        获取索引中的全部板块
+
+        Returns:
+            dict: 板块名称 -> {"code": 板块代码, "members": [[股票代码, 股票名称], ...]}
+        """
+        self._ensure_loaded()
+        return dict(self._boards)
+
+    def all_members(self) -> Dict[str, str]:
+        """
+        获取索引中出现过的全部股票
+
+        Returns:
+            dict: 股票代码 -> 股票名称
+        """
+        self._ensure_loaded()
+        return dict(self._symbol_names)
+
+
+# 创建全局实例
+concept_index = BoardMembershipIndex("concept")
+industry_index = BoardMembershipIndex("industry")
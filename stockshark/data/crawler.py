@@ -2,6 +2,15 @@
 import akshare as ak
 import pandas as pd
 from datetime import datetime, timedelta
+from stockshark.config import Config
+from stockshark.data.board_index import concept_index
+from stockshark.data.frame_convert import (frame_to_records, frame_to_rows,
+                                           hist_to_trade_frame, spot_to_trade_frame)
+from stockshark.data.incremental_sync import IncrementalTradeSync
+from stockshark.data.spot_snapshot import spot_snapshot
+from stockshark.data.symbol_index import symbol_index
+from stockshark.data.trade_crawl_engine import DailyTradeCrawlEngine
+from stockshark.data.trading_calendar import to_date, trading_calendar
 from stockshark.utils.logger import get_logger
 from stockshark.models.stock_basic_info import StockBasicInfo
 from stockshark.models.stock_daily_trade import StockDailyTrade
@@ -24,15 +33,7 @@ class StockDataCrawler:
         """
         try:
             self.logger.info("开始获取所有A股股票列表...")
-            stock_list = ak.stock_info_a_code_name()
-            df = pd.DataFrame(stock_list, columns=['code', 'name'])
-            
-            stocks = []
-            for _, row in df.iterrows():
-                stocks.append({
-                    'code': row['code'],
-                    'name': row['name']
-                })
+            stocks = symbol_index.all_stocks()
             
             self.logger.info(f"成功获取 {len(stocks)} 只股票")
             return stocks
@@ -117,26 +118,7 @@ class StockDataCrawler:
             list: 概念名称列表
         """
         try:
-            concepts = []
-            
-            concept_df = ak.stock_board_concept_name_em()
-            
-            for idx, row in concept_df.iterrows():
-                concept_name = row['板块名称']
-                concept_code = row['板块代码']
-                
-                try:
-                    cons_df = ak.stock_board_concept_cons_em(symbol=concept_code)
-                    
-                    if not cons_df.empty and symbol in cons_df['代码'].values:
-                        concepts.append(concept_name)
-                        
-                        if len(concepts) >= limit:
-                            break
-                except Exception as e:
-                    continue
-            
-            return concepts
+            return concept_index.get_boards(symbol, limit=limit)
         except Exception as e:
             self.logger.error(f"获取股票 {symbol} 概念失败: {e}")
             return []
@@ -155,46 +137,37 @@ class StockDataCrawler:
         """
         try:
             self.logger.info(f"获取股票 {symbol} 的交易数据...")
-            
-            if not start_date:
-                start_date = (datetime.now() - timedelta(days=365)).strftime('%Y%m%d')
-            else:
-                start_date = start_date.replace('-', '')
-            
-            if not end_date:
-                end_date = datetime.now().strftime('%Y%m%d')
-            else:
-                end_date = end_date.replace('-', '')
-            
-            df = ak.stock_zh_a_hist(symbol=symbol, period="daily", 
-                                    start_date=start_date, end_date=end_date, adjust="qfq")
-            
-            if df.empty:
+            trades = self._request_stock_daily_trade(symbol, start_date, end_date)
+            if not trades:
                 self.logger.warning(f"股票 {symbol} 没有交易数据")
                 return []
-            
-            trades = []
-            for _, row in df.iterrows():
-                trade = {
-                    'symbol': symbol,
-                    'trade_date': row['日期'].date() if hasattr(row['日期'], 'date') else row['日期'],
-                    'open_price': float(row['开盘']),
-                    'high_price': float(row['最高']),
-                    'low_price': float(row['最低']),
-                    'close_price': float(row['收盘']),
-                    'volume': int(row['成交量']),
-                    'amount': float(row['成交额']),
-                    'change_pct': float(row['涨跌幅']) if '涨跌幅' in row else None,
-                    'turnover_rate': float(row['换手率']) if '换手率' in row else None
-                }
-                trades.append(trade)
-            
             self.logger.info(f"成功获取股票 {symbol} 的 {len(trades)} 条交易数据")
             return trades
         except Exception as e:
             self.logger.error(f"获取股票 {symbol} 交易数据失败: {e}")
             return []
     
+    @staticmethod
+    def _request_stock_daily_trade(symbol, start_date=None, end_date=None):
+        """请求股票每日交易数据，失败时抛出异常（供并行爬取引擎重试）"""
+        if not start_date:
+            start_date = (datetime.now() - timedelta(days=365)).strftime('%Y%m%d')
+        else:
+            start_date = start_date.replace('-', '')
+        
+        if not end_date:
+            end_date = datetime.now().strftime('%Y%m%d')
+        else:
+            end_date = end_date.replace('-', '')
+        
+        df = ak.stock_zh_a_hist(symbol=symbol, period="daily", 
+                                start_date=start_date, end_date=end_date, adjust="qfq")
+        
+        if df.empty:
+            return []
+        
+        return frame_to_records(hist_to_trade_frame(df, symbol))
+    
     def crawl_all_stock_basic_info(self, limit=None, offset=None):
         """
         爬取所有股票的基本信息并保存到数据库
@@ -261,34 +234,21 @@ class StockDataCrawler:
         if not trades:
             return 0
         
-        success_count = 0
-        for trade in trades:
-            stock_trade = StockDailyTrade(
-                symbol=trade['symbol'],
-                trade_date=trade['trade_date'],
-                open_price=trade['open_price'],
-                high_price=trade['high_price'],
-                low_price=trade['low_price'],
-                close_price=trade['close_price'],
-                volume=trade['volume'],
-                amount=trade['amount'],
-                change_pct=trade.get('change_pct'),
-                turnover_rate=trade.get('turnover_rate')
-            )
-            
-            if stock_trade.save():
-                success_count += 1
-        
-        return success_count
+        if StockDailyTrade.batch_save(trades):
+            return len(trades)
+        return 0
     
-    def crawl_all_stock_daily_trade(self, start_date=None, end_date=None, limit=None):
+    def crawl_all_stock_daily_trade(self, start_date=None, end_date=None, limit=None, workers=None):
         """
         爬取所有股票的每日交易数据并保存到数据库
         
+        未指定日期时按数据库中每只股票的最新日期增量同步；指定日期时拉取完整区间。
+        
         Args:
             start_date: 开始日期
             end_date: 结束日期
             limit: 限制爬取的股票数量，None表示全部
+            workers: 并行worker数量，默认取 Config.CRAWL_WORKERS
         
         Returns:
             tuple: (成功数量, 失败数量)
@@ -303,25 +263,49 @@ class StockDataCrawler:
         if limit:
             stocks = stocks[:limit]
         
-        success_count = 0
-        fail_count = 0
-        
-        for idx, symbol in enumerate(stocks, 1):
-            self.logger.info(f"进度: {idx}/{len(stocks)} - 处理股票 {symbol}")
-            
-            count = self.crawl_stock_daily_trade(symbol, start_date, end_date)
-            if count > 0:
-                success_count += count
-            else:
-                fail_count += 1
+        if start_date is None and end_date is None:
+            stats = trade_sync.sync_latest(stocks, workers=workers)
+        else:
+            stats = self._run_daily_trade_engine(stocks, start_date, end_date, workers)
+        success_count = stats['rows_written']
+        fail_count = stats['failed_symbols'] + stats['empty_symbols']
         
         self.logger.info(f"爬取完成: 成功 {success_count} 条记录, 失败 {fail_count} 只股票")
         return success_count, fail_count
     
-    def crawl_today_trade_data(self):
+    def backfill_trade_gaps(self, start_date=None, end_date=None, limit=None, workers=None):
+        """
+        按交易日历检测并补齐数据库中日线的内部缺口
+        
+        Args:
+            start_date: 检测开始日期，默认 Config.CRAWL_DEFAULT_LOOKBACK_DAYS 天前
+            end_date: 检测结束日期，默认最近一个已收盘交易日
+            limit: 限制检测的股票数量，None表示全部
+            workers: 并行worker数量，默认取 Config.CRAWL_WORKERS
+        
+        Returns:
+            tuple: (补齐记录数, 失败股票数)
+        """
+        end = to_date(end_date) if end_date else trading_calendar.last_closed_trading_day()
+        start = to_date(start_date) if start_date else end - timedelta(days=Config.CRAWL_DEFAULT_LOOKBACK_DAYS)
+        symbols = None
+        if limit:
+            symbols = StockBasicInfo.get_all_symbols()[:limit]
+        
+        stats = trade_sync.backfill_gaps(start, end, symbols, workers=workers)
+        self.logger.info(f"缺口补齐完成: {stats['gaps']} 只股票存在缺口, 写入 {stats['rows_written']} 条记录, "
+                         f"失败 {stats['failed_symbols']} 只股票")
+        return stats['rows_written'], stats['failed_symbols']
+    
+    def crawl_today_trade_data(self, workers=None, use_spot=True):
         """
         爬取今日交易数据（用于定时任务）
         
+        Args:
+            workers: 并行worker数量，默认取 Config.CRAWL_WORKERS
+            use_spot: 是否优先从全市场行情快照一次性生成日线（收盘后使用），
+                      快照中缺失的股票再逐只拉取历史接口
+        
         Returns:
             tuple: (成功数量, 失败数量)
         """
@@ -334,18 +318,77 @@ class StockDataCrawler:
             return 0, 0
         
         success_count = 0
-        fail_count = 0
+        if use_spot:
+            if not trading_calendar.is_trading_day(today):
+                # 非交易日行情快照仍是上一交易日数据，不能记为今日日线
+                self.logger.info(f"{today} 不是交易日，跳过今日交易数据爬取")
+                return 0, 0
+            written, missing = self.ingest_eod_from_spot(stocks)
+            success_count += written
+            stocks = missing
         
-        for symbol in stocks:
-            count = self.crawl_stock_daily_trade(symbol, start_date=today, end_date=today)
-            if count > 0:
-                success_count += count
-            else:
-                fail_count += 1
+        fail_count = 0
+        if stocks:
+            stats = self._run_daily_trade_engine(stocks, today, today, workers)
+            success_count += stats['rows_written']
+            fail_count = stats['failed_symbols'] + stats['empty_symbols']
         
         self.logger.info(f"今日数据爬取完成: 成功 {success_count} 条记录, 失败 {fail_count} 只股票")
         return success_count, fail_count
     
+    def ingest_eod_from_spot(self, symbols=None, trade_date=None):
+        """
+        将一次全市场行情快照转换为当日日线并批量写入
+        
+        Args:
+            symbols: 需要覆盖的股票代码列表，None表示快照中的全部股票
+            trade_date: 交易日期，默认今天
+        
+        Returns:
+            tuple: (写入记录数, 快照中缺失需要逐只补抓的股票代码列表)
+        """
+        trade_date = trade_date or datetime.now().date()
+        symbols = list(symbols) if symbols is not None else None
+        
+        # 强制刷新失败会抛出异常，不会把旧快照当作当日行情写入
+        try:
+            spot_df = spot_snapshot.get_frame(force_refresh=True)
+        except Exception as e:
+            self.logger.error(f"获取全市场行情快照失败，全部回退逐只拉取: {e}")
+            return 0, symbols or []
+        
+        if spot_df is None or spot_df.empty:
+            self.logger.warning("全市场行情快照为空，全部回退逐只拉取")
+            return 0, symbols or []
+        
+        bars = spot_to_trade_frame(spot_df)
+        quoted = set(spot_df['代码'].astype(str))
+        if symbols is not None:
+            wanted = set(symbols)
+            bars = bars[bars['symbol'].isin(wanted)]
+            missing = [symbol for symbol in symbols if symbol not in quoted]
+            suspended = len(wanted & quoted) - len(bars)
+        else:
+            missing = []
+            suspended = len(quoted) - len(bars)
+        
+        rows = frame_to_rows(bars, StockDailyTrade.COLUMNS,
+                             {'trade_date': trade_date, 'created_at': datetime.now()})
+        
+        stats = StockDailyTrade.bulk_upsert(rows)
+        self.logger.info(f"行情快照生成日线: 写入 {stats['rows']}/{len(rows)} 条, "
+                         f"停牌/无成交 {suspended} 只, "
+                         f"快照缺失 {len(missing)} 只")
+        return stats['rows'], missing
+    
+    def _run_daily_trade_engine(self, symbols, start_date, end_date, workers=None):
+        """使用并行爬取引擎拉取并批量写入日线数据，返回引擎统计"""
+        engine = DailyTradeCrawlEngine(
+            fetch=lambda symbol: self._request_stock_daily_trade(symbol, start_date, end_date),
+            workers=workers
+        )
+        return engine.run(symbols)
+    
     def crawl_incremental_basic_info(self, update_existing=False, workers=5):
         """
         增量爬取股票基本信息（每日更新）
@@ -459,3 +502,7 @@ class StockDataCrawler:
         
         self.logger.info(f"增量更新完成: 新增 {result['new_count']} 只, 更新 {result['updated_count']} 只, 失败 {result['failed_count']} 只, 跳过 {result['skipped_count']} 只")
         return result
+
+
+# 创建全局实例（增量同步记录已请求过的区间，需进程内共享）
+trade_sync = IncrementalTradeSync(StockDataCrawler._request_stock_daily_trade)
@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 
 class DataProcessor:
     """
@@ -233,70 +233,119 @@ class DataProcessor:
         
         return processed
     
-    def calculate_investment_score(self, stock_data: dict) -> Dict[str, Any]:
+    def score_frame(self, df: pd.DataFrame, with_factors: bool = True) -> pd.DataFrame:
         """
-        计算投资价值评分
-        :param stock_data: 整合后的股票数据
-        :return: 投资价值评分结果
+        批量计算投资价值评分与风险评分（按列向量化，适合全市场排序/筛选）
+        :param df: 整合后的股票数据，每行一只股票，可含 pe_ttm、change_pct、industry 列；
+                   缺失的列或空值视为该项数据不存在
+        :param with_factors: 是否生成 investment_factors / risk_factors 文本列（只需排序/筛选时可关闭）
+        :return: 与 df 同索引的评分表，含 total_score、rating、valuation_score、growth_score、
+                 technical_score、industry_score、risk_level、risk_count，以及 investment_factors、risk_factors
         """
-        score = 0
-        factors = []
+        n = len(df)
+        
+        def column(name):
+            return df[name] if name in df.columns else pd.Series([None] * n, index=df.index, dtype=object)
+        
+        pe_raw = column('pe_ttm')
+        change_raw = column('change_pct')
+        industry = column('industry')
+        pe = pd.to_numeric(pe_raw, errors='coerce').to_numpy(dtype=float)
+        change_pct = pd.to_numeric(change_raw, errors='coerce').to_numpy(dtype=float)
+        has_industry = industry.notna().to_numpy()
         
         # 估值因子（30分）
-        valuation_score = 0
-        if 'pe_ttm' in stock_data:
-            pe = stock_data['pe_ttm']
-            if pe > 0 and pe < 10:
-                valuation_score = 30
-                factors.append('低市盈率（PE<10）')
-            elif pe >= 10 and pe < 20:
-                valuation_score = 20
-                factors.append('合理市盈率（10≤PE<20）')
-            elif pe >= 20 and pe < 30:
-                valuation_score = 10
-                factors.append('较高市盈率（20≤PE<30）')
-        
-        # 成长因子（30分）
-        growth_score = 0
-        # 这里可以根据财务数据计算成长率，暂时给默认值
-        growth_score = 15
-        factors.append('成长潜力评估')
-        
-        # 技术因子（20分）
-        technical_score = 0
-        # 这里可以根据技术指标计算，暂时给默认值
-        technical_score = 10
-        factors.append('技术形态评估')
-        
-        # 行业因子（20分）
-        industry_score = 0
-        if 'industry' in stock_data:
-            # 这里可以根据行业前景评分，暂时给默认值
-            industry_score = 10
-            factors.append('行业前景评估')
-        
-        # 总分
+        pe_bands = [(pe > 0) & (pe < 10), (pe >= 10) & (pe < 20), (pe >= 20) & (pe < 30)]
+        valuation_score = np.select(pe_bands, [30, 20, 10], default=0)
+        
+        # 成长因子（30分）、技术因子（20分）暂为默认值；行业因子（20分）
+        growth_score = np.full(n, 15)
+        technical_score = np.full(n, 10)
+        industry_score = np.where(has_industry, 10, 0)
+        
         total_score = valuation_score + growth_score + technical_score + industry_score
+        rating = np.select([total_score >= 80, total_score >= 60, total_score >= 40],
+                           ['优秀', '良好', '一般'], default='较差')
+        
+        # 风险因素：估值、波动率、行业
+        high_pe = pe > 50
+        high_volatility = np.abs(change_pct) > 7
+        risk_count = high_pe.astype(int) + high_volatility.astype(int) + has_industry.astype(int)
+        risk_level = np.select([risk_count >= 3, risk_count == 0], ['high', 'low'], default='medium')
         
-        # 评级
-        if total_score >= 80:
-            rating = '优秀'
-        elif total_score >= 60:
-            rating = '良好'
-        elif total_score >= 40:
-            rating = '一般'
-        else:
-            rating = '较差'
-        
-        return {
+        scores = pd.DataFrame({
             'total_score': total_score,
             'rating': rating,
             'valuation_score': valuation_score,
             'growth_score': growth_score,
             'technical_score': technical_score,
             'industry_score': industry_score,
-            'factors': factors
-        }
+            'risk_level': risk_level,
+            'risk_count': risk_count,
+        }, index=df.index)
+        if not with_factors:
+            return scores
+        
+        # 评分因素：投资因素只有 4 档估值 x 是否有行业 共 8 种组合，查表生成
+        band = np.select(pe_bands, [1, 2, 3], default=0)
+        combos = [
+            ([factor] if factor else []) + ['成长潜力评估', '技术形态评估'] + (['行业前景评估'] if ind else [])
+            for factor in ('', '低市盈率（PE<10）', '合理市盈率（10≤PE<20）', '较高市盈率（20≤PE<30）')
+            for ind in (False, True)
+        ]
+        scores['investment_factors'] = [list(combos[c]) for c in band * 2 + has_industry]
+        
+        # 风险描述只为命中的行生成，保留原始值的格式（如 PE=60 而非 60.0）
+        risk_factors = [[] for _ in range(n)]
+        for flags, raw, template in ((high_pe, pe_raw, '高估值风险（PE={}）'),
+                                     (high_volatility, change_raw, '高波动率风险（涨跌幅={}%）'),
+                                     (has_industry, industry, '{}行业风险')):
+            values = raw.to_numpy()
+            for i in np.flatnonzero(flags):
+                risk_factors[i].append(template.format(values[i]))
+        scores['risk_factors'] = risk_factors
+        return scores
+    
+    def score_records(self, records: List[dict]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        批量计算多只股票的投资价值评分与风险评分
+        :param records: 整合后的股票数据列表
+        :return: 每只股票的 (投资价值评分结果, 风险评分结果)，顺序与 records 一致
+        """
+        if not records:
+            return []
+        # 按 object 列构造，保留原始值（整数/浮点）用于风险描述文本
+        frame = pd.DataFrame({
+            col: pd.Series([record.get(col) for record in records], dtype=object)
+            for col in ('pe_ttm', 'change_pct', 'industry')
+        })
+        scores = self.score_frame(frame)
+        # tolist() 转换为 Python 原生 int/str，结果可直接 JSON 序列化
+        col = {name: scores[name].tolist() for name in scores.columns}
+        return [
+            ({
+                'total_score': col['total_score'][i],
+                'rating': col['rating'][i],
+                'valuation_score': col['valuation_score'][i],
+                'growth_score': col['growth_score'][i],
+                'technical_score': col['technical_score'][i],
+                'industry_score': col['industry_score'][i],
+                'factors': col['investment_factors'][i]
+            }, {
+                'risk_level': col['risk_level'][i],
+                'risk_factors': col['risk_factors'][i],
+                'risk_count': col['risk_count'][i]
+            })
+            for i in range(len(records))
+        ]
+    
+    def calculate_investment_score(self, stock_data: dict) -> Dict[str, Any]:
+        """
+        计算投资价值评分
+        :param stock_data: 整合后的股票数据
+        :return: 投资价值评分结果
+        """
+        return self.score_records([stock_data])[0][0]
     
     def calculate_risk_score(self, stock_data: dict) -> Dict[str, Any]:
         """
@@ -304,37 +353,7 @@ class DataProcessor:
         :param stock_data: 整合后的股票数据
         :return: 风险评分结果
         """
-        risk_level = 'medium'
-        risk_factors = []
-        
-        # 估值风险
-        if 'pe_ttm' in stock_data:
-            pe = stock_data['pe_ttm']
-            if pe > 50:
-                risk_factors.append(f'高估值风险（PE={pe}）')
-        
-        # 波动率风险
-        if 'change_pct' in stock_data:
-            if abs(stock_data['change_pct']) > 7:
-                risk_factors.append(f'高波动率风险（涨跌幅={stock_data["change_pct"]}%）')
-        
-        # 行业风险
-        if 'industry' in stock_data:
-            risk_factors.append(f'{stock_data["industry"]}行业风险')
-        
-        # 确定风险等级
-        if len(risk_factors) >= 3:
-            risk_level = 'high'
-        elif len(risk_factors) == 0:
-            risk_level = 'low'
-        else:
-            risk_level = 'medium'
-        
-        return {
-            'risk_level': risk_level,
-            'risk_factors': risk_factors,
-            'risk_count': len(risk_factors)
-        }
+        return self.score_records([stock_data])[0][1]
 
 # 创建全局实例
 data_processor = DataProcessor()
@@ -1,6 +1,6 @@
-import pymysql
 from pymongo import MongoClient
 from stockshark.config import Config
+from stockshark.utils.database import close_mysql_pool, get_mysql_connection
 from stockshark.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -9,29 +9,17 @@ logger = get_logger(__name__)
 class DatabaseManager:
     """数据库管理类"""
     
-    _mysql_connection = None
     _mongodb_connection = None
     _mongodb_available = False
     
     @classmethod
     def get_mysql_connection(cls):
-        """获取 MySQL 连接"""
-        if cls._mysql_connection is None:
-            try:
-                cls._mysql_connection = pymysql.connect(
-                    host=Config.MYSQL_HOST,
-                    port=Config.MYSQL_PORT,
-                    user=Config.MYSQL_USER,
-                    password=Config.MYSQL_PASSWORD,
-                    database=Config.MYSQL_DATABASE,
-                    charset='utf8mb4',
-                    cursorclass=pymysql.cursors.DictCursor
-                )
-                logger.info("MySQL connection established successfully")
-            except Exception as e:
-                logger.error(f"MySQL connection error: {e}")
-                cls._mysql_connection = None
-        return cls._mysql_connection
+        """从连接池借用 MySQL 连接（使用完毕调用 close() 归还），失败返回 None"""
+        try:
+            return get_mysql_connection()
+        except Exception as e:
+            logger.error(f"MySQL connection error: {e}")
+            return None
     
     @classmethod
     def get_mongodb_connection(cls):
@@ -160,6 +148,8 @@ class DatabaseManager:
                     logger.info("MySQL tables created successfully")
             except Exception as e:
                 logger.error(f"MySQL table creation error: {e}")
+            finally:
+                mysql_conn.close()
     
     @classmethod
     def _init_mongodb(cls):
@@ -186,10 +176,8 @@ class DatabaseManager:
     @classmethod
     def close_connections(cls):
         """关闭所有数据库连接"""
-        if cls._mysql_connection:
-            cls._mysql_connection.close()
-            cls._mysql_connection = None
-            logger.info("MySQL connection closed")
+        close_mysql_pool()
+        logger.info("MySQL connection pool closed")
         
         if cls._mongodb_connection:
             cls._mongodb_connection.client.close()
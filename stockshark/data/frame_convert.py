@@ -0,0 +1,153 @@
+"""DataFrame 与记录/行元组之间的向量化转换
+
+akshare 返回中文列名的 DataFrame，入库需要英文列名、Python 原生类型和 None 表示缺失值。
+原实现用 df.iterrows() 逐行构造字典并逐个单元格 float()/int()，这里统一为按列处理：
+重命名 -> pd.to_numeric 批量转换 -> 一次性输出字典列表或 executemany 所需的元组。
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+# ak.stock_zh_a_hist 列 -> stock_daily_trade 列
+HIST_TRADE_COLUMNS = {
+    '日期': 'trade_date',
+    '开盘': 'open_price',
+    '最高': 'high_price',
+    '最低': 'low_price',
+    '收盘': 'close_price',
+    '成交量': 'volume',
+    '成交额': 'amount',
+    '涨跌幅': 'change_pct',
+    '换手率': 'turnover_rate',
+}
+
+# ak.stock_zh_a_spot_em 列 -> stock_daily_trade 列（成交量单位均为手）
+SPOT_TRADE_COLUMNS = {
+    '代码': 'symbol',
+    '今开': 'open_price',
+    '最高': 'high_price',
+    '最低': 'low_price',
+    '最新价': 'close_price',
+    '成交量': 'volume',
+    '成交额': 'amount',
+    '涨跌幅': 'change_pct',
+    '换手率': 'turnover_rate',
+}
+
+TRADE_PRICE_COLUMNS = ('open_price', 'high_price', 'low_price', 'close_price',
+                       'amount', 'change_pct', 'turnover_rate')
+
+
+def _coerce_trade_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """数值列批量转换；缺失的可选列补为空"""
+    for col in TRADE_PRICE_COLUMNS:
+        frame[col] = pd.to_numeric(frame[col], errors='coerce') if col in frame else float('nan')
+    # 可空整数，NaN 不会把整列变成浮点
+    frame['volume'] = pd.to_numeric(frame['volume'], errors='coerce').round().astype('Int64')
+    return frame
+
+
+def hist_to_trade_frame(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    """
+    将 ak.stock_zh_a_hist 结果转换为 stock_daily_trade 列
+
+    Args:
+        df: 历史行情（中文列名）
+        symbol: 股票代码
+
+    Returns:
+        pd.DataFrame: symbol、trade_date 及价格/成交列
+    """
+    present = {k: v for k, v in HIST_TRADE_COLUMNS.items() if k in df.columns}
+    frame = df[list(present)].rename(columns=present)
+    frame.insert(0, 'symbol', symbol)
+    frame['trade_date'] = pd.to_datetime(frame['trade_date']).dt.date
+    return _coerce_trade_frame(frame)
+
+
+def spot_to_trade_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将 ak.stock_zh_a_spot_em 快照转换为 stock_daily_trade 列，剔除停牌/无成交的股票
+
+    Args:
+        df: 全市场行情快照（中文列名）
+
+    Returns:
+        pd.DataFrame: symbol 及价格/成交列（不含 trade_date）
+    """
+    frame = df[list(SPOT_TRADE_COLUMNS)].rename(columns=SPOT_TRADE_COLUMNS)
+    frame['symbol'] = frame['symbol'].astype(str)
+    frame = _coerce_trade_frame(frame)
+    return frame[frame['close_price'].notna() & (frame['volume'] > 0)].copy()
+
+
+def _native_columns(frame: pd.DataFrame, columns: Sequence[str]) -> List[list]:
+    """按列转换为 Python 原生值列表，缺失值为 None"""
+    result = []
+    for col in columns:
+        series = frame[col]
+        result.append(series.astype(object).where(series.notna(), None).tolist())
+    return result
+
+
+def frame_to_records(frame: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> List[Dict]:
+    """
+    转换为字典列表（Python 原生类型，缺失值为 None）
+
+    Args:
+        frame: DataFrame
+        columns: 输出的列，默认全部列
+
+    Returns:
+        list: 每行一个字典
+    """
+    columns = list(columns or frame.columns)
+    values = _native_columns(frame, columns)
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def frame_to_rows(frame: pd.DataFrame, columns: Sequence[str],
+                  constants: Optional[Dict[str, object]] = None) -> List[tuple]:
+    """
+    转换为 executemany / BulkWriter 所需的元组列表
+
+    Args:
+        frame: DataFrame
+        columns: 元组的列顺序（如 StockDailyTrade.COLUMNS）
+        constants: frame 中不存在、所有行取相同值的列，如 {'created_at': datetime.now()}
+
+    Returns:
+        list: 每行一个元组
+    """
+    constants = dict(constants or {})
+    if 'created_at' in columns and 'created_at' not in frame.columns:
+        constants.setdefault('created_at', datetime.now())
+    frame_columns = [c for c in columns if c not in constants]
+    native = dict(zip(frame_columns, _native_columns(frame, frame_columns)))
+    values = [native[c] if c in native else [constants[c]] * len(frame) for c in columns]
+    return list(zip(*values))
+
+
+def trade_rows_to_hist_records(db_rows: Union[List[Dict], pd.DataFrame],
+                               source: str = 'database') -> List[Dict]:
+    """
+    将 stock_daily_trade 查询结果转换回历史行情格式（中文列名，日期为 YYYY-MM-DD）
+
+    Args:
+        db_rows: 数据库查询结果（DictCursor 行），或列名相同的 DataFrame（如列式存储读取结果）
+        source: 数据来源标记
+
+    Returns:
+        list: 每行一个字典
+    """
+    if db_rows is None or len(db_rows) == 0:
+        return []
+    reverse = {v: k for k, v in HIST_TRADE_COLUMNS.items()}
+    frame = pd.DataFrame(db_rows)[list(reverse)]
+    frame = _coerce_trade_frame(frame)
+    frame['trade_date'] = pd.to_datetime(frame['trade_date']).dt.strftime('%Y-%m-%d')
+    frame = frame.rename(columns=reverse)
+    frame['source'] = source
+    return frame_to_records(frame)
@@ -0,0 +1,223 @@
+"""日线数据增量同步
+
+原流程对每只股票固定重新下载最近 365 天。这里按数据库中已有的数据决定需要补的区间：
+- 尾部增量：一次分组查询得到每只股票的最新日期，只拉取其后到最近收盘交易日的数据
+- 内部缺口：按交易日历统计区间内每只股票应有的记录数，与实际记录数不符时定位缺失日期
+- 单只股票查询：只补齐请求区间内缺失的部分
+每只股票的缺失日期合并为一个区间、一次请求，重复部分由 upsert 覆盖。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from stockshark.config import Config
+from stockshark.data.trade_crawl_engine import DailyTradeCrawlEngine
+from stockshark.data.trading_calendar import to_date, trading_calendar
+from stockshark.models.stock_daily_trade import StockDailyTrade
+from stockshark.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DateRange = Tuple[date, date]
+
+
+def find_missing_span(stored_dates: Iterable[date], expected_days: List[date]) -> Optional[DateRange]:
+    """
+    找出应有但未存储的交易日，合并为一个区间
+
+    Args:
+        stored_dates: 已存储的交易日期
+        expected_days: 应有的交易日（升序）
+
+    Returns:
+        tuple: (最早缺失日, 最晚缺失日)，没有缺失返回 None
+    """
+    stored = set(stored_dates)
+    missing = [day for day in expected_days if day not in stored]
+    if not missing:
+        return None
+    return missing[0], missing[-1]
+
+
+class IncrementalTradeSync:
+    """日线数据增量同步"""
+
+    def __init__(self, fetch: Callable[[str, str, str], List[dict]],
+                 lookback_days: Optional[int] = None, span_ttl: Optional[int] = None,
+                 empty_span_ttl: Optional[int] = None):
+        """
+        Args:
+            fetch: 拉取单只股票区间日线的函数 fetch(symbol, start_date, end_date)，
+                   日期格式 YYYY-MM-DD，失败时抛出异常
+            lookback_days: 数据库中没有记录的股票首次拉取的天数，默认取 Config.CRAWL_DEFAULT_LOOKBACK_DAYS
+            span_ttl: 已补齐区间的记忆时间（秒），默认取 Config.CRAWL_FETCHED_SPAN_TTL
+            empty_span_ttl: 上游返回空数据的区间的记忆时间（秒），默认取 Config.CRAWL_EMPTY_SPAN_TTL
+        """
+        self.fetch = fetch
+        self.lookback_days = lookback_days or Config.CRAWL_DEFAULT_LOOKBACK_DAYS
+        self.span_ttl = Config.CRAWL_FETCHED_SPAN_TTL if span_ttl is None else span_ttl
+        self.empty_span_ttl = Config.CRAWL_EMPTY_SPAN_TTL if empty_span_ttl is None else empty_span_ttl
+        # 已经请求过的 (股票, 开始, 结束) -> 过期时间：请求后仍缺失的日期是数据源本身没有的
+        # （停牌、未上市），过期前同一区间不再重复请求；按写入顺序排列，过期条目从头部清理
+        self._fetched_spans: "OrderedDict[Tuple[str, date, date], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_fetched(self, key: Tuple[str, date, date]) -> bool:
+        with self._lock:
+            expires_at = self._fetched_spans.get(key)
+            return expires_at is not None and expires_at > time.monotonic()
+
+    def _remember_spans(self, keys: Iterable[Tuple[str, date, date]], ttl: float):
+        """记录已请求的区间，并清理过期条目"""
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self._fetched_spans.pop(key, None)
+                self._fetched_spans[key] = now + ttl
+            while self._fetched_spans:
+                key, expires_at = next(iter(self._fetched_spans.items()))
+                if expires_at > now:
+                    break
+                del self._fetched_spans[key]
+
+    def _run(self, spans: Dict[str, DateRange], workers: Optional[int] = None,
+             non_empty: Optional[Set[str]] = None) -> Dict:
+        """按每只股票各自的区间并行拉取并写入；non_empty 收集拉取到数据的股票"""
+        def fetch_span(symbol):
+            start, end = spans[symbol]
+            trades = self.fetch(symbol, start.isoformat(), end.isoformat())
+            if trades and non_empty is not None:
+                with self._lock:
+                    non_empty.add(symbol)
+            return trades
+
+        engine = DailyTradeCrawlEngine(fetch=fetch_span, workers=workers)
+        return engine.run(list(spans))
+
+    def sync_latest(self, symbols: List[str], end_date: Optional[date] = None,
+                    workers: Optional[int] = None) -> Dict:
+        """
+        尾部增量同步：每只股票只拉取最新已存储日期之后的数据
+
+        Args:
+            symbols: 股票代码列表
+            end_date: 同步截止日期，默认最近一个已收盘交易日
+            workers: 并行worker数量
+
+        Returns:
+            dict: 引擎统计，另含 up_to_date（已是最新、无需拉取的股票数）
+        """
+        end_date = end_date or trading_calendar.last_closed_trading_day()
+        latest = StockDailyTrade.get_latest_trade_dates(symbols)
+        default_start = end_date - timedelta(days=self.lookback_days)
+
+        spans = {}
+        for symbol in symbols:
+            last = latest.get(symbol)
+            start = last + timedelta(days=1) if last else default_start
+            # 最新日期之后到截止日之间没有交易日则无需请求
+            if trading_calendar.trading_days(start, end_date):
+                spans[symbol] = (start, end_date)
+
+        up_to_date = len(symbols) - len(spans)
+        logger.info(f"增量同步: {len(symbols)} 只股票中 {up_to_date} 只已是最新, "
+                    f"{len(spans)} 只需要拉取（截止 {end_date}）")
+        if not spans:
+            return {'symbols': 0, 'rows_written': 0, 'failed_symbols': 0, 'failed': [],
+                    'empty_symbols': 0, 'up_to_date': up_to_date}
+        stats = self._run(spans, workers)
+        stats['up_to_date'] = up_to_date
+        return stats
+
+    def find_gaps(self, start_date: date, end_date: date,
+                  symbols: Optional[List[str]] = None) -> Dict[str, DateRange]:
+        """
+        检测区间内部缺口（每只股票首末已存储日期之间缺失的交易日）
+
+        Args:
+            start_date: 检测开始日期
+            end_date: 检测结束日期
+            symbols: 股票代码列表，None表示全部
+
+        Returns:
+            dict: 股票代码 -> 需要补齐的区间
+        """
+        stats = StockDailyTrade.get_trade_date_stats(start_date, end_date, symbols)
+        gaps = {}
+        for symbol, stat in stats.items():
+            expected = trading_calendar.trading_days(stat['first'], stat['last'])
+            if stat['count'] >= len(expected):
+                continue
+            stored = StockDailyTrade.get_trade_dates(symbol, stat['first'], stat['last'])
+            span = find_missing_span(stored, expected)
+            if span and not self._is_fetched((symbol, span[0], span[1])):
+                gaps[symbol] = span
+        return gaps
+
+    def backfill_gaps(self, start_date: date, end_date: date,
+                      symbols: Optional[List[str]] = None, workers: Optional[int] = None) -> Dict:
+        """
+        补齐区间内部缺口
+
+        Returns:
+            dict: 引擎统计，另含 gaps（检测到缺口的股票数）
+        """
+        gaps = self.find_gaps(start_date, end_date, symbols)
+        logger.info(f"缺口检测: {start_date} ~ {end_date} 共 {len(gaps)} 只股票存在缺口")
+        if not gaps:
+            return {'symbols': 0, 'rows_written': 0, 'failed_symbols': 0, 'failed': [],
+                    'empty_symbols': 0, 'gaps': 0}
+        non_empty = set()
+        stats = self._run(gaps, workers, non_empty)
+        # 写入失败的缺口下次仍会补齐；上游返回空的缺口只短时间内不再请求
+        if not stats['rows_failed']:
+            self._remember_spans(((symbol, gaps[symbol][0], gaps[symbol][1]) for symbol in non_empty),
+                                 self.span_ttl)
+        failed = set(stats['failed'])
+        self._remember_spans(((symbol, span[0], span[1]) for symbol, span in gaps.items()
+                              if symbol not in non_empty and symbol not in failed),
+                             self.empty_span_ttl)
+        stats['gaps'] = len(gaps)
+        return stats
+
+    def fill_history(self, symbol: str, start_date, end_date) -> int:
+        """
+        补齐单只股票请求区间内缺失的日线（只请求缺失部分）
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            int: 写入的记录数
+        """
+        end = min(to_date(end_date), trading_calendar.last_closed_trading_day())
+        expected = trading_calendar.trading_days(start_date, end)
+        if not expected:
+            return 0
+        stored = StockDailyTrade.get_trade_dates(symbol, expected[0], expected[-1])
+        span = find_missing_span(stored, expected)
+        if not span:
+            return 0
+
+        key = (symbol, span[0], span[1])
+        if self._is_fetched(key):
+            return 0
+
+        trades = self.fetch(symbol, span[0].isoformat(), span[1].isoformat())
+        if not trades:
+            self._remember_spans([key], self.empty_span_ttl)
+            return 0
+
+        created_at = datetime.now()
+        rows = [StockDailyTrade.to_row(t, created_at) for t in trades]
+        result = StockDailyTrade.bulk_upsert(rows)
+        if result['rows'] == len(rows):
+            self._remember_spans([key], self.span_ttl)
+        logger.info(f"股票 {symbol} 补齐 {span[0]} ~ {span[1]} 日线 {result['rows']} 条")
+        return result['rows']
+
@@ -0,0 +1,229 @@
+"""全市场技术指标引擎
+
+DataProcessor.calculate_technical_indicators 一次只处理一只股票，每次都从头计算全部历史。
+这里对 (symbol, trade_date) 长表按股票分组做 rolling / ewm，一次计算所有股票的相同指标
+（MA5/10/20、均量、EMA12/26、MACD、RSI14），结果写入 stock_indicators 表，
+全市场筛选直接读表，不再按请求重复计算。日线优先从本地列式存储（bar_store）读取。
+
+增量更新：已有指标的股票只读取最近一段日线（足够覆盖最长的 20 日窗口），
+EMA 以表中最新一条记录的 ema12/ema26/dea 为起点继续递推，结果与全量计算一致。
+最新指标日期之前存在没有指标的日线（缺口补齐插入了更早的K线）的股票，EMA 链已经失效，
+改为从完整历史重新计算。
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from stockshark.config import Config
+from stockshark.data.bar_store import bar_store
+from stockshark.data.frame_convert import frame_to_rows
+from stockshark.data.trading_calendar import trading_calendar
+from stockshark.models.stock_daily_trade import StockDailyTrade
+from stockshark.models.stock_indicator import StockIndicator
+from stockshark.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 滚动窗口所需的最多历史K线数（MA20 需要前 19 根）
+WARMUP_BARS = 20
+
+# EMA 递推状态列
+EMA_STATE_COLUMNS = ('ema12', 'ema26', 'dea')
+
+
+def _grouped_rolling_mean(df: pd.DataFrame, column: str, window: int) -> pd.Series:
+    """按股票分组的滚动均值（与 df 同索引）"""
+    return (df.groupby('symbol', sort=False)[column].rolling(window).mean()
+            .reset_index(level=0, drop=True))
+
+
+def _grouped_ewm(symbols: pd.Series, values: pd.Series, span: int,
+                 seed: Optional[pd.Series] = None) -> pd.Series:
+    """
+    按股票分组的 EMA（adjust=False），可从已有的 EMA 值继续递推
+
+    Args:
+        symbols: 每行的股票代码
+        values: 每行的输入值（同一股票内按日期升序）
+        span: EMA 周期
+        seed: 股票代码 -> 上一交易日的 EMA 值；有起点的股票以该值作为首项递推
+
+    Returns:
+        pd.Series: 与 values 同索引的 EMA
+    """
+    frame = pd.DataFrame({'symbol': symbols, 'value': values})
+    if seed is not None and len(seed):
+        seed = seed[seed.index.isin(frame['symbol'].unique())]
+        # 起点行使用负索引，排序后位于各股票首行，计算后去除
+        seed_rows = pd.DataFrame({'symbol': seed.index, 'value': seed.to_numpy(dtype=float)},
+                                 index=pd.RangeIndex(-len(seed), 0))
+        frame = pd.concat([seed_rows, frame]).sort_values('symbol', kind='mergesort')
+    ema = (frame.groupby('symbol', sort=False)['value'].ewm(span=span, adjust=False).mean()
+           .reset_index(level=0, drop=True))
+    return ema[ema.index >= 0].reindex(values.index)
+
+
+def compute_panel_indicators(panel: pd.DataFrame, states: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    计算多只股票的技术指标
+
+    Args:
+        panel: 长表，列 symbol、trade_date、open、close、volume
+        states: 增量计算的起点，以股票代码为索引，列 trade_date、ema12、ema26、dea；
+            对应股票只输出 trade_date 之后的行，panel 中需包含其前至少 WARMUP_BARS 根K线
+
+    Returns:
+        pd.DataFrame: symbol、trade_date、close 及 StockIndicator.INDICATOR_COLUMNS 中的各指标
+    """
+    if panel.empty:
+        return pd.DataFrame()
+
+    df = panel.sort_values(['symbol', 'trade_date'], kind='mergesort').reset_index(drop=True)
+    for col in ('open', 'close', 'volume'):
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype(float)
+
+    # 涨跌幅（相对开盘价）、均线、均量
+    df['change_pct'] = (df['close'] - df['open']) / df['open'] * 100
+    for window in (5, 10, 20):
+        df[f'ma{window}'] = _grouped_rolling_mean(df, 'close', window)
+    for window in (5, 10):
+        df[f'volume_ma{window}'] = _grouped_rolling_mean(df, 'volume', window)
+
+    # RSI（14日简单平均），首行涨跌记为 0，与单只股票的计算一致
+    delta = df.groupby('symbol', sort=False)['close'].diff()
+    df['gain'] = delta.where(delta > 0, 0)
+    df['loss'] = -delta.where(delta < 0, 0)
+    gain = _grouped_rolling_mean(df, 'gain', 14)
+    loss = _grouped_rolling_mean(df, 'loss', 14)
+    df['rsi'] = 100 - (100 / (1 + gain / loss))
+
+    # 已有起点的股票只输出起点之后的行，EMA 从起点继续递推
+    if states is not None and len(states):
+        state_dates = df['symbol'].map(pd.to_datetime(states['trade_date']).dt.date).fillna(date.min)
+        is_new = df['trade_date'] > state_dates
+        df = df[is_new.to_numpy()]
+        seeds = {col: states[col].astype(float) for col in EMA_STATE_COLUMNS}
+    else:
+        seeds = {col: None for col in EMA_STATE_COLUMNS}
+
+    # MACD
+    df = df.copy()
+    df['ema12'] = _grouped_ewm(df['symbol'], df['close'], 12, seeds['ema12'])
+    df['ema26'] = _grouped_ewm(df['symbol'], df['close'], 26, seeds['ema26'])
+    df['dif'] = df['ema12'] - df['ema26']
+    df['dea'] = _grouped_ewm(df['symbol'], df['dif'], 9, seeds['dea'])
+    df['macd'] = (df['dif'] - df['dea']) * 2
+
+    df = df.replace([np.inf, -np.inf], np.nan)
+    df['close_price'] = df['close']
+    return df[['symbol', 'trade_date'] + list(StockIndicator.INDICATOR_COLUMNS)].reset_index(drop=True)
+
+
+class IndicatorEngine:
+    """全市场技术指标计算与持久化"""
+
+    def __init__(self, batch_size: Optional[int] = None):
+        """
+        Args:
+            batch_size: 每批计算的股票数（控制内存），默认取 Config.INDICATOR_BATCH_SIZE
+        """
+        self.batch_size = batch_size or Config.INDICATOR_BATCH_SIZE
+
+    @staticmethod
+    def _load_panel(symbols: List[str], start_date=None) -> pd.DataFrame:
+        """读取日线长表：本地列式存储中数据完整的股票直接读文件，其余从 MySQL 查询"""
+        frames = []
+        stored = set(bar_store.complete_symbols(symbols))
+        if stored:
+            frames.append(bar_store.read_panel(sorted(stored), start_date,
+                                               columns=('open_price', 'close_price', 'volume')))
+        remaining = [s for s in symbols if s not in stored]
+        if remaining:
+            rows = StockDailyTrade.get_trade_panel(remaining, start_date=start_date)
+            if rows:
+                frames.append(pd.DataFrame(rows))
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame()
+        panel = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        panel = panel.rename(columns={'open_price': 'open', 'close_price': 'close'})
+        panel['trade_date'] = pd.to_datetime(panel['trade_date']).dt.date
+        return panel
+
+    def _load_incremental_panel(self, symbols: List[str], states: Dict[str, Dict]) -> pd.DataFrame:
+        """读取增量计算所需的日线：起点前至少 WARMUP_BARS 根K线及之后的全部K线"""
+        earliest = min(state['trade_date'] for state in states.values())
+        days = trading_calendar.trading_days(earliest - timedelta(days=WARMUP_BARS * 3), earliest)
+        start_date = days[-WARMUP_BARS] if len(days) >= WARMUP_BARS else earliest - timedelta(days=WARMUP_BARS * 3)
+        panel = self._load_panel([s for s in symbols if s in states], start_date)
+
+        # 期间停牌的股票起点前的K线可能不足，改为读取完整历史；没有指标的股票同样需要完整历史
+        warmup = pd.Series(0, index=list(states))
+        if not panel.empty:
+            state_dates = panel['symbol'].map({s: state['trade_date'] for s, state in states.items()})
+            warmup = warmup.add(panel[panel['trade_date'] <= state_dates].groupby('symbol').size(),
+                                fill_value=0)
+        reload = set(warmup[warmup < WARMUP_BARS].index) | {s for s in symbols if s not in states}
+        if reload:
+            if not panel.empty:
+                panel = panel[~panel['symbol'].isin(reload)]
+            panel = pd.concat([panel, self._load_panel(sorted(reload))], ignore_index=True)
+        return panel
+
+    def _update_batch(self, symbols: List[str], full: bool) -> Dict[str, int]:
+        states = None if full else StockIndicator.get_latest_states(symbols)
+        if states:
+            # 补齐了更早K线的股票不能从最新状态递推，去掉起点后按完整历史重新计算
+            backfilled = StockIndicator.get_symbols_missing_rows(list(states))
+            if backfilled:
+                logger.info(f"{len(backfilled)} 只股票存在缺少指标的历史K线，从完整历史重新计算")
+                states = {s: state for s, state in states.items() if s not in backfilled}
+        if states:
+            panel = self._load_incremental_panel(symbols, states)
+            states_frame = pd.DataFrame.from_dict(states, orient='index')
+        else:
+            panel = self._load_panel(symbols)
+            states_frame = None
+
+        indicators = compute_panel_indicators(panel, states_frame)
+        if indicators.empty:
+            return {'rows': 0, 'failed_chunks': 0}
+        rows = frame_to_rows(indicators, StockIndicator.COLUMNS, {'created_at': datetime.now()})
+        return StockIndicator.bulk_upsert(rows)
+
+    def update(self, symbols: Optional[List[str]] = None, full: bool = False) -> Dict[str, float]:
+        """
+        计算并写入技术指标
+
+        Args:
+            symbols: 股票代码列表，None表示所有有日线数据的股票
+            full: 是否忽略已有指标、从完整历史重新计算
+
+        Returns:
+            dict: symbols、rows_written、failed_batches、elapsed_seconds
+        """
+        start = datetime.now()
+        symbols = symbols if symbols is not None else StockDailyTrade.get_all_symbols()
+        stats = {'symbols': len(symbols), 'rows_written': 0, 'failed_batches': 0}
+        for i in range(0, len(symbols), self.batch_size):
+            batch = symbols[i:i + self.batch_size]
+            try:
+                result = self._update_batch(batch, full)
+                stats['rows_written'] += result['rows']
+                if result.get('failed_chunks'):
+                    stats['failed_batches'] += 1
+            except Exception as e:
+                stats['failed_batches'] += 1
+                logger.error(f"技术指标计算失败（第 {i // self.batch_size + 1} 批）: {e}")
+            logger.info(f"技术指标进度: {min(i + self.batch_size, len(symbols))}/{len(symbols)}, "
+                        f"已写入 {stats['rows_written']} 条")
+        stats['elapsed_seconds'] = round((datetime.now() - start).total_seconds(), 1)
+        logger.info(f"技术指标更新完成: {stats}")
+        return stats
+
+
+# 创建全局实例
+indicator_engine = IndicatorEngine()
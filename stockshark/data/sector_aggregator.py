@@ -0,0 +1,107 @@
+"""板块统计物化
+
+StockService.get_stock_sectors 原先为了返回成分股数量，每次请求都实时拉取行业和最多 5 个
+概念的完整成分股列表。这里定时把板块成分倒排索引（board_index）与全市场行情快照
+（spot_snapshot）合并，按板块计算成分股数量、总市值、平均涨跌幅，连同股票 -> 板块的
+对应关系一起写入 sector_stats / sector_members 表，查询时只读表，不再访问上游接口。
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from stockshark.data.board_index import concept_index, industry_index
+from stockshark.data.spot_snapshot import spot_snapshot
+from stockshark.models.sector_stats import SectorStats
+
+logger = logging.getLogger(__name__)
+
+_INDEXES = {"industry": industry_index, "concept": concept_index}
+
+
+def compute_sector_stats(boards: Dict[str, dict], spot: Optional[pd.DataFrame],
+                         board_type: str, updated_at: datetime) -> Tuple[List[tuple], List[tuple]]:
+    """
+    计算板块统计
+
+    Args:
+        boards: 板块名称 -> {"code", "members": [[股票代码, 股票名称], ...]}（BoardMembershipIndex.all_boards）
+        spot: 全市场行情快照（需要 代码、总市值、涨跌幅 列），None 时只统计成分股数量
+        board_type: 板块类型
+        updated_at: 刷新时间
+
+    Returns:
+        tuple: (按 SectorStats.COLUMNS 排列的统计行, 按 SectorStats.MEMBER_COLUMNS 排列的成分股行)
+    """
+    members = pd.DataFrame(
+        [(name, code, stock_name) for name, board in boards.items() for code, stock_name in board["members"]],
+        columns=["board_name", "symbol", "stock_name"],
+    )
+    member_rows = [(board_type, name, symbol, stock_name, updated_at)
+                   for name, symbol, stock_name in members.itertuples(index=False)]
+
+    if spot is not None and not spot.empty and not members.empty:
+        quotes = pd.DataFrame({
+            "symbol": spot["代码"].astype(str),
+            "market_cap": pd.to_numeric(spot["总市值"], errors="coerce"),
+            "change_pct": pd.to_numeric(spot["涨跌幅"], errors="coerce"),
+        }).drop_duplicates("symbol")
+        members = members.merge(quotes, on="symbol", how="left")
+    else:
+        members["market_cap"] = np.nan
+        members["change_pct"] = np.nan
+
+    grouped = members.groupby("board_name", sort=False)
+    # 停牌等缺失行情的成分股不计入总市值和平均涨跌幅；全部缺失时为空
+    aggregated = pd.DataFrame({
+        "member_count": grouped.size(),
+        "total_market_cap": grouped["market_cap"].sum(min_count=1),
+        "avg_change_pct": grouped["change_pct"].mean(),
+    })
+
+    stats_rows = []
+    for name, board in boards.items():
+        if name in aggregated.index:
+            row = aggregated.loc[name]
+            count = int(row["member_count"])
+            market_cap = None if pd.isna(row["total_market_cap"]) else round(float(row["total_market_cap"]), 2)
+            change_pct = None if pd.isna(row["avg_change_pct"]) else round(float(row["avg_change_pct"]), 4)
+        else:
+            count, market_cap, change_pct = 0, None, None
+        stats_rows.append((board_type, name, board.get("code"), count, market_cap, change_pct, updated_at))
+    return stats_rows, member_rows
+
+
+def refresh_sector_stats(board_types: Sequence[str] = ("industry", "concept"),
+                         force_spot: bool = True) -> Dict[str, dict]:
+    """
+    刷新板块统计表（使用现有板块成分索引，不重建索引）
+
+    Args:
+        board_types: 需要刷新的板块类型
+        force_spot: 是否强制刷新行情快照（收盘后刷新时使用当日最终行情）
+
+    Returns:
+        dict: 板块类型 -> 写入统计（boards、members、failed_chunks）
+    """
+    try:
+        spot = spot_snapshot.get_frame(force_refresh=force_spot)
+    except Exception as e:
+        logger.warning("获取行情快照失败，板块统计只更新成分股数量: %s", e)
+        spot = None
+
+    results = {}
+    for board_type in board_types:
+        # TIMESTAMP 列只保留到秒，刷新时间同样取整，删除旧数据时才能准确比较
+        updated_at = datetime.now().replace(microsecond=0)
+        boards = _INDEXES[board_type].all_boards()
+        if not boards:
+            logger.warning("%s板块索引为空，跳过板块统计刷新", board_type)
+            continue
+        stats_rows, member_rows = compute_sector_stats(boards, spot, board_type, updated_at)
+        results[board_type] = SectorStats.replace_board_type(board_type, stats_rows, member_rows, updated_at)
+        logger.info("%s板块统计已刷新: %s", board_type, results[board_type])
+    return results
@@ -0,0 +1,171 @@
+"""全市场实时行情快照缓存
+
+ak.stock_zh_a_spot_em() 每次返回全部A股（约5000行）行情，按股票逐只调用会反复
+下载整张表。这里维护一个进程内共享的快照：
+- TTL 内所有行情查询共用同一次下载
+- 过期后只有一个线程负责刷新（single-flight），其余线程等待结果
+- 按股票代码建立索引，单只查询为 O(1)
+- 刷新失败后在 retry_after 秒内不再重试，期间继续使用旧快照（没有旧快照时直接报错）；
+  强制刷新失败时总是抛出异常
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import akshare as ak
+import pandas as pd
+
+from stockshark.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SpotSnapshot:
+    """全市场实时行情快照（进程内共享）"""
+
+    def __init__(self, ttl: Optional[int] = None,
+                 fetcher: Optional[Callable[[], pd.DataFrame]] = None,
+                 retry_after: Optional[int] = None):
+        """
+        Args:
+            ttl: 快照有效期（秒），默认取 Config.SPOT_SNAPSHOT_TTL
+            fetcher: 快照下载函数，默认 ak.stock_zh_a_spot_em
+            retry_after: 刷新失败后的重试间隔（秒），默认取 Config.SPOT_SNAPSHOT_RETRY_AFTER
+        """
+        self.ttl = Config.SPOT_SNAPSHOT_TTL if ttl is None else ttl
+        self.retry_after = Config.SPOT_SNAPSHOT_RETRY_AFTER if retry_after is None else retry_after
+        self._fetcher = fetcher or ak.stock_zh_a_spot_em
+        self._frame: Optional[pd.DataFrame] = None
+        self._index: Dict[str, dict] = {}
+        self._fetched_at = 0.0
+        # 上次刷新失败的时间点之后 retry_after 秒内不再下载
+        self._retry_at = 0.0
+        self._last_error: Optional[Exception] = None
+        self._refresh_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "last_refresh_ms": 0.0,
+            "total_refresh_ms": 0.0,
+        }
+
+    def _is_fresh(self) -> bool:
+        return self._frame is not None and time.time() - self._fetched_at < self.ttl
+
+    def _count(self, key: str, value: float = 1):
+        with self._stats_lock:
+            self._stats[key] += value
+
+    def _refresh(self, force: bool = False):
+        """刷新快照；并发调用时只有一个线程真正下载"""
+        with self._refresh_lock:
+            # 等锁期间可能已被其他线程刷新
+            if not force and self._is_fresh():
+                return
+            # 上游故障期间不让每个调用方都重新下载整张表
+            if not force and time.time() < self._retry_at:
+                if self._frame is not None:
+                    return
+                raise RuntimeError(f"行情快照刷新失败，稍后重试: {self._last_error}")
+
+            start = time.perf_counter()
+            try:
+                df = self._fetcher()
+            except Exception as e:
+                self._count("refresh_errors")
+                self._retry_at = time.time() + self.retry_after
+                self._last_error = e
+                # 强制刷新的调用方需要最新数据（如生成当日日线），不能用旧快照代替
+                if not force and self._frame is not None:
+                    logger.warning("行情快照刷新失败，继续使用旧快照: %s", e)
+                    return
+                raise
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            index = {}
+            if df is not None and not df.empty:
+                index = {str(row["代码"]): row for row in df.to_dict("records")}
+
+            self._frame = df
+            self._index = index
+            self._fetched_at = time.time()
+            self._retry_at = 0.0
+            self._last_error = None
+
+            with self._stats_lock:
+                self._stats["refreshes"] += 1
+                self._stats["last_refresh_ms"] = round(elapsed_ms, 1)
+                self._stats["total_refresh_ms"] += elapsed_ms
+            logger.info("行情快照已刷新: %d 只股票, 耗时 %.0fms", len(index), elapsed_ms)
+
+    def _ensure_fresh(self, force: bool = False):
+        if force or not self._is_fresh():
+            self._count("misses")
+            self._refresh(force=force)
+        else:
+            self._count("hits")
+
+    def get_frame(self, force_refresh: bool = False) -> pd.DataFrame:
+        """
+        获取全市场行情快照
+
+        Args:
+            force_refresh: 是否忽略 TTL 强制刷新（刷新失败时抛出异常，不返回旧快照）
+
+        Returns:
+            pd.DataFrame: ak.stock_zh_a_spot_em 原始列
+        """
+        self._ensure_fresh(force_refresh)
+        return self._frame
+
+    def get_row(self, symbol: str) -> Optional[dict]:
+        """
+        按股票代码查询快照中的一行
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            dict: 行情行（原始中文列名），不存在返回 None
+        """
+        self._ensure_fresh()
+        return self._index.get(symbol)
+
+    @property
+    def fetched_at(self) -> float:
+        """快照下载时间（unix 时间戳），未下载时为 0"""
+        return self._fetched_at
+
+    def invalidate(self):
+        """使当前快照失效，下次访问时重新下载"""
+        self._fetched_at = 0.0
+        self._retry_at = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取缓存统计
+
+        Returns:
+            dict: 命中/未命中/刷新次数及刷新耗时
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["avg_refresh_ms"] = (
+            round(stats["total_refresh_ms"] / stats["refreshes"], 1) if stats["refreshes"] else 0.0
+        )
+        stats["total_refresh_ms"] = round(stats["total_refresh_ms"], 1)
+        stats["size"] = len(self._index)
+        stats["age_seconds"] = round(time.time() - self._fetched_at, 1) if self._fetched_at else None
+        stats["ttl"] = self.ttl
+        return stats
+
+
+# 创建全局实例
+spot_snapshot = SpotSnapshot()
@@ -0,0 +1,161 @@
+"""股票代码/名称索引
+
+ak.stock_info_a_code_name() 返回全部A股代码与名称。原实现每次单股查询都重新下载
+并对整表做布尔过滤，这里改为进程内哈希索引：
+- 代码 -> 名称、名称 -> 代码 两个字典，单股查询 O(1)
+- 首次访问时优先从本地快照加载（热启动），快照过期才访问网络
+- 刷新结果原子写回本地快照
+- 刷新失败后 Config.SYMBOL_INDEX_RETRY_AFTER 秒内不再访问网络，继续使用旧数据
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import akshare as ak
+import pandas as pd
+
+from stockshark.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolIndex:
+    """股票代码/名称索引（进程内共享，带本地快照）"""
+
+    def __init__(self, ttl: Optional[int] = None, snapshot_path: Optional[str] = None):
+        """
+        Args:
+            ttl: 索引刷新周期（秒），默认取 Config.SYMBOL_INDEX_TTL
+            snapshot_path: 本地快照文件路径，默认 Config.CACHE_DIR/symbol_index.json
+        """
+        self.ttl = Config.SYMBOL_INDEX_TTL if ttl is None else ttl
+        self.snapshot_path = snapshot_path or os.path.join(Config.CACHE_DIR, "symbol_index.json")
+        self._code_to_name: Dict[str, str] = {}
+        self._name_to_code: Dict[str, str] = {}
+        self._loaded_at = 0.0
+        # 刷新失败后的退避截止时间及失败原因
+        self._retry_at = 0.0
+        self._last_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+
+    def _set(self, code_to_name: Dict[str, str], loaded_at: float):
+        self._code_to_name = code_to_name
+        self._name_to_code = {name: code for code, name in code_to_name.items()}
+        self._loaded_at = loaded_at
+
+    def _load_snapshot(self) -> bool:
+        """从本地快照加载，成功返回 True"""
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._set(snapshot["stocks"], snapshot["updated_at"])
+            logger.info("从本地快照加载股票索引: %d 只", len(self._code_to_name))
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("股票索引快照读取失败: %s", e)
+            return False
+
+    def _save_snapshot(self):
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"updated_at": self._loaded_at, "stocks": self._code_to_name},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.warning("股票索引快照写入失败: %s", e)
+
+    def _fetch(self):
+        stock_info = ak.stock_info_a_code_name()
+        df = pd.DataFrame(stock_info, columns=["code", "name"])
+        self._set(dict(zip(df["code"].astype(str), df["name"].astype(str))), time.time())
+        self._retry_at = 0.0
+        self._last_error = None
+        self._save_snapshot()
+        logger.info("股票索引已刷新: %d 只", len(self._code_to_name))
+
+    def _is_fresh(self) -> bool:
+        return bool(self._code_to_name) and time.time() - self._loaded_at < self.ttl
+
+    def _in_backoff(self) -> bool:
+        """上次刷新失败且仍在退避期内：有旧数据时直接使用，没有数据时抛出上次的错误"""
+        if time.time() >= self._retry_at:
+            return False
+        if not self._code_to_name:
+            raise RuntimeError(f"股票索引不可用（刷新失败，稍后重试）: {self._last_error}")
+        return True
+
+    def _ensure_loaded(self):
+        if self._is_fresh() or self._in_backoff():
+            return
+        with self._lock:
+            if self._is_fresh() or self._in_backoff():
+                return
+            if not self._code_to_name and self._load_snapshot() and self._is_fresh():
+                return
+            try:
+                self._fetch()
+            except Exception as e:
+                self._retry_at = time.time() + Config.SYMBOL_INDEX_RETRY_AFTER
+                self._last_error = e
+                if not self._code_to_name:
+                    raise
+                logger.warning("股票索引刷新失败，%d 秒内继续使用旧数据: %s",
+                               Config.SYMBOL_INDEX_RETRY_AFTER, e)
+
+    def refresh(self):
+        """强制从网络刷新索引"""
+        with self._lock:
+            self._fetch()
+
+    def get_name(self, code: str) -> Optional[str]:
+        """
+        根据股票代码查询名称
+
+        Args:
+            code: 股票代码
+
+        Returns:
+            str: 股票名称，不存在返回 None
+        """
+        self._ensure_loaded()
+        return self._code_to_name.get(code)
+
+    def get_code(self, name: str) -> Optional[str]:
+        """
+        根据股票名称查询代码
+
+        Args:
+            name: 股票名称（精确匹配）
+
+        Returns:
+            str: 股票代码，不存在返回 None
+        """
+        self._ensure_loaded()
+        return self._name_to_code.get(name)
+
+    def contains(self, code: str) -> bool:
+        """判断股票代码是否存在"""
+        self._ensure_loaded()
+        return code in self._code_to_name
+
+    def all_stocks(self) -> List[Dict[str, str]]:
+        """
+        获取全部股票列表
+
+        Returns:
+            list: 每个元素为包含code和name的字典
+        """
+        self._ensure_loaded()
+        return [{"code": code, "name": name} for code, name in self._code_to_name.items()]
+
+
+# 创建全局实例
+symbol_index = SymbolIndex()
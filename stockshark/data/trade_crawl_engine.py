@@ -0,0 +1,175 @@
+"""并行日线交易数据爬取引擎
+
+- 多个 worker 线程并发拉取单只股票的日线数据，共享一个令牌桶限流器控制上游请求速率
+- 单只股票请求失败时按指数退避（带抖动）重试
+- worker 把结果放入有界队列，由唯一的写入线程攒批后批量 upsert，队列满时 worker 阻塞（背压）
+- 定期输出进度与吞吐
+"""
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from stockshark.config import Config
+from stockshark.models.stock_daily_trade import StockDailyTrade
+from stockshark.utils.logger import get_logger
+from stockshark.utils.rate_limiter import TokenBucket, akshare_rate_limiter
+
+logger = get_logger(__name__)
+
+# 写入线程的结束标记
+_STOP = object()
+
+
+class DailyTradeCrawlEngine:
+    """并行日线交易数据爬取引擎"""
+
+    def __init__(self, fetch: Callable[[str], List[dict]], workers: Optional[int] = None,
+                 rate_limiter: Optional[TokenBucket] = None, max_retries: Optional[int] = None,
+                 retry_backoff: Optional[float] = None, queue_size: Optional[int] = None,
+                 write_batch_size: Optional[int] = None, progress_interval: float = 10.0):
+        """
+        Args:
+            fetch: 拉取单只股票交易记录的函数，失败时抛出异常，无数据返回空列表
+            workers: 并发 worker 数，默认取 Config.CRAWL_WORKERS
+            rate_limiter: 上游请求限流器，默认使用全局 akshare_rate_limiter
+            max_retries: 单只股票失败后的重试次数，默认取 Config.CRAWL_MAX_RETRIES
+            retry_backoff: 重试退避基数（秒），第 n 次重试等待约 backoff * 2^(n-1)，默认取 Config.CRAWL_RETRY_BACKOFF
+            queue_size: worker 到写入线程的队列长度，默认取 Config.CRAWL_QUEUE_SIZE
+            write_batch_size: 写入线程每次批量写入的行数，默认取 Config.BULK_CHUNK_SIZE
+            progress_interval: 进度日志输出间隔（秒）
+        """
+        self.fetch = fetch
+        self.workers = workers or Config.CRAWL_WORKERS
+        self.rate_limiter = rate_limiter or akshare_rate_limiter
+        self.max_retries = Config.CRAWL_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_backoff = Config.CRAWL_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        self.queue_size = queue_size or Config.CRAWL_QUEUE_SIZE
+        self.write_batch_size = write_batch_size or Config.BULK_CHUNK_SIZE
+        self.progress_interval = progress_interval
+
+    def _fetch_with_retry(self, symbol: str, stats: Dict, stats_lock: threading.Lock) -> List[dict]:
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                return self.fetch(symbol)
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with stats_lock:
+                    stats['retries'] += 1
+                delay = self.retry_backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                logger.debug(f"获取股票 {symbol} 交易数据失败，{delay:.1f}s 后第 {attempt} 次重试: {e}")
+                time.sleep(delay)
+
+    def _writer(self, rows_queue: queue.Queue, stats: Dict):
+        buffer = []
+
+        def flush():
+            if not buffer:
+                return
+            try:
+                result = StockDailyTrade.bulk_upsert(buffer)
+                stats['rows_written'] += result['rows']
+                stats['rows_failed'] += len(buffer) - result['rows']
+            except Exception as e:
+                stats['rows_failed'] += len(buffer)
+                logger.error(f"批量写入交易数据失败（{len(buffer)} 行）: {e}")
+            buffer.clear()
+
+        while True:
+            item = rows_queue.get()
+            if item is _STOP:
+                break
+            buffer.extend(item)
+            if len(buffer) >= self.write_batch_size:
+                flush()
+        flush()
+
+    def _log_progress(self, done: int, total: int, stats: Dict, start: float):
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        logger.info(f"进度: {done}/{total} 只股票, 拉取 {stats['rows_fetched']} 行, "
+                    f"已写入 {stats['rows_written']} 行, 失败 {stats['failed_symbols']} 只, "
+                    f"{rate:.1f} 只/秒, 预计剩余 {eta:.0f}s")
+
+    def run(self, symbols: Iterable[str]) -> Dict:
+        """
+        并行爬取并写入
+
+        Args:
+            symbols: 股票代码列表
+
+        Returns:
+            dict: 统计信息 symbols / succeeded_symbols / empty_symbols / failed_symbols /
+                  failed / retries / rows_fetched / rows_written / rows_failed /
+                  elapsed_seconds / symbols_per_sec / rows_per_sec
+        """
+        symbols = list(symbols)
+        stats = {
+            'symbols': len(symbols), 'succeeded_symbols': 0, 'empty_symbols': 0,
+            'failed_symbols': 0, 'failed': [], 'retries': 0,
+            'rows_fetched': 0, 'rows_written': 0, 'rows_failed': 0,
+        }
+        stats_lock = threading.Lock()
+        start = time.perf_counter()
+        created_at = datetime.now()
+
+        rows_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        writer = threading.Thread(target=self._writer, args=(rows_queue, stats),
+                                  name='daily-trade-writer', daemon=True)
+        writer.start()
+
+        def crawl_one(symbol):
+            trades = self._fetch_with_retry(symbol, stats, stats_lock)
+            if trades:
+                # 队列满时阻塞，避免拉取速度远超写入速度时堆积内存
+                rows_queue.put([StockDailyTrade.to_row(trade, created_at) for trade in trades])
+            return len(trades)
+
+        logger.info(f"开始并行爬取 {len(symbols)} 只股票交易数据（{self.workers} 个 worker）")
+        last_report = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(crawl_one, symbol): symbol for symbol in symbols}
+                for done, future in enumerate(as_completed(futures), 1):
+                    symbol = futures[future]
+                    try:
+                        count = future.result()
+                        with stats_lock:
+                            stats['rows_fetched'] += count
+                            if count:
+                                stats['succeeded_symbols'] += 1
+                            else:
+                                stats['empty_symbols'] += 1
+                    except Exception as e:
+                        with stats_lock:
+                            stats['failed_symbols'] += 1
+                            stats['failed'].append(symbol)
+                        logger.warning(f"股票 {symbol} 交易数据爬取失败（已重试 {self.max_retries} 次）: {e}")
+
+                    now = time.perf_counter()
+                    if now - last_report >= self.progress_interval:
+                        self._log_progress(done, len(symbols), stats, start)
+                        last_report = now
+        finally:
+            rows_queue.put(_STOP)
+            writer.join()
+
+        elapsed = time.perf_counter() - start
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        stats['symbols_per_sec'] = round(len(symbols) / elapsed, 2) if elapsed > 0 else 0.0
+        stats['rows_per_sec'] = round(stats['rows_written'] / elapsed, 1) if elapsed > 0 else 0.0
+        logger.info(f"并行爬取完成: {stats['succeeded_symbols']}/{len(symbols)} 只成功, "
+                    f"无数据 {stats['empty_symbols']} 只, 失败 {stats['failed_symbols']} 只, "
+                    f"重试 {stats['retries']} 次, 写入 {stats['rows_written']} 行"
+                    f"(失败 {stats['rows_failed']} 行), 耗时 {stats['elapsed_seconds']}s, "
+                    f"{stats['symbols_per_sec']} 只/秒, {stats['rows_per_sec']} 行/秒, "
+                    f"限流等待 {self.rate_limiter.waited_seconds:.1f}s")
+        return stats
@@ -0,0 +1,169 @@
+"""A股交易日历
+
+基于 ak.tool_trade_date_hist_sina()（包含历史及当年剩余交易日），用于判断某段日期内
+应当存在哪些日线、识别数据缺口。日历持久化到本地快照，过期后才重新下载；
+下载失败且没有快照时退化为工作日（周一至周五）。
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import List, Optional, Union
+
+import akshare as ak
+import pandas as pd
+
+from stockshark.config import Config
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, date, datetime]
+
+# 收盘后日线才完整（留出数据源更新时间）
+MARKET_CLOSE = dt_time(15, 30)
+
+# 日历下载失败后的重试间隔（秒）
+RETRY_INTERVAL = 300
+
+
+def to_date(value: DateLike) -> date:
+    """将 YYYY-MM-DD / YYYYMMDD 字符串、datetime 统一转换为 date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value.replace('-', ''), '%Y%m%d').date()
+
+
+class TradingCalendar:
+    """A股交易日历（进程内共享，带本地快照）"""
+
+    def __init__(self, ttl: Optional[int] = None, snapshot_path: Optional[str] = None):
+        """
+        Args:
+            ttl: 日历刷新周期（秒），默认取 Config.TRADING_CALENDAR_TTL
+            snapshot_path: 本地快照路径，默认 Config.CACHE_DIR/trading_calendar.json
+        """
+        self.ttl = Config.TRADING_CALENDAR_TTL if ttl is None else ttl
+        self.snapshot_path = snapshot_path or os.path.join(Config.CACHE_DIR, "trading_calendar.json")
+        # 升序排列的交易日
+        self._days: List[date] = []
+        self._loaded_at = 0.0
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load_snapshot(self) -> bool:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._days = [date.fromisoformat(d) for d in snapshot["days"]]
+            self._loaded_at = snapshot["updated_at"]
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("交易日历快照读取失败: %s", e)
+            return False
+
+    def _save_snapshot(self):
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"updated_at": self._loaded_at,
+                           "days": [d.isoformat() for d in self._days]}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.warning("交易日历快照写入失败: %s", e)
+
+    def _fetch(self):
+        df = ak.tool_trade_date_hist_sina()
+        self._days = sorted(pd.to_datetime(df["trade_date"]).dt.date)
+        self._loaded_at = time.time()
+        self._save_snapshot()
+        logger.info("交易日历已刷新: %d 个交易日", len(self._days))
+
+    def _is_fresh(self) -> bool:
+        return bool(self._days) and time.time() - self._loaded_at < self.ttl
+
+    def _ensure_loaded(self):
+        if self._is_fresh() or time.time() - self._failed_at < RETRY_INTERVAL:
+            return
+        with self._lock:
+            if self._is_fresh():
+                return
+            if not self._days and self._load_snapshot() and self._is_fresh():
+                return
+            try:
+                self._fetch()
+            except Exception as e:
+                self._failed_at = time.time()
+                logger.warning("交易日历刷新失败%s: %s",
+                               "，继续使用旧数据" if self._days else "，按工作日估算", e)
+
+    def trading_days(self, start: DateLike, end: DateLike) -> List[date]:
+        """
+        获取区间内的交易日
+
+        Args:
+            start: 开始日期（含）
+            end: 结束日期（含）
+
+        Returns:
+            list: 升序的交易日列表
+        """
+        self._ensure_loaded()
+        start, end = to_date(start), to_date(end)
+        if start > end:
+            return []
+        days = self._days
+        if not days or end > days[-1]:
+            # 日历不可用或区间超出日历范围时，超出部分按工作日估算
+            known = days[bisect.bisect_left(days, start):] if days else []
+            tail_start = days[-1] + timedelta(days=1) if days else start
+            tail = [d.date() for d in pd.bdate_range(max(start, tail_start), end)]
+            return known + tail
+        return days[bisect.bisect_left(days, start):bisect.bisect_right(days, end)]
+
+    def is_trading_day(self, day: DateLike) -> bool:
+        """判断是否为交易日"""
+        day = to_date(day)
+        return self.trading_days(day, day) == [day]
+
+    def latest_trading_day(self, on_or_before: Optional[DateLike] = None) -> date:
+        """
+        获取不晚于指定日期的最近一个交易日
+
+        Args:
+            on_or_before: 参考日期，默认今天
+
+        Returns:
+            date: 最近交易日
+        """
+        ref = to_date(on_or_before or datetime.now())
+        days = self.trading_days(ref - timedelta(days=30), ref)
+        return days[-1] if days else ref
+
+    def last_closed_trading_day(self, now: Optional[datetime] = None) -> date:
+        """
+        获取最近一个已收盘的交易日（交易日收盘前返回上一交易日，避免把盘中数据当作日线）
+
+        Args:
+            now: 参考时间，默认当前时间
+
+        Returns:
+            date: 最近已收盘交易日
+        """
+        now = now or datetime.now()
+        latest = self.latest_trading_day(now)
+        if latest == now.date() and now.time() < MARKET_CLOSE:
+            return self.latest_trading_day(latest - timedelta(days=1))
+        return latest
+
+
+# 创建全局实例
+trading_calendar = TradingCalendar()
@@ -0,0 +1,139 @@
+"""板块统计模型"""
+from stockshark.utils.database import get_mysql_connection
+from stockshark.utils.bulk_writer import BulkWriter
+
+
+class SectorStats:
+    """板块（行业/概念）统计与成分股模型（由 sector_aggregator 定时全量刷新）"""
+    
+    # 批量写入的列顺序
+    COLUMNS = ('board_type', 'board_name', 'board_code', 'member_count', 'total_market_cap',
+               'avg_change_pct', 'updated_at')
+    UPDATE_COLUMNS = ('board_code', 'member_count', 'total_market_cap', 'avg_change_pct', 'updated_at')
+    MEMBER_COLUMNS = ('board_type', 'board_name', 'symbol', 'stock_name', 'updated_at')
+    MEMBER_UPDATE_COLUMNS = ('stock_name', 'updated_at')
+    
+    @staticmethod
+    def create_table():
+        """创建板块统计表和板块成分股表"""
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sector_stats (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    board_type VARCHAR(16) NOT NULL COMMENT '板块类型（industry/concept）',
+                    board_name VARCHAR(64) NOT NULL COMMENT '板块名称',
+                    board_code VARCHAR(16) DEFAULT NULL COMMENT '板块代码',
+                    member_count INT NOT NULL DEFAULT 0 COMMENT '成分股数量',
+                    total_market_cap DECIMAL(24, 2) DEFAULT NULL COMMENT '成分股总市值（元）',
+                    avg_change_pct DECIMAL(10, 4) DEFAULT NULL COMMENT '成分股平均涨跌幅（%）',
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '更新时间',
+                    UNIQUE KEY uk_type_name (board_type, board_name)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='板块统计表'
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sector_members (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    board_type VARCHAR(16) NOT NULL COMMENT '板块类型（industry/concept）',
+                    board_name VARCHAR(64) NOT NULL COMMENT '板块名称',
+                    symbol VARCHAR(10) NOT NULL COMMENT '股票代码',
+                    stock_name VARCHAR(50) DEFAULT NULL COMMENT '股票名称',
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '更新时间',
+                    UNIQUE KEY uk_type_name_symbol (board_type, board_name, symbol),
+                    INDEX idx_symbol (symbol)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='板块成分股表'
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def replace_board_type(board_type, stats_rows, member_rows, updated_at, chunk_size=None):
+        """
+        写入一类板块的最新统计和成分股，并删除本次未出现的旧数据
+        
+        Args:
+            board_type: 板块类型
+            stats_rows: 按 SectorStats.COLUMNS 顺序排列的元组序列
+            member_rows: 按 SectorStats.MEMBER_COLUMNS 顺序排列的元组序列
+            updated_at: 本次刷新时间（与行中的 updated_at 一致）
+            chunk_size: 每个事务的行数，默认取 Config.BULK_CHUNK_SIZE
+        
+        Returns:
+            dict: boards、members 写入行数及 failed_chunks
+        """
+        stats = BulkWriter('sector_stats', SectorStats.COLUMNS,
+                           SectorStats.UPDATE_COLUMNS, chunk_size).write(stats_rows)
+        members = BulkWriter('sector_members', SectorStats.MEMBER_COLUMNS,
+                             SectorStats.MEMBER_UPDATE_COLUMNS, chunk_size).write(member_rows)
+        failed_chunks = stats['failed_chunks'] + members['failed_chunks']
+        # 写入不完整时保留旧数据，避免删掉本次没写进去的板块
+        if failed_chunks == 0:
+            conn = get_mysql_connection()
+            try:
+                cursor = conn.cursor()
+                for table in ('sector_stats', 'sector_members'):
+                    cursor.execute(f"DELETE FROM {table} WHERE board_type = %s AND updated_at < %s",
+                                   (board_type, updated_at))
+                conn.commit()
+            finally:
+                conn.close()
+        return {'boards': stats['rows'], 'members': members['rows'], 'failed_chunks': failed_chunks}
+    
+    @staticmethod
+    def get_stats(board_type, board_names):
+        """
+        获取板块统计
+        
+        Args:
+            board_type: 板块类型
+            board_names: 板块名称列表
+        
+        Returns:
+            dict: 板块名称 -> 统计记录
+        """
+        if not board_names:
+            return {}
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT * FROM sector_stats
+                WHERE board_type = %s AND board_name IN ({', '.join(['%s'] * len(board_names))})
+            """, [board_type] + list(board_names))
+            return {row['board_name']: row for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"获取板块统计失败: {e}")
+            return {}
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_symbol_boards(symbol):
+        """
+        获取股票所属的板块
+        
+        Args:
+            symbol: 股票代码
+        
+        Returns:
+            dict: {'stock_name': 股票名称, 'industry': [板块名称, ...], 'concept': [板块名称, ...]}
+        """
+        result = {'stock_name': '', 'industry': [], 'concept': []}
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT board_type, board_name, stock_name FROM sector_members
+                WHERE symbol = %s ORDER BY id
+            """, (symbol,))
+            for row in cursor.fetchall():
+                result.setdefault(row['board_type'], []).append(row['board_name'])
+                result['stock_name'] = result['stock_name'] or row['stock_name'] or ''
+            return result
+        except Exception as e:
+            print(f"获取股票所属板块失败: {e}")
+            return result
+        finally:
+            conn.close()
@@ -1,11 +1,19 @@
 """股票基本信息模型"""
 from datetime import datetime
 from stockshark.utils.database import get_mysql_connection
+from stockshark.utils.bulk_writer import BulkWriter
+from stockshark.utils.cache import stock_cache
 
 
 class StockBasicInfo:
     """股票基本信息模型"""
     
+    # 批量写入的列顺序
+    COLUMNS = ('symbol', 'name', 'full_name', 'industry', 'concept', 'region', 'market',
+               'list_date', 'created_at', 'updated_at')
+    UPDATE_COLUMNS = ('name', 'full_name', 'industry', 'concept', 'region', 'market',
+                      'list_date', 'updated_at')
+    
     def __init__(self, symbol, name, full_name='', industry='', concept='', 
                  region='', market='', list_date=None):
         self.symbol = symbol
@@ -72,6 +80,7 @@ class StockBasicInfo:
                 self.region, self.market, self.list_date, self.created_at, self.updated_at
             ))
             conn.commit()
+            stock_cache.invalidate_tags([self.symbol])
             return True
         except Exception as e:
             print(f"保存股票基本信息失败: {e}")
@@ -113,40 +122,40 @@ class StockBasicInfo:
         finally:
             conn.close()
     
+    @staticmethod
+    def bulk_upsert(rows, chunk_size=None, use_load_data=None):
+        """
+        批量upsert股票基本信息
+        
+        Args:
+            rows: 按 StockBasicInfo.COLUMNS 顺序排列的元组序列
+            chunk_size: 每个事务的行数，默认取 Config.BULK_CHUNK_SIZE
+            use_load_data: 是否使用 LOAD DATA LOCAL INFILE
+        
+        Returns:
+            dict: 写入统计（rows、rows_per_sec 等）
+        """
+        writer = BulkWriter('stock_basic_info', StockBasicInfo.COLUMNS,
+                            StockBasicInfo.UPDATE_COLUMNS, chunk_size, use_load_data)
+        result = writer.write(rows)
+        # 新数据写入后删除相关股票的查询缓存
+        stock_cache.invalidate_tags({row[0] for row in rows})
+        return result
+    
     @staticmethod
     def batch_save(stock_infos):
         """批量保存股票基本信息"""
-        conn = get_mysql_connection()
         try:
-            cursor = conn.cursor()
             updated_at = datetime.now()
-            
-            for stock_info in stock_infos:
-                cursor.execute("""
-                    INSERT INTO stock_basic_info 
-                    (symbol, name, full_name, industry, concept, region, market, list_date, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                    name = VALUES(name),
-                    full_name = VALUES(full_name),
-                    industry = VALUES(industry),
-                    concept = VALUES(concept),
-                    region = VALUES(region),
-                    market = VALUES(market),
-                    list_date = VALUES(list_date),
-                    updated_at = VALUES(updated_at)
-                """, (
-                    stock_info['symbol'], stock_info['name'], stock_info.get('full_name', ''),
-                    stock_info.get('industry', ''), stock_info.get('concept', ''),
-                    stock_info.get('region', ''), stock_info.get('market', ''),
-                    stock_info.get('list_date'), stock_info.get('created_at', datetime.now()),
-                    updated_at
-                ))
-            
-            conn.commit()
-            return True
+            rows = [(
+                stock_info['symbol'], stock_info['name'], stock_info.get('full_name', ''),
+                stock_info.get('industry', ''), stock_info.get('concept', ''),
+                stock_info.get('region', ''), stock_info.get('market', ''),
+                stock_info.get('list_date'), stock_info.get('created_at', updated_at),
+                updated_at
+            ) for stock_info in stock_infos]
+            stats = StockBasicInfo.bulk_upsert(rows)
+            return stats['failed_chunks'] == 0
         except Exception as e:
             print(f"批量保存股票基本信息失败: {e}")
             return False
-        finally:
-            conn.close()
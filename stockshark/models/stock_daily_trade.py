@@ -1,11 +1,19 @@
 """股票每日交易信息模型"""
 from datetime import datetime, date
 from stockshark.utils.database import get_mysql_connection
+from stockshark.utils.bulk_writer import BulkWriter
+from stockshark.utils.cache import stock_cache
 
 
 class StockDailyTrade:
     """股票每日交易信息模型"""
     
+    # 批量写入的列顺序
+    COLUMNS = ('symbol', 'trade_date', 'open_price', 'high_price', 'low_price', 'close_price',
+               'volume', 'amount', 'change_pct', 'turnover_rate', 'created_at')
+    UPDATE_COLUMNS = ('open_price', 'high_price', 'low_price', 'close_price',
+                      'volume', 'amount', 'change_pct', 'turnover_rate')
+    
     def __init__(self, symbol, trade_date, open_price, high_price, low_price, 
                  close_price, volume, amount, change_pct=None, turnover_rate=None):
         self.symbol = symbol
@@ -76,6 +84,8 @@ class StockDailyTrade:
                 self.turnover_rate, self.created_at
             ))
             conn.commit()
+            StockDailyTrade._mirror_to_bar_store([StockDailyTrade.to_row(vars(self), self.created_at)])
+            stock_cache.invalidate_tags([self.symbol])
             return True
         except Exception as e:
             print(f"保存股票每日交易信息失败: {e}")
@@ -131,6 +141,47 @@ class StockDailyTrade:
         finally:
             conn.close()
     
+    @staticmethod
+    def get_trade_panel(symbols=None, start_date=None, end_date=None, columns=None):
+        """
+        获取多只股票的日线面板数据（计算技术指标、导出列式存储用）
+        
+        Args:
+            symbols: 股票代码列表，None表示全部
+            start_date: 开始日期
+            end_date: 结束日期
+            columns: 除 symbol、trade_date 外需要的列，默认 open_price、close_price、volume
+        
+        Returns:
+            list: symbol、trade_date 及所需各列，按股票、日期升序
+        
+        Raises:
+            Exception: 数据库错误直接抛出（返回空结果会被当作没有日线，导出时会清空列式存储）
+        """
+        columns = columns or ('open_price', 'close_price', 'volume')
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            query = (f"SELECT symbol, trade_date, {', '.join(columns)} "
+                     "FROM stock_daily_trade WHERE 1=1")
+            params = []
+            if symbols is not None:
+                if not symbols:
+                    return []
+                query += f" AND symbol IN ({', '.join(['%s'] * len(symbols))})"
+                params.extend(symbols)
+            if start_date:
+                query += " AND trade_date >= %s"
+                params.append(start_date)
+            if end_date:
+                query += " AND trade_date <= %s"
+                params.append(end_date)
+            query += " ORDER BY symbol, trade_date"
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            conn.close()
+    
     @staticmethod
     def get_latest_trade_date(symbol):
         """获取股票最新交易日期"""
@@ -149,42 +200,158 @@ class StockDailyTrade:
             conn.close()
     
     @staticmethod
-    def batch_save(trade_records):
-        """批量保存股票交易信息"""
+    def get_latest_trade_dates(symbols=None):
+        """
+        一次分组查询获取多只股票的最新交易日期
+        
+        Args:
+            symbols: 股票代码列表，None表示全部
+        
+        Returns:
+            dict: 股票代码 -> 最新交易日期（没有数据的股票不在结果中）
+        
+        Raises:
+            Exception: 数据库错误直接抛出（返回空结果会被当作没有数据而重新拉取全部历史）
+        """
         conn = get_mysql_connection()
         try:
             cursor = conn.cursor()
+            query = "SELECT symbol, MAX(trade_date) AS max_date FROM stock_daily_trade"
+            params = []
+            if symbols is not None:
+                if not symbols:
+                    return {}
+                query += f" WHERE symbol IN ({', '.join(['%s'] * len(symbols))})"
+                params = list(symbols)
+            query += " GROUP BY symbol"
+            cursor.execute(query, params)
+            return {row['symbol']: row['max_date'] for row in cursor.fetchall()}
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_trade_date_stats(start_date, end_date, symbols=None):
+        """
+        一次分组查询统计区间内每只股票的记录数和首末日期（用于检测缺口）
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            symbols: 股票代码列表，None表示全部
+        
+        Returns:
+            dict: 股票代码 -> {'count': 记录数, 'first': 最早日期, 'last': 最新日期}
+        """
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            query = """
+                SELECT symbol, COUNT(*) AS cnt, MIN(trade_date) AS first_date, MAX(trade_date) AS last_date
+                FROM stock_daily_trade WHERE trade_date BETWEEN %s AND %s
+            """
+            params = [start_date, end_date]
+            if symbols is not None:
+                if not symbols:
+                    return {}
+                query += f" AND symbol IN ({', '.join(['%s'] * len(symbols))})"
+                params.extend(symbols)
+            query += " GROUP BY symbol"
+            cursor.execute(query, params)
+            return {row['symbol']: {'count': row['cnt'], 'first': row['first_date'], 'last': row['last_date']}
+                    for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"统计交易日期失败: {e}")
+            return {}
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_trade_dates(symbol, start_date=None, end_date=None):
+        """获取股票已存储的交易日期列表（升序）"""
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            query = "SELECT trade_date FROM stock_daily_trade WHERE symbol = %s"
+            params = [symbol]
+            if start_date:
+                query += " AND trade_date >= %s"
+                params.append(start_date)
+            if end_date:
+                query += " AND trade_date <= %s"
+                params.append(end_date)
+            query += " ORDER BY trade_date"
+            cursor.execute(query, params)
+            return [row['trade_date'] for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"获取交易日期失败: {e}")
+            return []
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def bulk_upsert(rows, chunk_size=None, use_load_data=None):
+        """
+        批量upsert股票交易信息
+        
+        Args:
+            rows: 按 StockDailyTrade.COLUMNS 顺序排列的元组序列
+            chunk_size: 每个事务的行数，默认取 Config.BULK_CHUNK_SIZE
+            use_load_data: 是否使用 LOAD DATA LOCAL INFILE
+        
+        Returns:
+            dict: 写入统计（rows、rows_per_sec 等）
+        """
+        # rows 可能是生成器，写入、镜像和删除缓存都需要遍历
+        rows = list(rows)
+        committed = []
+        writer = BulkWriter('stock_daily_trade', StockDailyTrade.COLUMNS,
+                            StockDailyTrade.UPDATE_COLUMNS, chunk_size, use_load_data)
+        result = writer.write(rows, on_commit=committed.extend)
+        # 只镜像已提交的行，回滚的 chunk 不能出现在列式存储中
+        StockDailyTrade._mirror_to_bar_store(committed)
+        # 新数据写入后删除相关股票的查询缓存
+        stock_cache.invalidate_tags({row[0] for row in rows})
+        return result
+    
+    @staticmethod
+    def _mirror_to_bar_store(rows):
+        """同步写入本地列式存储（尽力而为，失败不影响 MySQL 写入结果）"""
+        try:
+            from stockshark.data.bar_store import bar_store
+            bar_store.write_rows(rows, StockDailyTrade.COLUMNS)
+        except Exception as e:
+            print(f"同步日线列式存储失败: {e}")
+    
+    @staticmethod
+    def to_row(record, created_at=None):
+        """
+        将交易记录字典转换为按 StockDailyTrade.COLUMNS 排列的元组
+        
+        Args:
+            record: 交易记录字典
+            created_at: 创建时间，默认当前时间
+        
+        Returns:
+            tuple: 行数据
+        """
+        return (
+            record['symbol'], record['trade_date'], record['open_price'],
+            record['high_price'], record['low_price'], record['close_price'],
+            record['volume'], record['amount'], record.get('change_pct'),
+            record.get('turnover_rate'), created_at or datetime.now()
+        )
+    
+    @staticmethod
+    def batch_save(trade_records):
+        """批量保存股票交易信息"""
+        try:
             created_at = datetime.now()
-            
-            for record in trade_records:
-                cursor.execute("""
-                    INSERT INTO stock_daily_trade 
-                    (symbol, trade_date, open_price, high_price, low_price, close_price, 
-                     volume, amount, change_pct, turnover_rate, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                    open_price = VALUES(open_price),
-                    high_price = VALUES(high_price),
-                    low_price = VALUES(low_price),
-                    close_price = VALUES(close_price),
-                    volume = VALUES(volume),
-                    amount = VALUES(amount),
-                    change_pct = VALUES(change_pct),
-                    turnover_rate = VALUES(turnover_rate)
-                """, (
-                    record['symbol'], record['trade_date'], record['open_price'], 
-                    record['high_price'], record['low_price'], record['close_price'],
-                    record['volume'], record['amount'], record.get('change_pct'),
-                    record.get('turnover_rate'), created_at
-                ))
-            
-            conn.commit()
-            return True
+            rows = [StockDailyTrade.to_row(record, created_at) for record in trade_records]
+            stats = StockDailyTrade.bulk_upsert(rows)
+            return stats['failed_chunks'] == 0
         except Exception as e:
             print(f"批量保存股票交易信息失败: {e}")
             return False
-        finally:
-            conn.close()
     
     @staticmethod
     def get_all_symbols():
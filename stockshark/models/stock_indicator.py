@@ -0,0 +1,192 @@
+"""股票技术指标模型"""
+from stockshark.utils.database import get_mysql_connection
+from stockshark.utils.bulk_writer import BulkWriter
+
+
+class StockIndicator:
+    """股票每日技术指标模型（由 IndicatorEngine 批量计算写入）"""
+    
+    # 指标列（与 DataProcessor.calculate_technical_indicators 的输出一致）
+    INDICATOR_COLUMNS = ('close_price', 'change_pct', 'ma5', 'ma10', 'ma20', 'volume_ma5', 'volume_ma10',
+                         'ema12', 'ema26', 'dif', 'dea', 'macd', 'rsi')
+    # 批量写入的列顺序
+    COLUMNS = ('symbol', 'trade_date') + INDICATOR_COLUMNS + ('created_at',)
+    UPDATE_COLUMNS = INDICATOR_COLUMNS
+    
+    @staticmethod
+    def create_table():
+        """创建股票技术指标表"""
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stock_indicators (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    symbol VARCHAR(10) NOT NULL COMMENT '股票代码',
+                    trade_date DATE NOT NULL COMMENT '交易日期',
+                    close_price DECIMAL(10, 2) DEFAULT NULL COMMENT '收盘价',
+                    change_pct DECIMAL(10, 4) DEFAULT NULL COMMENT '日内涨跌幅（%，相对开盘价）',
+                    ma5 DECIMAL(12, 4) DEFAULT NULL COMMENT '5日均线',
+                    ma10 DECIMAL(12, 4) DEFAULT NULL COMMENT '10日均线',
+                    ma20 DECIMAL(12, 4) DEFAULT NULL COMMENT '20日均线',
+                    volume_ma5 DECIMAL(20, 2) DEFAULT NULL COMMENT '5日均量',
+                    volume_ma10 DECIMAL(20, 2) DEFAULT NULL COMMENT '10日均量',
+                    ema12 DOUBLE DEFAULT NULL COMMENT '12日EMA',
+                    ema26 DOUBLE DEFAULT NULL COMMENT '26日EMA',
+                    dif DOUBLE DEFAULT NULL COMMENT 'MACD DIF',
+                    dea DOUBLE DEFAULT NULL COMMENT 'MACD DEA',
+                    macd DECIMAL(12, 4) DEFAULT NULL COMMENT 'MACD柱',
+                    rsi DECIMAL(8, 4) DEFAULT NULL COMMENT '14日RSI',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+                    UNIQUE KEY uk_symbol_date (symbol, trade_date),
+                    INDEX idx_trade_date (trade_date)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='股票技术指标表'
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def bulk_upsert(rows, chunk_size=None):
+        """
+        批量upsert技术指标
+        
+        Args:
+            rows: 按 StockIndicator.COLUMNS 顺序排列的元组序列
+            chunk_size: 每个事务的行数，默认取 Config.BULK_CHUNK_SIZE
+        
+        Returns:
+            dict: 写入统计（rows、rows_per_sec 等）
+        """
+        writer = BulkWriter('stock_indicators', StockIndicator.COLUMNS,
+                            StockIndicator.UPDATE_COLUMNS, chunk_size)
+        return writer.write(rows)
+    
+    @staticmethod
+    def get_latest_states(symbols=None):
+        """
+        获取每只股票最新一条指标（增量计算时作为 EMA 的起点）
+        
+        Args:
+            symbols: 股票代码列表，None表示全部
+        
+        Returns:
+            dict: 股票代码 -> {'trade_date', 'ema12', 'ema26', 'dea'}
+        """
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            where = ""
+            params = []
+            if symbols is not None:
+                if not symbols:
+                    return {}
+                where = f" WHERE symbol IN ({', '.join(['%s'] * len(symbols))})"
+                params = list(symbols)
+            cursor.execute(f"""
+                SELECT i.symbol, i.trade_date, i.ema12, i.ema26, i.dea
+                FROM stock_indicators i
+                JOIN (SELECT symbol, MAX(trade_date) AS max_date FROM stock_indicators{where}
+                      GROUP BY symbol) latest
+                  ON i.symbol = latest.symbol AND i.trade_date = latest.max_date
+            """, params)
+            return {row['symbol']: row for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"获取最新技术指标失败: {e}")
+            return {}
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_symbols_missing_rows(symbols):
+        """
+        找出最新指标日期之前存在没有指标的日线的股票（如缺口补齐后插入的历史K线），
+        这些股票的 EMA 链需要从完整历史重新计算
+        
+        Args:
+            symbols: 股票代码列表
+        
+        Returns:
+            set: 股票代码
+        """
+        if not symbols:
+            return set()
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT t.symbol
+                FROM stock_daily_trade t
+                JOIN (SELECT symbol, MAX(trade_date) AS max_date FROM stock_indicators
+                      WHERE symbol IN ({', '.join(['%s'] * len(symbols))})
+                      GROUP BY symbol) latest
+                  ON t.symbol = latest.symbol AND t.trade_date < latest.max_date
+                LEFT JOIN stock_indicators i
+                  ON i.symbol = t.symbol AND i.trade_date = t.trade_date
+                WHERE i.id IS NULL
+                GROUP BY t.symbol
+            """, list(symbols))
+            return {row['symbol'] for row in cursor.fetchall()}
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_by_symbol(symbol, start_date=None, end_date=None, limit=100):
+        """获取股票技术指标历史（按日期倒序）"""
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            query = "SELECT * FROM stock_indicators WHERE symbol = %s"
+            params = [symbol]
+            if start_date:
+                query += " AND trade_date >= %s"
+                params.append(start_date)
+            if end_date:
+                query += " AND trade_date <= %s"
+                params.append(end_date)
+            query += " ORDER BY trade_date DESC LIMIT %s"
+            params.append(limit)
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"获取股票技术指标失败: {e}")
+            return []
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_by_date(trade_date=None, symbols=None):
+        """
+        获取某个交易日全部（或指定）股票的技术指标，用于全市场筛选
+        
+        Args:
+            trade_date: 交易日期，默认表中最新日期
+            symbols: 股票代码列表，None表示全部
+        
+        Returns:
+            list: 指标记录
+        """
+        conn = get_mysql_connection()
+        try:
+            cursor = conn.cursor()
+            if trade_date is None:
+                cursor.execute("SELECT MAX(trade_date) AS max_date FROM stock_indicators")
+                row = cursor.fetchone()
+                trade_date = row['max_date'] if row else None
+                if trade_date is None:
+                    return []
+            query = "SELECT * FROM stock_indicators WHERE trade_date = %s"
+            params = [trade_date]
+            if symbols is not None:
+                if not symbols:
+                    return []
+                query += f" AND symbol IN ({', '.join(['%s'] * len(symbols))})"
+                params.extend(symbols)
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"获取技术指标失败: {e}")
+            return []
+        finally:
+            conn.close()
+
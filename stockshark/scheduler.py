@@ -1,7 +1,14 @@
 """定时任务调度器"""
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from stockshark.analysis.evaluation_cache import get_top_requested
+from stockshark.analysis.llm_analyzer import prewarm_evaluations
+from stockshark.analysis.search_index import stock_search_index
+from stockshark.config import Config
+from stockshark.data.board_index import concept_index, industry_index
 from stockshark.data.crawler import StockDataCrawler
+from stockshark.data.indicator_engine import indicator_engine
+from stockshark.data.sector_aggregator import refresh_sector_stats
 from stockshark.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -54,6 +61,33 @@ def add_scheduled_jobs():
         replace_existing=True
     )
     logger.info("已添加定时任务: 每周一凌晨2点更新股票基本信息")
+    
+    scheduler.add_job(
+        func=refresh_board_index_job,
+        trigger=CronTrigger(hour=1, minute=30),
+        id='daily_board_index_refresh',
+        name='每日重建板块成分索引',
+        replace_existing=True
+    )
+    logger.info("已添加定时任务: 每日凌晨1:30重建板块成分索引")
+    
+    scheduler.add_job(
+        func=refresh_sector_stats_job,
+        trigger=CronTrigger(day_of_week='mon-fri', hour=15, minute=30),
+        id='daily_sector_stats_refresh',
+        name='收盘后刷新板块统计',
+        replace_existing=True
+    )
+    logger.info("已添加定时任务: 工作日15:30刷新板块统计")
+    
+    scheduler.add_job(
+        func=prewarm_evaluations_job,
+        trigger=CronTrigger(day_of_week='mon-fri', hour=16, minute=30),
+        id='daily_evaluation_prewarm',
+        name='收盘后预评估关注股票',
+        replace_existing=True
+    )
+    logger.info("已添加定时任务: 工作日16:30预评估关注股票")
 
 
 def crawl_daily_trade_job():
@@ -69,6 +103,13 @@ def crawl_daily_trade_job():
         logger.info(f"每日交易数据爬取任务完成: 成功 {success} 条记录, 失败 {fail} 只股票")
     except Exception as e:
         logger.error(f"每日交易数据爬取任务失败: {e}")
+    
+    # 日线入库后增量计算技术指标
+    try:
+        stats = indicator_engine.update()
+        logger.info(f"技术指标更新完成: 写入 {stats['rows_written']} 条")
+    except Exception as e:
+        logger.error(f"技术指标更新失败: {e}")
 
 
 def crawl_basic_info_job():
@@ -86,6 +127,59 @@ def crawl_basic_info_job():
         logger.error(f"股票基本信息更新任务失败: {e}")
 
 
+def refresh_board_index_job():
+    """
+    板块成分倒排索引重建任务
+    """
+    logger.info("开始执行板块成分索引重建任务...")
+    
+    try:
+        industry_index.refresh()
+        concept_index.refresh()
+        stock_search_index.refresh()
+        logger.info("板块成分索引重建任务完成")
+    except Exception as e:
+        logger.error(f"板块成分索引重建任务失败: {e}")
+    
+    # 成分股可能变化，同步刷新板块成分表（沿用最近一次行情快照）
+    try:
+        refresh_sector_stats(force_spot=False)
+    except Exception as e:
+        logger.error(f"板块统计刷新失败: {e}")
+
+
+def refresh_sector_stats_job():
+    """
+    板块统计刷新任务（成分股数量、总市值、平均涨跌幅）
+    """
+    logger.info("开始执行板块统计刷新任务...")
+    
+    try:
+        results = refresh_sector_stats()
+        logger.info(f"板块统计刷新任务完成: {results}")
+    except Exception as e:
+        logger.error(f"板块统计刷新任务失败: {e}")
+
+
+def prewarm_evaluations_job():
+    """
+    评估缓存预热任务：对关注列表（未配置时为近期请求最多的股票）批量检测并重新评估
+    """
+    logger.info("开始执行评估预热任务...")
+    
+    try:
+        stock_codes = Config.PREWARM_WATCHLIST or get_top_requested(
+            Config.PREWARM_TOP_N, scope=Config.PREWARM_SCOPE)
+        if not stock_codes:
+            logger.info("没有需要预热的股票")
+            return
+        
+        stats = prewarm_evaluations(stock_codes, scope=Config.PREWARM_SCOPE)
+        logger.info(f"评估预热任务完成: {stats}")
+    except Exception as e:
+        logger.error(f"评估预热任务失败: {e}")
+
+
 def start_scheduler():
     """
     启动调度器
@@ -1,8 +1,15 @@
-"""股票数据服务层 - 优先从数据库查询，失败时触发实时获取并更新数据库"""
+"""股票数据服务层 - 优先从缓存和数据库查询，失败时触发实时获取并更新数据库"""
 from datetime import datetime, timedelta
+from stockshark.config import Config
 from stockshark.models.stock_basic_info import StockBasicInfo
 from stockshark.models.stock_daily_trade import StockDailyTrade
+from stockshark.models.sector_stats import SectorStats
 from stockshark.data.akshare_data import AkShareData
+from stockshark.data.bar_store import bar_store
+from stockshark.data.board_index import concept_index
+from stockshark.data.crawler import trade_sync
+from stockshark.data.frame_convert import frame_to_rows, hist_to_trade_frame, trade_rows_to_hist_records
+from stockshark.utils.cache import stock_cache
 from stockshark.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,6 +21,7 @@ class StockService:
     def __init__(self):
         self.ak_data = AkShareData()
     
+    @stock_cache.cached_method('basic_info')
     def get_stock_basic_info(self, symbol):
         """
         获取股票基本信息（优先从数据库查询）
@@ -68,6 +76,8 @@ class StockService:
         
         return None
     
+    @stock_cache.cached_method('daily_trade', ttl=lambda symbol, trade_date=None:
+                               None if trade_date else Config.SERVICE_CACHE_LATEST_TTL)
     def get_stock_daily_trade(self, symbol, trade_date=None):
         """
         获取股票每日交易数据（优先从数据库查询）
@@ -160,6 +170,7 @@ class StockService:
         
         return None
     
+    @stock_cache.cached_method('history')
     def get_stock_history(self, symbol, start_date, end_date):
         """
         获取股票历史行情数据（优先从数据库查询）
@@ -172,51 +183,40 @@ class StockService:
         Returns:
             list: 历史数据列表
         """
-        # 1. 先从数据库查询
+        # 1. 按交易日历补齐数据库中缺失的日期（只请求缺失部分）
+        if start_date and end_date:
+            try:
+                trade_sync.fill_history(symbol, start_date, end_date)
+            except Exception as e:
+                logger.warning(f"补齐股票 {symbol} 历史数据失败: {e}")
+        
+        # 2. 优先读取本地列式存储（与数据库一致：按日期倒序，最多 1000 条）
+        try:
+            bars = bar_store.read_symbol(symbol, start_date, end_date)
+        except Exception as e:
+            logger.warning(f"读取股票 {symbol} 列式存储失败: {e}")
+            bars = None
+        if bars is not None and not bars.empty:
+            logger.info(f"从列式存储获取股票 {symbol} 历史数据，共 {min(len(bars), 1000)} 条")
+            return trade_rows_to_hist_records(bars.iloc[::-1].head(1000))
+        
+        # 3. 从数据库查询
         db_history = StockDailyTrade.get_history_by_symbol(symbol, start_date, end_date, limit=1000)
         
         if db_history:
             logger.info(f"从数据库获取股票 {symbol} 历史数据，共 {len(db_history)} 条")
-            return [{
-                '日期': item['trade_date'].strftime('%Y-%m-%d') if item['trade_date'] else None,
-                '开盘': float(item['open_price']) if item['open_price'] else None,
-                '最高': float(item['high_price']) if item['high_price'] else None,
-                '最低': float(item['low_price']) if item['low_price'] else None,
-                '收盘': float(item['close_price']) if item['close_price'] else None,
-                '成交量': int(item['volume']) if item['volume'] else None,
-                '成交额': float(item['amount']) if item['amount'] else None,
-                '涨跌幅': float(item['change_pct']) if item['change_pct'] else None,
-                '换手率': float(item['turnover_rate']) if item['turnover_rate'] else None,
-                'source': 'database'
-            } for item in db_history]
+            return trade_rows_to_hist_records(db_history)
         
-        # 2. 数据库中没有，从akshare获取
+        # 4. 数据库不可用，直接从akshare获取
         logger.info(f"数据库中没有股票 {symbol} 历史数据，从akshare获取...")
         api_history = self.ak_data.get_stock_history_data(symbol, start_date, end_date)
         
         if api_history is not None and not api_history.empty:
-            # 3. 批量保存到数据库
+            # 批量保存到数据库
             try:
-                trade_records = []
-                for _, row in api_history.iterrows():
-                    trade_date = row['日期']
-                    if hasattr(trade_date, 'date'):
-                        trade_date = trade_date.date()
-                    trade_records.append({
-                        'symbol': symbol,
-                        'trade_date': trade_date,
-                        'open_price': float(row['开盘']),
-                        'high_price': float(row['最高']),
-                        'low_price': float(row['最低']),
-                        'close_price': float(row['收盘']),
-                        'volume': int(row['成交量']),
-                        'amount': float(row['成交额']),
-                        'change_pct': float(row['涨跌幅']) if '涨跌幅' in row else None,
-                        'turnover_rate': float(row['换手率']) if '换手率' in row else None
-                    })
-                
-                StockDailyTrade.batch_save(trade_records)
-                logger.info(f"股票 {symbol} 历史数据已保存到数据库，共 {len(trade_records)} 条")
+                rows = frame_to_rows(hist_to_trade_frame(api_history, symbol), StockDailyTrade.COLUMNS)
+                StockDailyTrade.bulk_upsert(rows)
+                logger.info(f"股票 {symbol} 历史数据已保存到数据库，共 {len(rows)} 条")
             except Exception as e:
                 logger.error(f"保存股票 {symbol} 历史数据到数据库失败: {e}")
             
@@ -226,7 +226,7 @@ class StockService:
     
     def get_stock_sectors(self, symbol):
         """
-        获取股票所属的行业和概念信息（优先从数据库查询）
+        获取股票所属的行业和概念信息（优先从数据库和板块统计表查询）
         
         Args:
             symbol: 股票代码
@@ -234,8 +234,9 @@ class StockService:
         Returns:
             dict: 行业和概念信息
         """
-        # 1. 先从数据库查询基本信息
+        # 1. 先从数据库查询基本信息和板块成分表
         db_info = StockBasicInfo.get_by_symbol(symbol)
+        memberships = SectorStats.get_symbol_boards(symbol)
         
         industry_name = ''
         concept_str = ''
@@ -246,6 +247,10 @@ class StockService:
             concept_str = db_info.get('concept', '')
             stock_name = db_info.get('name', '')
             logger.info(f"从数据库获取股票 {symbol} 行业和概念信息")
+        elif memberships['industry'] or memberships['concept']:
+            industry_name = memberships['industry'][0] if memberships['industry'] else ''
+            stock_name = memberships['stock_name']
+            logger.info(f"从板块成分表获取股票 {symbol} 行业和概念信息")
         else:
             # 2. 数据库中没有，从akshare获取
             logger.info(f"数据库中没有股票 {symbol}，从akshare获取...")
@@ -273,32 +278,62 @@ class StockService:
                 except Exception as e:
                     logger.error(f"保存股票 {symbol} 基本信息到数据库失败: {e}")
         
-        # 获取行业详细信息
-        industry_stocks = []
-        if industry_name:
-            industry_stocks = self.ak_data.get_industry_stocks(industry_name)
+        if concept_str:
+            concept_list = [c.strip() for c in concept_str.split('、') if c.strip()][:5]
+        elif memberships['concept']:
+            concept_list = memberships['concept'][:5]
+        else:
+            concept_list = self.ak_data.get_stock_concepts(symbol, limit=5)
+        
+        # 板块统计优先读物化表，表中没有的板块才实时获取
+        industry_stats = SectorStats.get_stats('industry', [industry_name] if industry_name else [])
+        concept_stats = SectorStats.get_stats('concept', concept_list)
+        
+        # 行业详细信息
+        industry = {'name': industry_name, 'stock_count': 0}
+        if industry_name in industry_stats:
+            industry.update(self._sector_stats_fields(industry_stats[industry_name]))
+        elif industry_name:
+            industry['stock_count'] = len(self.ak_data.get_industry_stocks(industry_name))
         
-        # 获取概念详细信息
+        # 概念详细信息（成分股数量其次取概念倒排索引）
         concepts = []
-        if concept_str:
-            concept_list = [c.strip() for c in concept_str.split('、') if c.strip()]
-            for concept_name in concept_list[:5]:
-                concept_stocks = self.ak_data.get_concept_stocks(concept_name)
-                if concept_stocks:
-                    concepts.append({
-                        'name': concept_name,
-                        'stock_count': len(concept_stocks)
-                    })
+        for concept_name in concept_list:
+            if concept_name in concept_stats:
+                concept = {'name': concept_name}
+                concept.update(self._sector_stats_fields(concept_stats[concept_name]))
+                if concept['stock_count']:
+                    concepts.append(concept)
+                continue
+            try:
+                stock_count = concept_index.member_count(concept_name)
+            except Exception as e:
+                logger.warning(f"查询概念索引失败: {e}")
+                stock_count = None
+            if stock_count is None:
+                stock_count = len(self.ak_data.get_concept_stocks(concept_name))
+            if stock_count:
+                concepts.append({
+                    'name': concept_name,
+                    'stock_count': stock_count
+                })
         
         return {
             'symbol': symbol,
             'name': stock_name,
-            'industry': {
-                'name': industry_name,
-                'stock_count': len(industry_stocks)
-            },
+            'industry': industry,
             'concepts': concepts
         }
+    
+    @staticmethod
+    def _sector_stats_fields(row):
+        """板块统计记录转换为接口字段"""
+        return {
+            'stock_count': int(row['member_count']),
+            'total_market_cap': float(row['total_market_cap']) if row['total_market_cap'] is not None else None,
+            'avg_change_pct': float(row['avg_change_pct']) if row['avg_change_pct'] is not None else None,
+            'stats_updated_at': row['updated_at'].strftime('%Y-%m-%d %H:%M:%S') if row['updated_at'] else None
+        }
 
 
 # 全局实例
@@ -0,0 +1,145 @@
+"""MySQL 批量写入工具
+
+按 chunk 分批执行多行 INSERT ... ON DUPLICATE KEY UPDATE（pymysql 的 executemany
+会把同一条 INSERT 语句合并为多行 VALUES），每个 chunk 一个事务，整批共用一个连接。
+可选使用 LOAD DATA LOCAL INFILE（REPLACE 语义）以获得更高吞吐。
+"""
+import os
+import tempfile
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from stockshark.config import Config
+from stockshark.utils.database import get_mysql_connection
+from stockshark.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def build_upsert_sql(table: str, columns: Sequence[str], update_columns: Sequence[str]) -> str:
+    """
+    构建单行 INSERT ... ON DUPLICATE KEY UPDATE 语句（供 executemany 合并为多行）
+
+    Args:
+        table: 表名
+        columns: 插入列
+        update_columns: 主键/唯一键冲突时需要更新的列
+
+    Returns:
+        str: SQL 语句
+    """
+    placeholders = ', '.join(['%s'] * len(columns))
+    updates = ',\n'.join(f'{col} = VALUES({col})' for col in update_columns)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)})\n"
+        f"VALUES ({placeholders})\n"
+        f"ON DUPLICATE KEY UPDATE\n{updates}"
+    )
+
+
+def _to_infile_value(value):
+    """转换为 LOAD DATA 默认格式（\\N 表示 NULL，转义制表符与换行）"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, float) and value != value:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    text = str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+class BulkWriter:
+    """MySQL 批量 upsert 写入器"""
+
+    def __init__(self, table: str, columns: Sequence[str], update_columns: Sequence[str],
+                 chunk_size: Optional[int] = None, use_load_data: Optional[bool] = None):
+        """
+        Args:
+            table: 表名
+            columns: 行数据的列顺序
+            update_columns: 冲突时更新的列
+            chunk_size: 每个事务写入的行数，默认取 Config.BULK_CHUNK_SIZE
+            use_load_data: 是否使用 LOAD DATA LOCAL INFILE，默认取 Config.BULK_USE_LOAD_DATA
+        """
+        self.table = table
+        self.columns = list(columns)
+        self.update_columns = list(update_columns)
+        self.chunk_size = chunk_size or Config.BULK_CHUNK_SIZE
+        self.use_load_data = Config.BULK_USE_LOAD_DATA if use_load_data is None else use_load_data
+        self.sql = build_upsert_sql(table, self.columns, self.update_columns)
+
+    def _chunks(self, rows: Iterable[Sequence]) -> Iterable[List[Sequence]]:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _write_executemany(self, conn, chunk: List[Sequence]):
+        cursor = conn.cursor()
+        cursor.executemany(self.sql, chunk)
+
+    def _write_load_data(self, conn, chunk: List[Sequence]):
+        fd, path = tempfile.mkstemp(prefix=f'{self.table}_', suffix='.tsv')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                for row in chunk:
+                    f.write('\t'.join(_to_infile_value(v) for v in row) + '\n')
+            cursor = conn.cursor()
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s REPLACE INTO TABLE {self.table} "
+                f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+                f"({', '.join(self.columns)})",
+                (path,)
+            )
+        finally:
+            os.remove(path)
+
+    def write(self, rows: Iterable[Sequence],
+              on_commit: Optional[Callable[[List[Sequence]], None]] = None) -> Dict[str, float]:
+        """
+        批量写入
+
+        Args:
+            rows: 按 columns 顺序排列的元组序列
+            on_commit: 每个 chunk 提交成功后以该 chunk 的行调用（失败回滚的 chunk 不调用）
+
+        Returns:
+            dict: 写入统计 rows / chunks / failed_chunks / elapsed_seconds / rows_per_sec
+        """
+        stats = {'rows': 0, 'chunks': 0, 'failed_chunks': 0,
+                 'elapsed_seconds': 0.0, 'rows_per_sec': 0.0}
+        start = time.perf_counter()
+        write_chunk = self._write_load_data if self.use_load_data else self._write_executemany
+
+        conn = get_mysql_connection(local_infile=self.use_load_data)
+        try:
+            for chunk in self._chunks(rows):
+                try:
+                    write_chunk(conn, chunk)
+                    conn.commit()
+                    stats['rows'] += len(chunk)
+                    stats['chunks'] += 1
+                except Exception as e:
+                    conn.rollback()
+                    stats['failed_chunks'] += 1
+                    logger.error(f"批量写入 {self.table} 失败（{len(chunk)} 行）: {e}")
+                    continue
+                if on_commit is not None:
+                    on_commit(chunk)
+        finally:
+            conn.close()
+
+        elapsed = time.perf_counter() - start
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        stats['rows_per_sec'] = round(stats['rows'] / elapsed, 1) if elapsed > 0 else 0.0
+        logger.info(f"批量写入 {self.table}: {stats['rows']} 行, {stats['chunks']} 个事务, "
+                    f"耗时 {stats['elapsed_seconds']}s, {stats['rows_per_sec']} 行/秒")
+        return stats
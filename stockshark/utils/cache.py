@@ -0,0 +1,365 @@
+"""进程内 LRU + TTL 读穿缓存
+
+StockService 的基本信息、日线、历史行情查询每个 HTTP 请求都访问一次 MySQL，
+而这些数据一天最多变化一次。这里在服务层前加一层缓存：
+- 进程内: OrderedDict 实现 LRU，条目按写入时间过期；值以 pickle 字节保存，
+  命中时反序列化得到副本（调用方修改结果不会污染缓存），字节数即内存占用
+- 共享存储（可选）: MongoDB service_cache 集合，多个 worker 共享同一份结果，
+  expires_at 上的 TTL 索引自动清理
+- 失效: 条目带标签（股票代码），爬虫写入某只股票的新数据后按标签删除；
+  键、标签各有一个失效计数，加载期间发生了失效的结果不写入缓存（避免写回失效前读到的旧数据）。
+  只使用进程内缓存时，失效只作用于执行写入的进程，其他 worker 要等条目过期，
+  需要跨进程即时失效时使用 mongodb 共享存储
+- 并发: 同一个键的未命中只加载一次（single-flight）
+"""
+
+import functools
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple, Union
+
+from stockshark.config import Config
+from stockshark.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def _key_str(key: Hashable) -> str:
+    """缓存键转字符串（共享存储的文档 _id）"""
+    if isinstance(key, tuple):
+        return ":".join(str(part) for part in key)
+    return str(key)
+
+
+class MongoCacheBackend:
+    """MongoDB 共享缓存存储"""
+
+    def __init__(self, collection_name: str = "service_cache"):
+        self.collection_name = collection_name
+        self._index_ready = False
+
+    def _get_collection(self):
+        from stockshark.data.database import DatabaseManager
+
+        db = DatabaseManager.get_mongodb_connection()
+        if db is None:
+            return None
+        coll = db[self.collection_name]
+        if not self._index_ready:
+            try:
+                coll.create_index("expires_at", expireAfterSeconds=0, name="idx_service_cache_ttl")
+                coll.create_index("tags", name="idx_service_cache_tags")
+                self._index_ready = True
+            except Exception as e:
+                logger.warning("%s 索引创建失败: %s", self.collection_name, e)
+        return coll
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Tuple[str, ...]]]:
+        """返回 (pickle 字节, 标签)，未命中或已过期返回 None"""
+        coll = self._get_collection()
+        if coll is None:
+            return None
+        doc = coll.find_one({"_id": key, "expires_at": {"$gt": datetime.now()}})
+        return (bytes(doc["value"]), tuple(doc.get("tags", ()))) if doc else None
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str]):
+        coll = self._get_collection()
+        if coll is None:
+            return
+        coll.update_one(
+            {"_id": key},
+            {"$set": {"value": value, "tags": list(tags),
+                      "expires_at": datetime.now() + timedelta(seconds=ttl)}},
+            upsert=True,
+        )
+
+    def delete_tags(self, tags: Iterable[str]):
+        coll = self._get_collection()
+        if coll is not None:
+            coll.delete_many({"tags": {"$in": list(tags)}})
+
+    def clear(self):
+        coll = self._get_collection()
+        if coll is not None:
+            coll.delete_many({})
+
+
+class TTLCache:
+    """线程安全的 LRU + TTL 缓存"""
+
+    def __init__(self, name: str, max_entries: Optional[int] = None, ttl: Optional[float] = None,
+                 backend: Optional[MongoCacheBackend] = None):
+        """
+        Args:
+            name: 缓存名称（统计、日志用）
+            max_entries: 进程内最多保留的条目数，默认取 Config.SERVICE_CACHE_MAX_ENTRIES
+            ttl: 条目有效期（秒），默认取 Config.SERVICE_CACHE_TTL，<= 0 表示不缓存
+            backend: 共享存储，None 表示只使用进程内缓存
+        """
+        self.name = name
+        self.max_entries = max_entries or Config.SERVICE_CACHE_MAX_ENTRIES
+        self.ttl = Config.SERVICE_CACHE_TTL if ttl is None else ttl
+        self.backend = backend
+        # key -> (过期时间, pickle 字节, 标签)
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        # 失效计数：键 / 标签 -> 失效次数，clear 时整体加一
+        self._key_generations: Dict[Hashable, int] = {}
+        self._tag_generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._stats = {
+            "hits": 0,
+            "backend_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "backend_errors": 0,
+        }
+
+    def _remove(self, key: Hashable):
+        """删除条目（调用方持有锁）"""
+        _, data, tags = self._entries.pop(key)
+        self._memory_bytes -= len(data)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _get_local(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def _generation(self, key: Hashable, tags: Tuple[str, ...]) -> Tuple:
+        """键及其标签当前的失效计数（调用方持有锁）"""
+        return (self._epoch, self._key_generations.get(key, 0),
+                tuple(self._tag_generations.get(tag, 0) for tag in tags))
+
+    def _set_local(self, key: Hashable, data: bytes, tags: Tuple[str, ...], ttl: float,
+                   generation: Optional[Tuple] = None) -> bool:
+        """写入进程内缓存；指定 generation 时，若之后发生过失效则不写入并返回 False"""
+        with self._lock:
+            if generation is not None and generation != self._generation(key, tags):
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, data, tags)
+            self._memory_bytes += len(data)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+            return True
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+            default: 未命中时的返回值
+
+        Returns:
+            缓存值的副本，未命中返回 default
+        """
+        return self._lookup(key, default, None)
+
+    def _lookup(self, key: Hashable, default: Any, ttl: Optional[float]) -> Any:
+        """get 的实现；共享存储命中时按 ttl（默认缓存的 ttl）在进程内保留副本"""
+        if self.ttl <= 0:
+            return default
+        data = self._get_local(key)
+        if data is None and self.backend is not None:
+            try:
+                found = self.backend.get(_key_str(key))
+            except Exception as e:
+                found = None
+                self._count("backend_errors")
+                logger.warning("读取共享缓存失败（%s）: %s", self.name, e)
+            if found is not None:
+                data, tags = found
+                self._count("backend_hits")
+                self._set_local(key, data, tags, self.ttl if ttl is None else ttl)
+        if data is None:
+            self._count("misses")
+            return default
+        return pickle.loads(data)
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), ttl: Optional[float] = None):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 可 pickle 的值
+            tags: 失效标签（如股票代码）
+            ttl: 有效期（秒），默认使用缓存的 ttl
+        """
+        self._store(key, value, tuple(tags), ttl)
+
+    def _store(self, key: Hashable, value: Any, tags: Tuple[str, ...], ttl: Optional[float],
+               generation: Optional[Tuple] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if not self._set_local(key, data, tags, ttl, generation):
+            logger.debug("加载期间缓存已失效，不写入（%s）: %s", self.name, key)
+            return
+        if self.backend is not None:
+            try:
+                self.backend.set(_key_str(key), data, ttl, tags)
+            except Exception as e:
+                self._count("backend_errors")
+                logger.warning("写入共享缓存失败（%s）: %s", self.name, e)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], tags: Iterable[str] = (),
+                    ttl: Optional[float] = None,
+                    cacheable: Callable[[Any], bool] = lambda value: bool(value)) -> Any:
+        """
+        读穿：命中返回缓存，否则调用 loader 加载并写入（同一个键并发未命中只加载一次）
+
+        Args:
+            key: 缓存键
+            loader: 无参加载函数
+            tags: 失效标签
+            ttl: 有效期（秒）
+            cacheable: 判断加载结果是否写入缓存，默认不缓存 None / 空结果
+
+        Returns:
+            缓存或加载的值
+        """
+        missing = object()
+        value = self._lookup(key, missing, ttl)
+        if value is not missing:
+            return value
+        tags = tuple(tags)
+
+        def load():
+            # 加载前记录失效计数，加载期间该键被失效时结果可能已过时，只返回不缓存
+            with self._lock:
+                generation = self._generation(key, tags)
+            result = loader()
+            if cacheable(result):
+                self._store(key, result, tags, ttl, generation)
+            return result
+
+        value, shared = self._flight.do(key, load)
+        # 共享的结果是同一个对象，复制一份再返回
+        return pickle.loads(pickle.dumps(value)) if shared else value
+
+    def cached_method(self, namespace: str,
+                      ttl: Optional[Union[float, Callable[..., Optional[float]]]] = None):
+        """
+        方法装饰器：按 (namespace, 参数) 缓存返回值，以第一个参数（股票代码）作为失效标签
+
+        Args:
+            namespace: 键前缀，区分不同方法
+            ttl: 有效期（秒），或以方法参数（不含 self）调用、返回有效期的函数；None 使用缓存的 ttl
+        """
+        def decorator(method):
+            @functools.wraps(method)
+            def wrapper(obj, symbol, *args, **kwargs):
+                key = (namespace, symbol) + args + tuple(sorted(kwargs.items()))
+                call_ttl = ttl(symbol, *args, **kwargs) if callable(ttl) else ttl
+                return self.get_or_load(key, lambda: method(obj, symbol, *args, **kwargs),
+                                        tags=(str(symbol),), ttl=call_ttl)
+            return wrapper
+        return decorator
+
+    def invalidate(self, key: Hashable):
+        """删除一个键（只影响进程内缓存）"""
+        with self._lock:
+            self._key_generations[key] = self._key_generations.get(key, 0) + 1
+            if key in self._entries:
+                self._remove(key)
+                self._stats["invalidations"] += 1
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        """
+        删除带有任一标签的全部条目（进程内及共享存储）
+
+        Args:
+            tags: 标签（如股票代码）
+        """
+        tags = [tag for tag in tags if tag]
+        if not tags:
+            return
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._remove(key)
+            self._stats["invalidations"] += len(keys)
+        if self.backend is not None:
+            try:
+                self.backend.delete_tags(tags)
+            except Exception as e:
+                self._count("backend_errors")
+                logger.warning("删除共享缓存失败（%s）: %s", self.name, e)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._key_generations.clear()
+            self._tag_generations.clear()
+            self._epoch += 1
+            self._memory_bytes = 0
+        if self.backend is not None:
+            try:
+                self.backend.clear()
+            except Exception as e:
+                logger.warning("清空共享缓存失败（%s）: %s", self.name, e)
+
+    def _count(self, key: str, value: int = 1):
+        with self._lock:
+            self._stats[key] += value
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            dict: 命中/未命中/淘汰/过期/失效次数、命中率、条目数、内存占用（字节）
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["memory_bytes"] = self._memory_bytes
+        lookups = stats["hits"] + stats["backend_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["backend_hits"]) / lookups, 4) if lookups else 0.0
+        stats["name"] = self.name
+        stats["max_entries"] = self.max_entries
+        stats["ttl"] = self.ttl
+        stats["backend"] = self.backend.collection_name if self.backend is not None else None
+        return stats
+
+
+# 创建全局实例（StockService 查询结果，按股票代码失效）
+stock_cache = TTLCache(
+    "stock_service",
+    backend=MongoCacheBackend() if Config.SERVICE_CACHE_BACKEND == "mongodb" else None,
+)
@@ -1,17 +1,15 @@
 """数据库连接工具"""
+import threading
+import time
 import pymysql
 from pymysql.cursors import DictCursor
 from pymongo import MongoClient
 from stockshark.config import get_config
+from stockshark.utils.exceptions import DatabaseError
 
 
-def get_mysql_connection():
-    """
-    获取MySQL数据库连接
-    
-    Returns:
-        MySQL连接对象
-    """
+def _connect_mysql(local_infile=False):
+    """建立一个新的MySQL连接"""
     config = get_config()
     try:
         conn = pymysql.connect(
@@ -21,7 +19,8 @@ def get_mysql_connection():
             password=config.MYSQL_PASSWORD,
             database=config.MYSQL_DATABASE,
             charset='utf8mb4',
-            cursorclass=DictCursor
+            cursorclass=DictCursor,
+            local_infile=local_infile
         )
         return conn
     except Exception as e:
@@ -29,6 +28,239 @@ def get_mysql_connection():
         raise
 
 
+class PooledConnection:
+    """从连接池借出的连接，close() 时归还连接池而不是断开"""
+    
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+    
+    def close(self):
+        """归还连接"""
+        if not self._released:
+            self._released = True
+            self._pool.release(self._raw, self._created_at)
+    
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class MySQLConnectionPool:
+    """线程安全的有界MySQL连接池"""
+    
+    def __init__(self, max_size=None, borrow_timeout=None, idle_timeout=None,
+                 max_lifetime=None, ping_interval=None):
+        """
+        Args:
+            max_size: 最大连接数，默认取 MYSQL_POOL_SIZE
+            borrow_timeout: 借用连接的最长等待时间（秒），默认取 MYSQL_POOL_TIMEOUT
+            idle_timeout: 空闲超过该时间（秒）的连接被回收，默认取 MYSQL_POOL_IDLE_TIMEOUT
+            max_lifetime: 连接最长存活时间（秒），默认取 MYSQL_POOL_MAX_LIFETIME
+            ping_interval: 空闲超过该时间（秒）的连接借出前先 ping 检查，默认取 MYSQL_POOL_PING_INTERVAL
+        """
+        config = get_config()
+        self.max_size = max_size or config.MYSQL_POOL_SIZE
+        self.borrow_timeout = config.MYSQL_POOL_TIMEOUT if borrow_timeout is None else borrow_timeout
+        self.idle_timeout = config.MYSQL_POOL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.max_lifetime = config.MYSQL_POOL_MAX_LIFETIME if max_lifetime is None else max_lifetime
+        self.ping_interval = config.MYSQL_POOL_PING_INTERVAL if ping_interval is None else ping_interval
+        
+        # 空闲连接栈: (连接, 创建时间, 最近归还时间)，后进先出以复用最热的连接
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'borrowed': 0,
+            'created': 0,
+            'closed': 0,
+            'evicted_idle': 0,
+            'evicted_lifetime': 0,
+            'health_check_failures': 0,
+            'borrow_timeouts': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+        }
+    
+    def _discard(self, raw):
+        """关闭连接并释放名额（需持有锁）"""
+        self._size -= 1
+        self._stats['closed'] += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+        self._cond.notify()
+    
+    def _evict_expired(self, now):
+        """回收空闲超时或超过最长存活时间的连接（需持有锁）"""
+        alive = []
+        for raw, created_at, last_used in self._idle:
+            if now - created_at >= self.max_lifetime:
+                self._stats['evicted_lifetime'] += 1
+                self._discard(raw)
+            elif now - last_used >= self.idle_timeout:
+                self._stats['evicted_idle'] += 1
+                self._discard(raw)
+            else:
+                alive.append((raw, created_at, last_used))
+        self._idle = alive
+    
+    def acquire(self, timeout=None):
+        """
+        借用一个连接
+        
+        Args:
+            timeout: 最长等待时间（秒），默认取 borrow_timeout
+        
+        Returns:
+            PooledConnection: 借出的连接，使用完毕调用 close() 归还
+        
+        Raises:
+            DatabaseError: 等待超时
+        """
+        timeout = self.borrow_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        
+        while True:
+            with self._cond:
+                self._evict_expired(time.time())
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['borrow_timeouts'] += 1
+                        raise DatabaseError(f"获取MySQL连接超时（{timeout}s，连接池上限 {self.max_size}）")
+                    self._cond.wait(remaining)
+                
+                if self._idle:
+                    raw, created_at, last_used = self._idle.pop()
+                else:
+                    raw, created_at, last_used = None, None, None
+                    self._size += 1
+            
+            if raw is None:
+                try:
+                    raw = _connect_mysql()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                created_at = time.time()
+                with self._cond:
+                    self._stats['created'] += 1
+            elif time.time() - last_used >= self.ping_interval:
+                # 健康检查：长时间空闲的连接可能已被服务端断开
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    with self._cond:
+                        self._stats['health_check_failures'] += 1
+                        self._discard(raw)
+                    continue
+            
+            wait_ms = (time.monotonic() - start) * 1000
+            with self._cond:
+                self._stats['borrowed'] += 1
+                self._stats['total_wait_ms'] += wait_ms
+                self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], wait_ms)
+            return PooledConnection(self, raw, created_at)
+    
+    def release(self, raw, created_at):
+        """归还连接（由 PooledConnection.close 调用）"""
+        reusable = raw.open
+        if reusable:
+            try:
+                # 结束未提交的事务，避免下一个使用者看到旧快照或残留写入
+                raw.rollback()
+            except Exception:
+                reusable = False
+        
+        now = time.time()
+        with self._cond:
+            if not reusable:
+                self._discard(raw)
+            elif now - created_at >= self.max_lifetime:
+                self._stats['evicted_lifetime'] += 1
+                self._discard(raw)
+            else:
+                self._idle.append((raw, created_at, now))
+                self._cond.notify()
+    
+    def close_all(self):
+        """关闭全部空闲连接（借出中的连接归还时正常回收）"""
+        with self._cond:
+            for raw, _, _ in self._idle:
+                self._discard(raw)
+            self._idle = []
+    
+    def stats(self):
+        """
+        获取连接池统计
+        
+        Returns:
+            dict: 连接数、借用次数、等待耗时、回收与健康检查失败次数
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            stats['max_size'] = self.max_size
+        stats['avg_wait_ms'] = round(stats['total_wait_ms'] / stats['borrowed'], 2) if stats['borrowed'] else 0.0
+        stats['total_wait_ms'] = round(stats['total_wait_ms'], 2)
+        stats['max_wait_ms'] = round(stats['max_wait_ms'], 2)
+        return stats
+
+
+_mysql_pool = None
+_mysql_pool_lock = threading.Lock()
+
+
+def get_mysql_pool():
+    """
+    获取全局MySQL连接池（首次调用时创建）
+    
+    Returns:
+        MySQLConnectionPool
+    """
+    global _mysql_pool
+    if _mysql_pool is None:
+        with _mysql_pool_lock:
+            if _mysql_pool is None:
+                _mysql_pool = MySQLConnectionPool()
+    return _mysql_pool
+
+
+def close_mysql_pool():
+    """关闭全局MySQL连接池中的空闲连接"""
+    if _mysql_pool is not None:
+        _mysql_pool.close_all()
+
+
+def get_mysql_connection(local_infile=False):
+    """
+    获取MySQL数据库连接（从连接池借用，close() 时归还）
+    
+    Args:
+        local_infile: 是否允许 LOAD DATA LOCAL INFILE；该类连接不进入连接池
+    
+    Returns:
+        MySQL连接对象
+    """
+    if local_infile:
+        return _connect_mysql(local_infile=True)
+    return get_mysql_pool().acquire()
+
+
 def get_mongodb_connection():
     """
     获取MongoDB数据库连接
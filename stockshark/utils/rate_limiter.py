@@ -0,0 +1,84 @@
+"""令牌桶限流器
+
+多个爬取线程共享同一个限流器，保证对上游接口（东方财富等）的总请求速率不超过
+设定值，同时允许短时突发。
+"""
+import threading
+import time
+from typing import Optional
+
+from stockshark.config import Config
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: 每秒补充的令牌数（即平均请求速率），<= 0 表示不限流
+            capacity: 桶容量（允许的突发请求数），默认等于 rate
+        """
+        self.rate = rate
+        self.capacity = max(capacity or rate, 1)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self._waited = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        尝试立即获取令牌
+
+        Returns:
+            bool: 获取成功返回 True，令牌不足返回 False
+        """
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        获取令牌，令牌不足时阻塞等待
+
+        Args:
+            tokens: 需要的令牌数
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            bool: 获取成功返回 True，超时返回 False
+        """
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+            with self._lock:
+                self._waited += wait
+
+    @property
+    def waited_seconds(self) -> float:
+        """累计等待时间（秒）"""
+        return self._waited
+
+
+# 创建全局实例（所有上游行情接口共享）
+akshare_rate_limiter = TokenBucket(Config.CRAWL_RATE_LIMIT, Config.CRAWL_RATE_BURST)
@@ -0,0 +1,216 @@
+"""请求合并（single-flight）与跨进程锁
+
+- SingleFlight: 同一进程内，同一个 key 的并发调用只执行一次，其余调用等待并共享结果
+- MongoLock: 基于 MongoDB 唯一 _id 的租约锁，多个 gunicorn worker / 多台机器之间互斥；
+  持有期间后台线程定期续租，租约时长只决定持有者崩溃后多久失效
+- FileLock: 基于 fcntl.flock 的本机文件锁，MongoDB 不可用时作为替代
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 下没有 fcntl，文件锁退化为进程内锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """进程内请求合并"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行 fn；同一 key 已有调用在执行时，等待其结果而不重复执行
+
+        Args:
+            key: 合并键
+            fn: 无参函数
+
+        Returns:
+            tuple: (结果, 是否共享了其他调用的结果)
+
+        Raises:
+            fn 抛出的异常会传递给所有等待者
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result(), False
+
+    def inflight(self) -> int:
+        """正在执行的 key 数量"""
+        with self._lock:
+            return len(self._inflight)
+
+
+class MongoLock:
+    """MongoDB 租约锁：持有期间定期续租，持有者崩溃时锁在 ttl 后自动失效"""
+
+    def __init__(self, collection, key: str, ttl: float = 180, poll_interval: float = 0.5,
+                 renew_interval: Optional[float] = None):
+        """
+        Args:
+            collection: 存放锁文档的 MongoDB 集合
+            key: 锁名
+            ttl: 租约时长（秒）
+            poll_interval: 等待锁时的轮询间隔（秒）
+            renew_interval: 续租间隔（秒），默认 ttl 的三分之一
+        """
+        self.collection = collection
+        self.key = key
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.renew_interval = renew_interval or ttl / 3
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop_heartbeat: Optional[threading.Event] = None
+
+    def _try_acquire(self) -> bool:
+        from pymongo.errors import DuplicateKeyError
+
+        now = datetime.now()
+        try:
+            # 不存在或已过期时占有；存在且未过期时 upsert 触发唯一键冲突
+            self.collection.update_one(
+                {"_id": self.key, "expires_at": {"$lt": now}},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=self.ttl)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def renew(self) -> bool:
+        """
+        续租（只续自己持有的锁）
+
+        Returns:
+            bool: 锁是否仍由自己持有
+        """
+        result = self.collection.update_one(
+            {"_id": self.key, "owner": self.owner},
+            {"$set": {"expires_at": datetime.now() + timedelta(seconds=self.ttl)}},
+        )
+        return result.matched_count > 0
+
+    def _start_heartbeat(self):
+        stop = threading.Event()
+        self._stop_heartbeat = stop
+
+        def run():
+            while not stop.wait(self.renew_interval):
+                try:
+                    if not self.renew():
+                        logger.warning("锁 %s 已被其他持有者占用，停止续租", self.key)
+                        return
+                except Exception as e:
+                    logger.warning("续租锁 %s 失败: %s", self.key, e)
+
+        threading.Thread(target=run, name=f"lock-heartbeat-{self.key}", daemon=True).start()
+
+    def acquire(self, timeout: float = 0) -> Tuple[bool, bool]:
+        """
+        获取锁（获取成功后开始后台续租，直到 release）
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            tuple: (是否获取成功, 是否经历了等待)
+        """
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            if self._try_acquire():
+                self._start_heartbeat()
+                return True, waited
+            if time.monotonic() >= deadline:
+                return False, True
+            waited = True
+            time.sleep(self.poll_interval)
+
+    def release(self):
+        """释放锁（只删除自己持有的锁）"""
+        if self._stop_heartbeat is not None:
+            self._stop_heartbeat.set()
+            self._stop_heartbeat = None
+        try:
+            self.collection.delete_one({"_id": self.key, "owner": self.owner})
+        except Exception as e:
+            logger.warning("释放锁 %s 失败: %s", self.key, e)
+
+
+class FileLock:
+    """本机文件锁（同一台机器上的多个 worker 之间互斥）"""
+
+    def __init__(self, path: str, poll_interval: float = 0.2):
+        """
+        Args:
+            path: 锁文件路径
+            poll_interval: 等待锁时的轮询间隔（秒）
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def acquire(self, timeout: float = 0) -> Tuple[bool, bool]:
+        """
+        获取锁
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            tuple: (是否获取成功, 是否经历了等待)
+        """
+        if fcntl is None:
+            return True, False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._fd = fd
+                return True, waited
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    return False, True
+                waited = True
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        """释放锁"""
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
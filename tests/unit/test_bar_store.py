@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试日线列式存储的合并写入、完整性标记以及与 MySQL 写入的同步（使用临时目录和假连接）
+"""
+
+import sys
+import os
+import threading
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from stockshark.data import bar_store as bar_store_module
+from stockshark.data.bar_store import BarStore
+from stockshark.models.stock_daily_trade import StockDailyTrade
+from stockshark.utils import bulk_writer
+
+from tests.unit.test_bulk_writer import FakeConnection
+
+
+def _row(symbol, day, close):
+    """按 StockDailyTrade.COLUMNS 排列的一行"""
+    return (symbol, date(2024, 1, day), close, close, close, close, 1000, close * 1000, 0.0, 1.0,
+            datetime(2024, 1, day))
+
+
+def _export_row(symbol, day, close):
+    """get_trade_panel 返回的记录"""
+    return dict(zip(('symbol', 'trade_date', 'open_price', 'high_price', 'low_price', 'close_price',
+                     'volume', 'amount', 'change_pct', 'turnover_rate'),
+                    _row(symbol, day, close)[:10]))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BarStore(root=str(tmp_path), enabled=True)
+
+
+def test_write_rows_merges_by_trade_date(store):
+    """新数据按 trade_date 覆盖旧数据；只镜像过的数据不标记为完整"""
+    store.write_rows([_row('000001', 2, 10.0), _row('000001', 3, 11.0)], StockDailyTrade.COLUMNS)
+    store.write_rows([_row('000001', 3, 12.0), _row('000001', 4, 13.0)], StockDailyTrade.COLUMNS)
+    assert not store.is_complete('000001')
+    assert store.read_symbol('000001') is None
+
+    store.replace_symbol('000001', [_row('000001', d, 10.0 + d) for d in (2, 3, 4)],
+                         StockDailyTrade.COLUMNS)
+    assert store.is_complete('000001')
+    store.write_rows([_row('000001', 4, 20.0)], StockDailyTrade.COLUMNS)
+    frame = store.read_symbol('000001')
+    assert frame['close_price'].tolist() == [12.0, 13.0, 20.0]
+    assert store.is_complete('000001')
+    assert store.read_panel(['000001', '000002'], start_date='2024-01-03')['trade_date'].tolist() == \
+        [date(2024, 1, 3), date(2024, 1, 4)]
+
+
+def test_bulk_upsert_mirrors_only_committed_chunks(store, monkeypatch):
+    """回滚的 chunk 不写入列式存储；支持生成器输入"""
+    conn = FakeConnection()
+    monkeypatch.setattr(bulk_writer, 'get_mysql_connection', lambda **kwargs: conn)
+    monkeypatch.setattr(bar_store_module, 'bar_store', store)
+    rows = [_row('000001', 2, 10.0), _row('bad', 2, 1.0), _row('000002', 2, 20.0)]
+    result = StockDailyTrade.bulk_upsert((row for row in rows), chunk_size=1, use_load_data=False)
+    assert result['failed_chunks'] == 1
+    assert os.path.exists(store._path('000001')) and os.path.exists(store._path('000002'))
+    assert not os.path.exists(store._path('bad'))
+
+
+def test_export_holds_lock_while_reading_mysql(store, monkeypatch):
+    """导出读取 MySQL 期间到达的镜像写入不会被导出结果覆盖"""
+    mirrored = threading.Event()
+
+    def get_trade_panel(symbols, columns=None):
+        # 导出读取之后、替换之前提交了新的一天
+        writer = threading.Thread(target=lambda: (store.write_rows([_row('000001', 3, 11.0)],
+                                                                   StockDailyTrade.COLUMNS),
+                                                  mirrored.set()))
+        writer.start()
+        assert not mirrored.wait(0.5)
+        return [_export_row('000001', 2, 10.0)]
+
+    monkeypatch.setattr(StockDailyTrade, 'get_trade_panel', staticmethod(get_trade_panel))
+    stats = store.export_from_mysql(['000001'])
+    assert mirrored.wait(5)
+    assert stats == {'symbols': 1, 'rows': 1, 'failed': 0}
+    assert store.read_symbol('000001')['close_price'].tolist() == [10.0, 11.0]
+
+
+def test_export_keeps_file_when_query_fails(store, monkeypatch):
+    """读取 MySQL 失败时计为失败，保留原有文件和完整性标记"""
+    store.replace_symbol('000001', [_row('000001', 2, 10.0)], StockDailyTrade.COLUMNS)
+
+    def get_trade_panel(symbols, columns=None):
+        raise ConnectionError('MySQL server has gone away')
+
+    monkeypatch.setattr(StockDailyTrade, 'get_trade_panel', staticmethod(get_trade_panel))
+    stats = store.export_from_mysql(['000001', '000002'])
+    assert stats == {'symbols': 0, 'rows': 0, 'failed': 2}
+    assert store.is_complete('000001')
+    assert store.read_symbol('000001')['close_price'].tolist() == [10.0]
+    assert not os.path.exists(store._path('000002'))
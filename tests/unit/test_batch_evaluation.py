@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试批量综合分析的结果产出（数据采集与评估均为假实现，不调用 LLM）
+"""
+
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+
+from stockshark.config import Config
+from stockshark.analysis import llm_analyzer
+from stockshark.analysis.llm_analyzer import evaluate_batch
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    """code 为 'hang' 的股票数据采集一直阻塞，'broken' 采集失败"""
+    release = threading.Event()
+    gathered = []
+
+    def gather(code, prefetched=None):
+        gathered.append(code)
+        if code == 'hang':
+            release.wait(5)
+        if code == 'broken':
+            raise ConnectionError('akshare down')
+        return {'stock_code': code}
+
+    monkeypatch.setattr(llm_analyzer, '_gather_data', gather)
+    monkeypatch.setattr(llm_analyzer, '_evaluate_coalesced',
+                        lambda code, scope, reason, data=None: {'evaluation': f'{code}-{scope}',
+                                                                'trigger_reason': reason})
+    yield gathered
+    release.set()
+    # 等待阻塞的采集线程结束，避免其在还原 monkeypatch 后继续评估
+    for thread in threading.enumerate():
+        if thread.name.startswith('batch-eval'):
+            thread.join(5)
+
+
+def test_batch_yields_every_item_once(fake_pipeline):
+    """每只股票只采集一次数据，每个 (股票, scope) 产出一次结果"""
+    items = [('000001', 'all'), ('000001', 'mid'), ('000002', 'all'), ('broken', 'all')]
+    results = list(evaluate_batch(items, force_refresh=True, workers=2))
+    assert sorted((r['stock_code'], r['scope']) for r in results) == sorted(items)
+    assert sorted(fake_pipeline) == ['000001', '000002', 'broken']
+    errors = {r['stock_code'] for r in results if r.get('error')}
+    assert errors == {'broken'}
+
+
+def test_batch_times_out_missing_items(fake_pipeline, monkeypatch):
+    """等待结果超时后其余项按失败返回，而不是一直阻塞"""
+    monkeypatch.setattr(Config, 'BATCH_EVALUATION_RESULT_TIMEOUT', 0.3)
+    results = list(evaluate_batch([('000001', 'all'), ('hang', 'all'), ('hang', 'mid')],
+                                  force_refresh=True, workers=2))
+    assert len(results) == 3
+    assert [r for r in results if not r.get('error')][0]['stock_code'] == '000001'
+    assert sorted((r['scope'], r['error']) for r in results if r.get('error')) == \
+        [('all', '评估超时'), ('mid', '评估超时')]
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试板块目录缓存的首次加载与失败退避（使用假的板块表下载函数，不访问网络）
+"""
+
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pandas as pd
+import pytest
+
+from stockshark.data.board_catalog import BoardCatalog
+
+
+class FakeFetcher:
+    """返回板块表；fail 为真时下载失败，delay 模拟慢速下载"""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.fail = False
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError('limited')
+        return pd.DataFrame({'板块名称': ['AI', '芯片'], '板块代码': ['BK1', 'BK2'],
+                             '上涨家数': [3, 1], '下跌家数': [1, 1], '平盘家数': [0, 0]})
+
+
+def _wait_refresh(catalog):
+    for _ in range(100):
+        if not catalog._refreshing:
+            return
+        time.sleep(0.01)
+
+
+def test_concurrent_cold_start_downloads_once(tmp_path):
+    fetcher = FakeFetcher(delay=0.2)
+    catalog = BoardCatalog('concept', snapshot_path=str(tmp_path / 'catalog.json'), fetcher=fetcher)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(catalog.get_code('芯片')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert results == ['BK2'] * 5
+    assert fetcher.calls == 1
+    assert catalog.entries()[0] == {'name': 'AI', 'code': 'BK1', 'member_count': 4}
+
+
+def test_failed_background_refresh_backs_off(tmp_path):
+    """过期后后台刷新失败，退避期内使用旧数据且不再启动下载"""
+    fetcher = FakeFetcher()
+    catalog = BoardCatalog('concept', ttl=60, snapshot_path=str(tmp_path / 'catalog.json'),
+                           fetcher=fetcher)
+    assert catalog.names() == ['AI', '芯片']
+
+    catalog._updated_at -= 120
+    fetcher.fail = True
+    assert catalog.names() == ['AI', '芯片']
+    _wait_refresh(catalog)
+    for _ in range(5):
+        assert catalog.get_code('AI') == 'BK1'
+    _wait_refresh(catalog)
+    assert fetcher.calls == 2
+
+    # 退避期结束后重新刷新
+    fetcher.fail = False
+    catalog._retry_at = 0.0
+    catalog.names()
+    _wait_refresh(catalog)
+    assert fetcher.calls == 3 and catalog._is_fresh()
+
+
+def test_failed_cold_start_returns_empty_during_backoff(tmp_path):
+    fetcher = FakeFetcher()
+    fetcher.fail = True
+    catalog = BoardCatalog('industry', snapshot_path=str(tmp_path / 'catalog.json'), fetcher=fetcher)
+    with pytest.raises(ConnectionError):
+        catalog.names()
+    assert catalog.names() == [] and catalog.get_code('AI') is None
+    assert fetcher.calls == 1
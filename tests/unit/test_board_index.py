@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试板块成分倒排索引的重建（不访问网络）
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pandas as pd
+import pytest
+
+from stockshark.config import Config
+from stockshark.data import board_index
+from stockshark.data.board_index import BoardMembershipIndex
+
+
+class FakeCatalog:
+    def __init__(self, boards):
+        self.boards = boards
+        self.counts = {}
+
+    def refresh(self):
+        return list(self.boards)
+
+    def set_member_counts(self, counts):
+        self.counts.update(counts)
+
+
+def _install(monkeypatch, catalog, members):
+    """members: 板块代码 -> 成分股代码列表，值为异常时拉取失败"""
+    def cons_api(symbol):
+        result = members[symbol]
+        if isinstance(result, Exception):
+            raise result
+        return pd.DataFrame({'代码': result, '名称': [f'名称{code}' for code in result]})
+
+    monkeypatch.setitem(board_index._BOARD_APIS, 'concept', (catalog, cons_api))
+
+
+def test_failed_boards_keep_previous_members(monkeypatch, tmp_path):
+    """拉取失败的板块沿用旧成分股，精确数量只写入本次拉取成功的板块"""
+    catalog = FakeCatalog([('AI', 'BK1'), ('芯片', 'BK2')])
+    _install(monkeypatch, catalog, {'BK1': ['000001', '000002'], 'BK2': ['000002']})
+    index = BoardMembershipIndex('concept', snapshot_path=str(tmp_path / 'index.json'), workers=2)
+    index.refresh()
+    assert index.get_boards('000002') == ['AI', '芯片']
+
+    monkeypatch.setattr(Config, 'BOARD_INDEX_MAX_FAILED_RATIO', 0.5)
+    catalog.counts.clear()
+    _install(monkeypatch, catalog, {'BK1': ['000001'], 'BK2': ConnectionError('limited')})
+    index.refresh()
+    assert index.get_members('芯片') == [{'code': '000002', 'name': '名称000002'}]
+    assert index.get_boards('000002') == ['芯片']
+    assert catalog.counts == {'AI': 1}
+
+
+def test_too_many_failures_keep_old_index(monkeypatch, tmp_path):
+    """失败比例超过阈值时保留旧索引和快照，退避期内不再重建"""
+    catalog = FakeCatalog([('AI', 'BK1'), ('芯片', 'BK2')])
+    _install(monkeypatch, catalog, {'BK1': ['000001'], 'BK2': ['000002']})
+    snapshot_path = tmp_path / 'index.json'
+    index = BoardMembershipIndex('concept', ttl=0, snapshot_path=str(snapshot_path), workers=2)
+    index.refresh()
+    saved = snapshot_path.read_text(encoding='utf-8')
+
+    monkeypatch.setattr(Config, 'BOARD_INDEX_MAX_FAILED_RATIO', 0.1)
+    _install(monkeypatch, catalog, {'BK1': ConnectionError('limited'), 'BK2': ['000002', '000003']})
+    with pytest.raises(RuntimeError):
+        index.refresh()
+    assert index.get_members('AI') == [{'code': '000001', 'name': '名称000001'}]
+    assert snapshot_path.read_text(encoding='utf-8') == saved
+
+
+def test_failed_first_build_backs_off(monkeypatch, tmp_path):
+    """首次同步构建失败后，退避期内的请求不再重复构建"""
+    catalog = FakeCatalog([])
+    calls = []
+    monkeypatch.setattr(catalog, 'refresh', lambda: calls.append(1) or [])
+    _install(monkeypatch, catalog, {})
+    index = BoardMembershipIndex('concept', snapshot_path=str(tmp_path / 'index.json'))
+    assert index.get_boards('000001') == []
+    assert index.get_boards('000001') == []
+    assert len(calls) == 1
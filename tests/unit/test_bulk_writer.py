@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试 MySQL 批量写入工具（使用假连接，不访问数据库）
+"""
+
+import sys
+import os
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from stockshark.utils import bulk_writer
+from stockshark.utils.bulk_writer import BulkWriter, _to_infile_value, build_upsert_sql
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, sql, rows):
+        if any(row[0] == 'bad' for row in rows):
+            raise ValueError('Data too long')
+        self.conn.pending.extend(rows)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.pending = []
+        self.committed = []
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed.append(list(self.pending))
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def _writer(monkeypatch, chunk_size):
+    conn = FakeConnection()
+    monkeypatch.setattr(bulk_writer, 'get_mysql_connection', lambda **kwargs: conn)
+    return BulkWriter('t', ('symbol', 'value'), ('value',), chunk_size=chunk_size,
+                      use_load_data=False), conn
+
+
+def test_build_upsert_sql():
+    sql = build_upsert_sql('t', ('symbol', 'value', 'note'), ('value', 'note'))
+    assert sql == ("INSERT INTO t (symbol, value, note)\n"
+                   "VALUES (%s, %s, %s)\n"
+                   "ON DUPLICATE KEY UPDATE\nvalue = VALUES(value),\nnote = VALUES(note)")
+
+
+def test_write_splits_rows_into_chunks(monkeypatch):
+    """每个 chunk 一个事务，整批共用一个连接；支持生成器输入"""
+    writer, conn = _writer(monkeypatch, chunk_size=3)
+    stats = writer.write((str(i), i) for i in range(7))
+    assert [len(chunk) for chunk in conn.committed] == [3, 3, 1]
+    assert stats['rows'] == 7 and stats['chunks'] == 3 and stats['failed_chunks'] == 0
+    assert conn.closed
+
+
+def test_failed_chunk_rolls_back_and_continues(monkeypatch):
+    """失败的 chunk 回滚并计数，后续 chunk 继续写入"""
+    writer, conn = _writer(monkeypatch, chunk_size=2)
+    stats = writer.write([('a', 1), ('bad', 2), ('c', 3), ('d', 4)])
+    assert conn.committed == [[('c', 3), ('d', 4)]]
+    assert conn.rollbacks == 1
+    assert stats['rows'] == 2 and stats['chunks'] == 1 and stats['failed_chunks'] == 1
+
+
+def test_to_infile_value():
+    assert _to_infile_value(None) == '\\N'
+    assert _to_infile_value(float('nan')) == '\\N'
+    assert _to_infile_value(date(2024, 1, 2)) == '2024-01-02'
+    assert _to_infile_value(datetime(2024, 1, 2, 3, 4, 5)) == '2024-01-02 03:04:05'
+    assert _to_infile_value('a\tb\nc\\') == 'a\\tb\\nc\\\\'
+
+
+def test_on_commit_receives_only_committed_chunks(monkeypatch):
+    """on_commit 只收到提交成功的 chunk"""
+    writer, conn = _writer(monkeypatch, chunk_size=2)
+    committed = []
+    writer.write([('a', 1), ('bad', 2), ('c', 3), ('d', 4), ('e', 5)], on_commit=committed.extend)
+    assert committed == [('c', 3), ('d', 4), ('e', 5)]
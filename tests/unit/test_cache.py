@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试进程内 LRU + TTL 读穿缓存（只使用进程内缓存，不访问 MongoDB）
+"""
+
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+
+from stockshark.utils import cache as cache_module
+from stockshark.utils.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 time.monotonic"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_lru_eviction_and_copies():
+    """超过容量时淘汰最久未使用的条目；读取得到副本"""
+    cache = TTLCache('test', max_entries=2, ttl=60)
+    cache.set('a', [1])
+    cache.set('b', [2])
+    cache.get('a').append(99)
+    cache.set('c', [3])
+    assert cache.get('a') == [1]
+    assert cache.get('b') is None
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+
+
+def test_ttl_expiry(clock):
+    cache = TTLCache('test', max_entries=10, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=5)
+    clock[0] += 10
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    clock[0] += 60
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 2
+
+
+def test_invalidate_tags():
+    cache = TTLCache('test', max_entries=10, ttl=60)
+    cache.set(('daily', '000001'), 1, tags=['000001'])
+    cache.set(('history', '000001'), 2, tags=['000001'])
+    cache.set(('daily', '000002'), 3, tags=['000002'])
+    cache.invalidate_tags(['000001', ''])
+    assert cache.get(('daily', '000001')) is None
+    assert cache.get(('history', '000001')) is None
+    assert cache.get(('daily', '000002')) == 3
+    assert cache.stats()['invalidations'] == 2
+
+
+def test_get_or_load_skips_empty_results():
+    cache = TTLCache('test', max_entries=10, ttl=60)
+    calls = []
+    for _ in range(2):
+        cache.get_or_load('k', lambda: calls.append(1) or [], tags=['t'])
+    assert len(calls) == 2
+    assert cache.get_or_load('k', lambda: {'v': 1}) == {'v': 1}
+    assert cache.get_or_load('k', lambda: {'v': 2}) == {'v': 1}
+
+
+@pytest.mark.parametrize('invalidate', [
+    lambda cache: cache.invalidate_tags(['000001']),
+    lambda cache: cache.invalidate('k'),
+    lambda cache: cache.clear(),
+])
+def test_invalidation_during_load_prevents_stale_set(invalidate):
+    """加载期间发生失效时，加载结果返回给调用方但不写入缓存"""
+    cache = TTLCache('test', max_entries=10, ttl=60)
+
+    def loader():
+        # 读取数据库之后、写入缓存之前，爬虫写入了新数据并失效
+        invalidate(cache)
+        return 'stale'
+
+    assert cache.get_or_load('k', loader, tags=['000001']) == 'stale'
+    assert cache.get('k') is None
+    assert cache.get_or_load('k', lambda: 'fresh', tags=['000001']) == 'fresh'
+    assert cache.get('k') == 'fresh'
+
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache('test', max_entries=10, ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'v': 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader)))
+               for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert results == [{'v': 1}] * 4
+
+
+def test_cached_method_ttl_by_arguments(clock):
+    """有效期可按调用参数决定（最新日线使用较短的有效期）"""
+    cache = TTLCache('test', max_entries=10, ttl=3600)
+    calls = []
+
+    class Service:
+        @cache.cached_method('daily', ttl=lambda symbol, trade_date=None: None if trade_date else 60)
+        def get(self, symbol, trade_date=None):
+            calls.append((symbol, trade_date))
+            return {'symbol': symbol, 'trade_date': trade_date}
+
+    service = Service()
+    service.get('000001')
+    service.get('000001', '2024-01-02')
+    clock[0] += 120
+    service.get('000001')
+    service.get('000001', '2024-01-02')
+    assert calls == [('000001', None), ('000001', '2024-01-02'), ('000001', None)]
+    service.get('000002')
+    cache.invalidate_tags(['000002'])
+    service.get('000002')
+    assert calls[-2:] == [('000002', None), ('000002', None)]
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试向量化评分与原逐条实现的结果一致
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pandas as pd
+
+from stockshark.data.data_processor import DataProcessor
+
+
+def reference_investment_score(stock_data):
+    """向量化之前的 calculate_investment_score（逐条判断）"""
+    factors = []
+    valuation_score = 0
+    if 'pe_ttm' in stock_data:
+        pe = stock_data['pe_ttm']
+        if pe > 0 and pe < 10:
+            valuation_score = 30
+            factors.append('低市盈率（PE<10）')
+        elif pe >= 10 and pe < 20:
+            valuation_score = 20
+            factors.append('合理市盈率（10≤PE<20）')
+        elif pe >= 20 and pe < 30:
+            valuation_score = 10
+            factors.append('较高市盈率（20≤PE<30）')
+    growth_score = 15
+    factors.append('成长潜力评估')
+    technical_score = 10
+    factors.append('技术形态评估')
+    industry_score = 0
+    if 'industry' in stock_data:
+        industry_score = 10
+        factors.append('行业前景评估')
+    total_score = valuation_score + growth_score + technical_score + industry_score
+    if total_score >= 80:
+        rating = '优秀'
+    elif total_score >= 60:
+        rating = '良好'
+    elif total_score >= 40:
+        rating = '一般'
+    else:
+        rating = '较差'
+    return {
+        'total_score': total_score,
+        'rating': rating,
+        'valuation_score': valuation_score,
+        'growth_score': growth_score,
+        'technical_score': technical_score,
+        'industry_score': industry_score,
+        'factors': factors
+    }
+
+
+def reference_risk_score(stock_data):
+    """向量化之前的 calculate_risk_score（逐条判断）"""
+    risk_factors = []
+    if 'pe_ttm' in stock_data:
+        pe = stock_data['pe_ttm']
+        if pe > 50:
+            risk_factors.append(f'高估值风险（PE={pe}）')
+    if 'change_pct' in stock_data:
+        if abs(stock_data['change_pct']) > 7:
+            risk_factors.append(f'高波动率风险（涨跌幅={stock_data["change_pct"]}%）')
+    if 'industry' in stock_data:
+        risk_factors.append(f'{stock_data["industry"]}行业风险')
+    if len(risk_factors) >= 3:
+        risk_level = 'high'
+    elif len(risk_factors) == 0:
+        risk_level = 'low'
+    else:
+        risk_level = 'medium'
+    return {
+        'risk_level': risk_level,
+        'risk_factors': risk_factors,
+        'risk_count': len(risk_factors)
+    }
+
+
+def random_record(rng):
+    """随机生成整合后的股票数据：字段可缺失，数值覆盖各评分区间边界，整数与浮点混合"""
+    record = {'code': f'{rng.randrange(1000000):06d}'}
+    if rng.random() < 0.8:
+        record['pe_ttm'] = rng.choice([
+            rng.choice([-5, 0, 10, 20, 30, 50, 51]),
+            round(rng.uniform(-20, 120), 2),
+            rng.randint(-20, 120),
+        ])
+    if rng.random() < 0.8:
+        record['change_pct'] = rng.choice([
+            rng.choice([-7, 7, -7.01, 7.01, 0]),
+            round(rng.uniform(-11, 11), 2),
+        ])
+    if rng.random() < 0.7:
+        record['industry'] = rng.choice(['银行', '半导体', '白酒', '计算机设备'])
+    return record
+
+
+def test_score_records_matches_reference_implementation():
+    rng = random.Random(20240102)
+    records = [random_record(rng) for _ in range(5000)]
+    processor = DataProcessor()
+    scored = processor.score_records(records)
+    mismatches = [
+        record for record, (investment, risk) in zip(records, scored)
+        if investment != reference_investment_score(record) or risk != reference_risk_score(record)
+    ]
+    assert mismatches == []
+
+
+def test_single_record_wrappers_match_reference():
+    processor = DataProcessor()
+    record = {'pe_ttm': 60, 'change_pct': -8.5, 'industry': '半导体'}
+    assert processor.calculate_investment_score(record) == reference_investment_score(record)
+    assert processor.calculate_risk_score(record) == reference_risk_score(record)
+    assert processor.calculate_risk_score({}) == {'risk_level': 'low', 'risk_factors': [], 'risk_count': 0}
+
+
+def test_score_frame_without_factors():
+    """只需排序/筛选时不生成因素文本列，缺失的列视为无数据"""
+    frame = pd.DataFrame({'pe_ttm': [5.0, 25.0, None]}, index=['a', 'b', 'c'])
+    scores = DataProcessor().score_frame(frame, with_factors=False)
+    assert 'investment_factors' not in scores.columns
+    assert scores['valuation_score'].tolist() == [30, 10, 0]
+    assert scores['total_score'].tolist() == [55, 35, 25]
+    assert scores['risk_level'].tolist() == ['low', 'low', 'low']
+    assert list(scores.index) == ['a', 'b', 'c']
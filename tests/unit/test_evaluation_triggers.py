@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试评估缓存的批量触发检测（数据源均为假实现，不访问网络）
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+
+from stockshark.analysis import evaluation_cache
+from stockshark.analysis.evaluation_cache import check_triggers_batch
+
+FRESH = datetime.now().isoformat()
+STALE = (datetime.now() - timedelta(days=30)).isoformat()
+
+FINGERPRINT = {'price': 10.0, 'change_pct': 1.0, 'pe_ttm': 20.0, 'pb': 2.0,
+               'latest_announcement_date': '2024-01-01', 'latest_report_date': '2024-01-01'}
+
+
+def _cached(code, evaluated_at=FRESH, scope='all'):
+    return {'stock_code': code, 'scope': scope, 'evaluated_at': evaluated_at,
+            'data_fingerprint': dict(FINGERPRINT), 'result': {'stock_name': f'股票{code}'}}
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """各阶段的数据源，记录每只股票被查询的次数"""
+    calls = {'quote': [], 'announcements': [], 'reports': [], 'valuation': []}
+    quotes = {
+        '000001': {'最新价': 10.1, '涨跌幅': 1.0},
+        '000002': {'最新价': 12.0, '涨跌幅': 1.0},   # 价格变化 20%
+        '000003': {'最新价': 10.0, '涨跌幅': 1.0},
+        '000004': {'最新价': 10.0, '涨跌幅': 1.0},
+        '000005': {'最新价': 10.0, '涨跌幅': 1.0},
+    }
+    announcements = {'000003': [{'date': '2024-02-01', 'title': '关于重大资产重组的公告'}]}
+    reports = {'股票000004': [{'date': '2024-02-01', 'title': '深度报告'}]}
+    valuations = {'000005': {'pe_ttm': 30.0, 'pb': 2.0}}
+
+    class FakeSpot:
+        def get_row(self, code):
+            calls['quote'].append(code)
+            return quotes.get(code)
+
+    class FakeAk:
+        def get_stock_valuation_data(self, code):
+            calls['valuation'].append(code)
+            return valuations.get(code, {'pe_ttm': 20.0, 'pb': 2.0})
+
+    def fetch_announcements(code):
+        calls['announcements'].append(code)
+        return announcements.get(code, [])
+
+    def fetch_reports(keyword):
+        calls['reports'].append(keyword)
+        return reports.get(keyword, [])
+
+    monkeypatch.setattr(evaluation_cache, 'spot_snapshot', FakeSpot())
+    monkeypatch.setattr(evaluation_cache, '_ak', FakeAk())
+    monkeypatch.setattr(evaluation_cache, '_fetch_trigger_announcements', fetch_announcements)
+    monkeypatch.setattr(evaluation_cache, '_fetch_trigger_reports', fetch_reports)
+    return calls
+
+
+def test_stages_filter_triggered_items(sources):
+    """每个阶段只检测之前未触发的评估"""
+    cached = [_cached('000000', STALE)] + [_cached(f'00000{i}') for i in range(1, 6)]
+    fetched = {}
+    results = check_triggers_batch(cached, workers=2, fetched=fetched)
+
+    assert results[('000000', 'all')] == (True, 'time_expired')
+    assert results[('000001', 'all')] == (False, '')
+    assert results[('000002', 'all')][1].startswith('price_change')
+    assert results[('000003', 'all')][1].startswith('major_announcement')
+    assert results[('000004', 'all')][1].startswith('new_report')
+    assert results[('000005', 'all')][1].startswith('valuation_change(pe_ttm')
+
+    assert '000000' not in sources['quote']
+    assert sorted(sources['announcements']) == ['000001', '000003', '000004', '000005']
+    assert sorted(sources['reports']) == ['股票000001', '股票000004', '股票000005']
+    assert sorted(sources['valuation']) == ['000001', '000005']
+    # 检测时取得的估值供后续全量评估复用
+    assert fetched['000005'] == {'valuation': {'pe_ttm': 30.0, 'pb': 2.0}}
+
+
+def test_fetches_deduplicated_across_scopes(sources):
+    """同一股票的多个 scope 只查询一次公告和估值"""
+    cached = [_cached('000001', scope=scope) for scope in ('short', 'mid', 'long')]
+    results = check_triggers_batch(cached, workers=2)
+    assert all(results[('000001', scope)] == (False, '') for scope in ('short', 'mid', 'long'))
+    assert sources['announcements'] == ['000001']
+    assert sources['valuation'] == ['000001']
+
+
+def test_source_failure_does_not_trigger(sources, monkeypatch):
+    """数据源异常时该阶段不触发，继续后续检测"""
+    def broken(code):
+        raise ConnectionError('cninfo down')
+
+    monkeypatch.setattr(evaluation_cache, '_fetch_trigger_announcements', broken)
+    results = check_triggers_batch([_cached('000003'), _cached('000005')], workers=2)
+    assert results[('000003', 'all')] == (False, '')
+    assert results[('000005', 'all')][1].startswith('valuation_change')
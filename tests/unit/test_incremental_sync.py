@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试日线增量同步的缺口定位与区间记忆（不访问网络和数据库）
+"""
+
+import sys
+import os
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+
+from stockshark.data import incremental_sync
+from stockshark.data.incremental_sync import IncrementalTradeSync, find_missing_span
+
+DAYS = [date(2024, 1, 2) + timedelta(days=i) for i in range(5)]
+
+
+class FakeCalendar:
+    def trading_days(self, start, end):
+        return [day for day in DAYS if start <= day <= end]
+
+    def last_closed_trading_day(self):
+        return DAYS[-1]
+
+
+@pytest.fixture
+def fake_store(monkeypatch):
+    """用内存中的日期集合代替 stock_daily_trade 表"""
+    stored = {DAYS[0], DAYS[4]}
+    model = incremental_sync.StockDailyTrade
+    monkeypatch.setattr(incremental_sync, 'trading_calendar', FakeCalendar())
+    monkeypatch.setattr(model, 'get_trade_dates',
+                        staticmethod(lambda symbol, start, end: [d for d in stored if start <= d <= end]))
+    monkeypatch.setattr(model, 'to_row', staticmethod(lambda trade, created_at: (trade['trade_date'],)))
+
+    def bulk_upsert(rows):
+        stored.update(row[0] for row in rows)
+        return {'rows': len(rows)}
+
+    monkeypatch.setattr(model, 'bulk_upsert', staticmethod(bulk_upsert))
+    return stored
+
+
+def test_find_missing_span():
+    assert find_missing_span(DAYS, DAYS) is None
+    assert find_missing_span([DAYS[0], DAYS[2], DAYS[4]], DAYS) == (DAYS[1], DAYS[3])
+
+
+def test_fill_history_retries_after_empty_response(fake_store):
+    """上游临时返回空时只短时间记录区间，过期后仍会补齐"""
+    responses = [[], [{'trade_date': DAYS[1]}, {'trade_date': DAYS[3]}]]
+    calls = []
+
+    def fetch(symbol, start, end):
+        calls.append((start, end))
+        return responses.pop(0)
+
+    sync = IncrementalTradeSync(fetch, span_ttl=3600, empty_span_ttl=-1)
+    assert sync.fill_history('000001', DAYS[0], DAYS[4]) == 0
+    assert sync.fill_history('000001', DAYS[0], DAYS[4]) == 2
+    assert calls == [(DAYS[1].isoformat(), DAYS[3].isoformat())] * 2
+
+
+def test_fill_history_skips_fetched_span(fake_store):
+    """补齐后仍缺失的日期（停牌）在记忆期内不再请求"""
+    calls = []
+
+    def fetch(symbol, start, end):
+        calls.append((start, end))
+        return [{'trade_date': DAYS[1]}, {'trade_date': DAYS[3]}] if len(calls) == 1 else []
+
+    sync = IncrementalTradeSync(fetch, span_ttl=3600, empty_span_ttl=3600)
+    assert sync.fill_history('000001', DAYS[0], DAYS[4]) == 2
+    # DAYS[2] 数据源没有，请求一次后不再重复请求
+    for _ in range(3):
+        assert sync.fill_history('000001', DAYS[0], DAYS[4]) == 0
+    assert calls == [(DAYS[1].isoformat(), DAYS[3].isoformat()),
+                     (DAYS[2].isoformat(), DAYS[2].isoformat())]
+
+
+def test_fetched_spans_expire(fake_store):
+    """区间记忆过期后重新请求，过期条目被清理"""
+    calls = []
+
+    def fetch(symbol, start, end):
+        calls.append(symbol)
+        return [{'trade_date': DAYS[1]}]
+
+    sync = IncrementalTradeSync(fetch, span_ttl=-1)
+    sync.fill_history('000001', DAYS[0], DAYS[4])
+    sync.fill_history('000001', DAYS[0], DAYS[4])
+    assert len(calls) == 2
+    sync._remember_spans([], 0)
+    assert not sync._fetched_spans
+
+
+def test_sync_latest_propagates_db_error(monkeypatch):
+    """最新日期查询失败时报错，而不是重新拉取全部历史"""
+    def fail(symbols):
+        raise ConnectionError('mysql down')
+
+    monkeypatch.setattr(incremental_sync, 'trading_calendar', FakeCalendar())
+    monkeypatch.setattr(incremental_sync.StockDailyTrade, 'get_latest_trade_dates', staticmethod(fail))
+    sync = IncrementalTradeSync(lambda *args: [])
+    with pytest.raises(ConnectionError):
+        sync.sync_latest(['000001'])
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试全市场指标引擎与单只股票计算结果一致（日线为随机生成，不访问数据库）
+"""
+
+import sys
+import os
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+import pandas as pd
+
+from stockshark.data import indicator_engine
+from stockshark.data.data_processor import DataProcessor
+from stockshark.data.indicator_engine import IndicatorEngine, compute_panel_indicators, EMA_STATE_COLUMNS
+from stockshark.models.stock_indicator import StockIndicator
+
+INDICATORS = [c for c in StockIndicator.INDICATOR_COLUMNS if c != 'close_price']
+
+
+def random_panel(symbols, bars=80, seed=20240102):
+    """每只股票 bars 根随机游走日线，长度各不相同"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i, symbol in enumerate(symbols):
+        n = bars - i * 7
+        close = 10 + np.cumsum(rng.normal(0, 0.3, n))
+        frames.append(pd.DataFrame({
+            'symbol': symbol,
+            'trade_date': [date(2024, 1, 1) + timedelta(days=d) for d in range(n)],
+            'open': close + rng.normal(0, 0.1, n),
+            'close': close,
+            'volume': rng.integers(1000, 100000, n).astype(float),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def single_symbol(panel, symbol):
+    """DataProcessor 单只股票的计算结果"""
+    history = panel[panel['symbol'] == symbol].sort_values('trade_date').reset_index(drop=True)
+    return DataProcessor().calculate_technical_indicators(history)
+
+
+def assert_frames_close(actual, expected):
+    pd.testing.assert_frame_equal(actual[INDICATORS].reset_index(drop=True),
+                                  expected[INDICATORS].reset_index(drop=True),
+                                  check_dtype=False, rtol=1e-9, atol=1e-9)
+
+
+def test_panel_matches_single_symbol():
+    """分组计算与逐只股票计算的每个指标一致"""
+    symbols = ['000001', '000002', '600000']
+    panel = random_panel(symbols).sample(frac=1, random_state=1)
+    result = compute_panel_indicators(panel)
+    for symbol in symbols:
+        assert_frames_close(result[result['symbol'] == symbol], single_symbol(panel, symbol))
+
+
+def test_incremental_continues_from_state():
+    """从最新状态递推 EMA 的增量结果与全量计算一致"""
+    symbols = ['000001', '000002']
+    panel = random_panel(symbols)
+    full = compute_panel_indicators(panel)
+    cutoff = date(2024, 2, 10)
+    states = full[full['trade_date'] == cutoff].set_index('symbol')[['trade_date'] + list(EMA_STATE_COLUMNS)]
+    # 只提供起点前 WARMUP_BARS 根及之后的K线
+    window = panel[panel['trade_date'] > cutoff - timedelta(days=indicator_engine.WARMUP_BARS)]
+    result = compute_panel_indicators(window, states)
+    assert result['trade_date'].min() > cutoff
+    for symbol in symbols:
+        expected = full[(full['symbol'] == symbol) & (full['trade_date'] > cutoff)]
+        assert_frames_close(result[result['symbol'] == symbol], expected)
+
+
+def test_backfilled_symbols_recomputed_from_full_history(monkeypatch):
+    """最新指标之前补入了K线的股票不使用旧状态，按完整历史重新计算"""
+    panel = random_panel(['000001', '000002'])
+    full = compute_panel_indicators(panel)
+    cutoff = date(2024, 2, 10)
+    latest = full[full['trade_date'] == cutoff].set_index('symbol')
+    states = {s: {'trade_date': cutoff, **{c: latest.loc[s, c] for c in EMA_STATE_COLUMNS}}
+              for s in latest.index}
+    written = []
+    loaded = {}
+
+    def load_panel(symbols, start_date=None):
+        loaded[tuple(symbols)] = start_date
+        rows = panel[panel['symbol'].isin(symbols)]
+        if start_date is not None:
+            rows = rows[rows['trade_date'] >= start_date]
+        return rows.copy()
+
+    monkeypatch.setattr(StockIndicator, 'get_latest_states', lambda symbols: dict(states))
+    monkeypatch.setattr(StockIndicator, 'get_symbols_missing_rows', lambda symbols: {'000002'})
+    monkeypatch.setattr(StockIndicator, 'bulk_upsert',
+                        lambda rows: written.extend(rows) or {'rows': len(rows), 'failed_chunks': 0})
+    monkeypatch.setattr(IndicatorEngine, '_load_panel', staticmethod(load_panel))
+    monkeypatch.setattr(indicator_engine.trading_calendar, 'trading_days',
+                        lambda start, end: pd.date_range(start, end).date.tolist())
+
+    IndicatorEngine(batch_size=10)._update_batch(['000001', '000002'], full=False)
+
+    dates = {}
+    for row in written:
+        dates.setdefault(row[0], []).append(row[1])
+    assert min(dates['000001']) > cutoff
+    assert min(dates['000002']) == panel.loc[panel['symbol'] == '000002', 'trade_date'].min()
+    assert loaded[('000002',)] is None
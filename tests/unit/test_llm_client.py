@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试 LLM 客户端的重试、流式读取与调用统计（使用假 Session，不访问网络）
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+import requests
+
+from stockshark.analysis import llm_client
+from stockshark.analysis.llm_client import LLMClient
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, lines=None, headers=None):
+        self.status_code = status_code
+        self.reason = 'Too Many Requests' if status_code == 429 else 'OK'
+        self.body = body
+        self.lines = lines or []
+        self.headers = headers or {}
+        self.closed = False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code}', response=self)
+
+    def json(self):
+        return self.body
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeSession:
+    """按顺序返回预设的响应，元素为异常时抛出"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.payloads = []
+
+    def post(self, url, headers=None, json=None, timeout=None, stream=False):
+        self.payloads.append(json)
+        result = self.responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _ok(content='你好', prompt_tokens=10, completion_tokens=5):
+    return FakeResponse(body={'choices': [{'message': {'content': content}}],
+                              'usage': {'prompt_tokens': prompt_tokens,
+                                        'completion_tokens': completion_tokens}})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(llm_client.time, 'sleep', delays.append)
+    return delays
+
+
+def _client(responses, **kwargs):
+    client = LLMClient(api_key='test', base_url='http://llm.test', model='m',
+                       max_concurrency=1, retry_backoff=1.0, **kwargs)
+    client._session = FakeSession(responses)
+    return client
+
+
+def test_retries_on_429_and_5xx(sleeps):
+    """429 / 5xx / 连接错误重试，Retry-After 不超过最长退避时间"""
+    client = _client([FakeResponse(429, headers={'Retry-After': '3600'}),
+                      FakeResponse(503),
+                      requests.ConnectionError('reset'),
+                      _ok()], max_retries=3)
+    assert client.complete('hi') == '你好'
+    assert sleeps[0] == 8.0
+    assert len(sleeps) == 3
+    stats = client.stats()
+    assert stats['calls'] == 1 and stats['retries'] == 3 and stats['failures'] == 0
+
+
+def test_slot_released_while_backing_off(monkeypatch):
+    """退避等待期间释放并发名额"""
+    client = _client([FakeResponse(429, headers={'Retry-After': '1'}), _ok()], max_retries=1)
+    acquired = []
+
+    def sleep(delay):
+        acquired.append(client._semaphore.acquire(blocking=False))
+        client._semaphore.release()
+
+    monkeypatch.setattr(llm_client.time, 'sleep', sleep)
+    client.complete('hi')
+    assert acquired == [True]
+
+
+def test_gives_up_after_max_retries(sleeps):
+    client = _client([FakeResponse(500), FakeResponse(502), FakeResponse(504)], max_retries=2)
+    with pytest.raises(requests.HTTPError):
+        client.complete('hi')
+    assert len(sleeps) == 2
+    stats = client.stats()
+    assert stats['failures'] == 1 and stats['retries'] == 2 and stats['calls'] == 0
+    assert stats['in_flight'] == 0
+
+
+def test_non_retryable_error_raises_immediately(sleeps):
+    client = _client([FakeResponse(401)], max_retries=3)
+    with pytest.raises(requests.HTTPError):
+        client.complete('hi')
+    assert sleeps == []
+    assert client.stats()['failures'] == 1
+
+
+def test_stream_with_on_delta(sleeps):
+    """SSE 增量内容拼接并逐段回调，usage 取自最后的统计块"""
+    chunks = [{'choices': [{'delta': {'content': '你'}}]},
+              {'choices': [{'delta': {}}]},
+              {'choices': [{'delta': {'content': '好'}}]},
+              {'choices': [], 'usage': {'prompt_tokens': 7, 'completion_tokens': 2}}]
+    lines = [''] + [f'data: {json.dumps(chunk, ensure_ascii=False)}' for chunk in chunks] + \
+        [': keep-alive', 'data: [DONE]', 'data: {"choices": [{"delta": {"content": "x"}}]}']
+    client = _client([FakeResponse(lines=lines)], max_retries=0)
+    deltas = []
+    result = client.chat('hi', stream=True, on_delta=deltas.append)
+    assert result['content'] == '你好' and deltas == ['你', '好']
+    assert result['usage'] == {'prompt_tokens': 7, 'completion_tokens': 2}
+    assert client._session.payloads[0]['stream'] is True
+
+
+def test_stats_accumulate_usage(sleeps):
+    client = _client([_ok(prompt_tokens=10, completion_tokens=5),
+                      _ok(prompt_tokens=20, completion_tokens=1)], max_retries=0)
+    client.complete('a')
+    client.complete('b')
+    stats = client.stats()
+    assert stats['calls'] == 2
+    assert stats['prompt_tokens'] == 30 and stats['completion_tokens'] == 6
+    assert stats['max_concurrency'] == 1 and stats['in_flight'] == 0
+    assert stats['p95_latency_ms'] >= stats['p50_latency_ms'] >= 0
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试令牌桶限流器与并行日线爬取引擎（不访问网络和数据库）
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from stockshark.utils.rate_limiter import TokenBucket
+from stockshark.data import trade_crawl_engine
+from stockshark.data.trade_crawl_engine import DailyTradeCrawlEngine
+
+
+def test_token_bucket_limits_rate():
+    """突发容量用完后按速率放行"""
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    for _ in range(15):
+        assert bucket.acquire()
+    elapsed = time.monotonic() - start
+    # 5 个突发令牌 + 10 个按 50/s 补充，至少约 0.2s
+    assert elapsed >= 0.18
+    assert not bucket.try_acquire()
+    assert not bucket.acquire(timeout=0)
+
+
+def test_token_bucket_disabled():
+    """rate <= 0 表示不限流"""
+    bucket = TokenBucket(rate=0)
+    assert all(bucket.try_acquire() for _ in range(100))
+
+
+def test_crawl_engine_retries_and_writes(monkeypatch):
+    """失败的股票按次数重试，结果经写入线程批量写入"""
+    written = []
+
+    def fake_bulk_upsert(rows):
+        written.extend(rows)
+        return {'rows': len(rows)}
+
+    monkeypatch.setattr(trade_crawl_engine.StockDailyTrade, 'bulk_upsert', staticmethod(fake_bulk_upsert))
+
+    attempts = {}
+
+    def fetch(symbol):
+        attempts[symbol] = attempts.get(symbol, 0) + 1
+        if symbol == 'flaky' and attempts[symbol] < 2:
+            raise ConnectionError('reset')
+        if symbol == 'broken':
+            raise ConnectionError('down')
+        if symbol == 'empty':
+            return []
+        return [{
+            'symbol': symbol, 'trade_date': '2024-01-02', 'open_price': 1.0, 'high_price': 1.0,
+            'low_price': 1.0, 'close_price': 1.0, 'volume': 1, 'amount': 1.0,
+        }]
+
+    engine = DailyTradeCrawlEngine(fetch, workers=3, rate_limiter=TokenBucket(rate=0),
+                                   max_retries=2, retry_backoff=0.01, queue_size=2,
+                                   write_batch_size=2)
+    stats = engine.run(['a', 'b', 'flaky', 'broken', 'empty'])
+
+    assert attempts['flaky'] == 2
+    assert attempts['broken'] == 3
+    assert stats['succeeded_symbols'] == 3
+    assert stats['empty_symbols'] == 1
+    assert stats['failed'] == ['broken']
+    assert stats['rows_written'] == 3
+    assert sorted(row[0] for row in written) == ['a', 'b', 'flaky']
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试 GET 接口响应缓存（ETag / 304、空结果不缓存），搜索引擎为假实现，不访问网络
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pandas as pd
+import pytest
+from flask import Flask, jsonify
+
+from stockshark.api.response_cache import cached_response, response_cache
+from stockshark.api.routes import analysis, search
+
+
+class FakeSearchEngine:
+    """industries 第一次返回空列表（上游临时失败），之后恢复"""
+
+    def __init__(self):
+        self.calls = {'industries': 0, 'by_industry': 0}
+
+    def get_all_industries(self):
+        self.calls['industries'] += 1
+        return [] if self.calls['industries'] == 1 else ['银行', '白酒']
+
+    def get_board_catalog(self, kind):
+        return {'boards': [], 'total': 0, 'updated_at': None}
+
+    def search_by_industry(self, industry_name, filters=None, sort_by=None, limit=20):
+        self.calls['by_industry'] += 1
+        results = [{'代码': '600000'}] if industry_name == '银行' else []
+        return {'industry_name': industry_name, 'results': results, 'total': len(results),
+                'filters_applied': filters or {}, 'sort_by': sort_by}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = FakeSearchEngine()
+    monkeypatch.setattr(search, 'search_engine', engine)
+    counter = {'n': 0}
+
+    app = Flask(__name__)
+    app.register_blueprint(search.search_bp)
+
+    @app.route('/counter')
+    @cached_response(timeout=60)
+    def count():
+        counter['n'] += 1
+        return jsonify({'success': True, 'data': counter['n']})
+
+    response_cache.clear()
+    yield app.test_client(), engine, counter
+    response_cache.clear()
+
+
+def test_etag_and_not_modified(client):
+    """命中缓存返回相同 ETag；If-None-Match 匹配时返回 304 且不带响应体"""
+    client, _, counter = client
+    first = client.get('/counter?b=2&a=1')
+    assert first.status_code == 200 and first.headers['X-Cache'] == 'MISS'
+    assert first.cache_control.max_age == 60
+    etag = first.headers['ETag']
+
+    # 参数顺序不同的相同请求共用一个条目
+    second = client.get('/counter?a=1&b=2')
+    assert second.headers['X-Cache'] == 'HIT' and second.headers['ETag'] == etag
+
+    not_modified = client.get('/counter?a=1&b=2', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304 and not_modified.data == b''
+    assert counter['n'] == 1
+
+    changed = client.get('/counter?a=1&b=2', headers={'If-None-Match': '"other"'})
+    assert changed.status_code == 200 and changed.get_json()['data'] == 1
+
+
+def test_empty_list_not_cached(client):
+    """行业列表为空时不缓存，下一次请求重新获取"""
+    client, engine, _ = client
+    empty = client.get('/industries')
+    assert empty.get_json()['data'] == []
+    assert empty.cache_control.max_age == 0
+    assert client.get('/industries').get_json()['data'] == ['银行', '白酒']
+    assert client.get('/industries').headers['X-Cache'] == 'HIT'
+    assert engine.calls['industries'] == 2
+
+    assert client.get('/industries?detail=1').headers['X-Cache'] == 'MISS'
+    assert client.get('/industries?detail=1').headers['X-Cache'] == 'MISS'
+
+
+def test_empty_search_results_not_cached(client):
+    client, engine, _ = client
+    for _ in range(2):
+        client.get('/stock/by-industry?industry_name=白酒')
+    assert engine.calls['by_industry'] == 2
+    for _ in range(2):
+        response = client.get('/stock/by-industry?industry_name=银行')
+    assert response.headers['X-Cache'] == 'HIT'
+    assert engine.calls['by_industry'] == 3
+
+    # 错误响应原样返回，不缓存
+    assert client.get('/stock/by-industry').status_code == 400
+
+
+def test_empty_upstream_data_not_cached(monkeypatch):
+    """行情、财务数据源失败返回空结果时不缓存"""
+    frames = [pd.DataFrame(), pd.DataFrame({'日期': ['2024-01-02'], '收盘': [10.0]})]
+
+    class FakeAkData:
+        def get_stock_history_data(self, symbol, start_date, end_date):
+            return frames.pop(0) if len(frames) > 1 else frames[0]
+
+    monkeypatch.setattr(analysis.stock_analyzer, 'ak_data', FakeAkData())
+    app = Flask(__name__)
+    app.register_blueprint(analysis.analysis_bp)
+    client = app.test_client()
+    response_cache.clear()
+    url = '/stock/history?symbol=000001&start_date=2024-01-01&end_date=2024-01-05'
+    try:
+        assert client.get(url).get_json()['data'] == []
+        assert client.get(url).headers['X-Cache'] == 'MISS'
+        assert client.get(url).headers['X-Cache'] == 'HIT'
+    finally:
+        response_cache.clear()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试请求合并与跨进程锁（MongoDB 集合使用内存实现）
+"""
+
+import sys
+import os
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from stockshark.utils.single_flight import FileLock, MongoLock, SingleFlight
+
+
+class FakeLockCollection:
+    """只支持 MongoLock 用到的查询条件：_id、owner、expires_at.$lt"""
+
+    def __init__(self):
+        self.docs = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _matches(doc, query):
+        for field, cond in query.items():
+            if isinstance(cond, dict):
+                if not doc.get(field) < cond["$lt"]:
+                    return False
+            elif doc.get(field) != cond:
+                return False
+        return True
+
+    def update_one(self, query, update, upsert=False):
+        with self.lock:
+            doc = self.docs.get(query["_id"])
+            if doc is not None and self._matches(doc, query):
+                doc.update(update["$set"])
+                return SimpleNamespace(matched_count=1)
+            if not upsert:
+                return SimpleNamespace(matched_count=0)
+            if doc is not None:
+                raise DuplicateKeyError("duplicate _id")
+            self.docs[query["_id"]] = dict(update["$set"], _id=query["_id"])
+            return SimpleNamespace(matched_count=0)
+
+    def delete_one(self, query):
+        with self.lock:
+            doc = self.docs.get(query["_id"])
+            if doc is not None and self._matches(doc, query):
+                del self.docs[query["_id"]]
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    """同一 key 的并发调用只执行一次，其余共享结果"""
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('k', slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do('k', slow)))
+                 for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [('done', False)] + [('done', True)] * 3
+    assert flight.inflight() == 0
+
+
+def test_single_flight_propagates_exception():
+    """执行失败时异常传给调用方，之后同一 key 可以重新执行"""
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do('k', lambda: (_ for _ in ()).throw(ValueError('boom')))
+    assert flight.do('k', lambda: 1) == (1, False)
+
+
+def test_mongo_lock_excludes_other_owners():
+    coll = FakeLockCollection()
+    first = MongoLock(coll, 'eval:600519', ttl=60)
+    second = MongoLock(coll, 'eval:600519', ttl=60, poll_interval=0.01)
+    assert first.acquire() == (True, False)
+    assert second.acquire(timeout=0.05) == (False, True)
+    first.release()
+    assert second.acquire() == (True, False)
+    second.release()
+    assert not coll.docs
+
+
+def test_mongo_lock_heartbeat_extends_lease():
+    """持有期间续租，租约时长短于评估耗时时其他持有者也无法占用"""
+    coll = FakeLockCollection()
+    holder = MongoLock(coll, 'eval:600519', ttl=0.3, renew_interval=0.05)
+    other = MongoLock(coll, 'eval:600519', ttl=0.3, poll_interval=0.05)
+    assert holder.acquire()[0]
+    time.sleep(0.6)
+    assert coll.docs['eval:600519']['expires_at'] > datetime.now()
+    assert not other.acquire()[0]
+    holder.release()
+
+    # 释放后停止续租，不会覆盖新持有者的租约
+    assert other.acquire()[0]
+    time.sleep(0.1)
+    assert coll.docs['eval:600519']['owner'] == other.owner
+    other.release()
+
+
+def test_file_lock(tmp_path):
+    path = str(tmp_path / 'locks' / 'a.lock')
+    first, second = FileLock(path), FileLock(path, poll_interval=0.01)
+    assert first.acquire() == (True, False)
+    assert second.acquire(timeout=0.05) == (False, True)
+    first.release()
+    assert second.acquire()[0]
+    second.release()
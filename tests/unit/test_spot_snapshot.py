@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试全市场行情快照缓存（不访问网络）
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pandas as pd
+import pytest
+
+from stockshark.data.spot_snapshot import SpotSnapshot
+
+
+class FlakyFetcher:
+    """按顺序返回结果或抛出异常的快照下载函数"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else ConnectionError('down')
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _frame(price):
+    return pd.DataFrame([{'代码': '000001', '最新价': price}])
+
+
+def test_snapshot_shared_within_ttl():
+    """TTL 内只下载一次，按代码查询"""
+    fetcher = FlakyFetcher(_frame(10.0))
+    snapshot = SpotSnapshot(ttl=60, fetcher=fetcher)
+    assert snapshot.get_row('000001')['最新价'] == 10.0
+    assert snapshot.get_row('000002') is None
+    assert fetcher.calls == 1
+
+
+def test_snapshot_failure_backoff_keeps_old_frame():
+    """刷新失败后 retry_after 内继续使用旧快照，不再重复下载"""
+    fetcher = FlakyFetcher(_frame(10.0), ConnectionError('down'))
+    snapshot = SpotSnapshot(ttl=0, fetcher=fetcher, retry_after=60)
+    snapshot.get_frame()
+    for _ in range(5):
+        assert snapshot.get_row('000001')['最新价'] == 10.0
+    assert fetcher.calls == 2
+    assert snapshot.stats()['refresh_errors'] == 1
+
+
+def test_snapshot_failure_backoff_without_frame():
+    """没有旧快照时，退避期内直接报错而不重复下载"""
+    fetcher = FlakyFetcher(ConnectionError('down'))
+    snapshot = SpotSnapshot(ttl=60, fetcher=fetcher, retry_after=60)
+    with pytest.raises(ConnectionError):
+        snapshot.get_frame()
+    with pytest.raises(RuntimeError):
+        snapshot.get_frame()
+    assert fetcher.calls == 1
+
+
+def test_forced_refresh_failure_raises():
+    """强制刷新失败时抛出异常，不返回旧快照"""
+    fetcher = FlakyFetcher(_frame(10.0), ConnectionError('down'))
+    snapshot = SpotSnapshot(ttl=60, fetcher=fetcher, retry_after=60)
+    snapshot.get_frame()
+    with pytest.raises(ConnectionError):
+        snapshot.get_frame(force_refresh=True)
+    assert snapshot.get_row('000001')['最新价'] == 10.0
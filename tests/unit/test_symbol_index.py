@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试股票代码/名称索引的刷新与失败退避（不访问网络）
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pandas as pd
+import pytest
+
+from stockshark.config import Config
+from stockshark.data import symbol_index as symbol_index_module
+from stockshark.data.symbol_index import SymbolIndex
+
+
+@pytest.fixture
+def source(monkeypatch):
+    """假的 ak.stock_info_a_code_name，result 为异常时下载失败"""
+    state = {'calls': 0, 'result': pd.DataFrame({'code': ['000001'], 'name': ['平安银行']})}
+
+    def stock_info_a_code_name():
+        state['calls'] += 1
+        if isinstance(state['result'], Exception):
+            raise state['result']
+        return state['result']
+
+    monkeypatch.setattr(symbol_index_module.ak, 'stock_info_a_code_name', stock_info_a_code_name)
+    return state
+
+
+def test_failed_refresh_serves_stale_data_during_backoff(source, monkeypatch, tmp_path):
+    """TTL 过期后刷新失败，退避期内继续使用旧数据且不再访问网络"""
+    index = SymbolIndex(ttl=60, snapshot_path=str(tmp_path / 'symbols.json'))
+    assert index.get_name('000001') == '平安银行'
+    assert os.listdir(tmp_path) == ['symbols.json']
+
+    index._loaded_at -= 120
+    source['result'] = ConnectionError('timeout')
+    for _ in range(5):
+        assert index.get_name('000001') == '平安银行'
+    assert source['calls'] == 2
+
+    # 退避期结束后重新刷新
+    source['result'] = pd.DataFrame({'code': ['000001', '600000'], 'name': ['平安银行', '浦发银行']})
+    index._retry_at = 0.0
+    assert index.get_code('浦发银行') == '600000'
+    assert source['calls'] == 3
+
+
+def test_failure_without_data_raises_without_retrying(source, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'SYMBOL_INDEX_RETRY_AFTER', 300)
+    source['result'] = ConnectionError('timeout')
+    index = SymbolIndex(ttl=60, snapshot_path=str(tmp_path / 'symbols.json'))
+    with pytest.raises(ConnectionError):
+        index.contains('000001')
+    with pytest.raises(RuntimeError):
+        index.contains('000001')
+    assert source['calls'] == 1